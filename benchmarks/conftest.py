@@ -0,0 +1,15 @@
+"""
+Benchmark options
+
+    pytest benchmarks --rows 100000
+"""
+import pytest
+
+
+def pytest_addoption(parser):
+    parser.addoption('--rows', type=int, default=10000, help='rows per generated result (default: 10000)')
+
+
+@pytest.fixture(scope='session')
+def rows(request):
+    return request.config.getoption('--rows')
@@ -0,0 +1,87 @@
+"""
+Deterministic in-process stand-in for a HiveServer2 session
+
+Builds on the ``java.sql`` fakes in ``tests.fakes``, generating result sets of any size and column mix so the
+python side of the driver (argument parsing, statement execution, type conversion and the fetch paths) can be
+measured without a jvm or a Hive server.
+"""
+import json
+import random
+
+from hivejdbc import HiveConnection, HiveCursor, HiveArgParser
+from hivejdbc.driver import HiveConnect, DRIVER_CLASS
+from hivejdbc.types import HiveTypeConversion
+from tests.fakes import FakeConnection, BOOLEAN, INTEGER, BIGINT, DOUBLE, VARCHAR, ARRAY, STRUCT, JAVA_OBJECT
+
+
+def _string(rng):
+    return ''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(4, 24)))
+
+
+# column type: (java.sql.Types code, value generator), complex values are generated as json text like Hive sends
+COLUMN_TYPES = {
+    'boolean': (BOOLEAN, lambda rng: rng.random() < 0.5),
+    'int': (INTEGER, lambda rng: rng.randint(-2 ** 31, 2 ** 31 - 1)),
+    'bigint': (BIGINT, lambda rng: rng.randint(-2 ** 63, 2 ** 63 - 1)),
+    'double': (DOUBLE, lambda rng: rng.uniform(-1e6, 1e6)),
+    'string': (VARCHAR, _string),
+    'array': (ARRAY, lambda rng: json.dumps([rng.randint(0, 1000) for _ in range(rng.randint(0, 8))])),
+    'map': (JAVA_OBJECT, lambda rng: json.dumps({_string(rng): rng.random() for _ in range(rng.randint(0, 4))})),
+    'struct': (STRUCT, lambda rng: json.dumps({'id': rng.randint(0, 10 ** 6), 'name': _string(rng),
+                                               'tags': [_string(rng) for _ in range(2)]})),
+}
+
+PRIMITIVE_COLUMNS = ('int', 'bigint', 'double', 'string', 'boolean')
+COMPLEX_COLUMNS = ('array', 'map', 'struct')
+
+
+def generate(rows, column_types=PRIMITIVE_COLUMNS, null_fraction=0.0, seed=0):
+    """
+    Generate a result
+
+    :param rows: number of rows
+    :param column_types: names from ``COLUMN_TYPES``, one per column
+    :param null_fraction: fraction of values that are null
+    :param seed: random seed, the same arguments always generate the same result
+    :return: tuple of (columns, rows) as expected by ``tests.fakes.FakeConnection`` handlers
+    """
+    rng = random.Random(seed)
+    columns = [('c{}_{}'.format(idx, name), COLUMN_TYPES[name][0]) for idx, name in enumerate(column_types)]
+    generators = [COLUMN_TYPES[name][1] for name in column_types]
+    data = [tuple(None if null_fraction and rng.random() < null_fraction else generator(rng)
+                  for generator in generators)
+            for _ in range(rows)]
+    return columns, data
+
+
+def connection(result, cursor_class=HiveCursor, **kwargs):
+    """
+    :param result: ``(columns, rows)`` returned for every query
+    :param cursor_class: cursor class of the connection
+    :param kwargs: ``HiveTypeConversion`` options
+    :return: connection to the stand-in
+    :rtype: hivejdbc.HiveConnection
+    """
+    fake = FakeConnection(lambda sql, params: result)
+    return HiveConnection(fake, cursor_class, type_conversion=HiveTypeConversion(**kwargs), database='default')
+
+
+class StandinConnect(HiveConnect):
+    """``connect`` function running argument handling and url construction, then opening a stand-in session"""
+
+    def __init__(self, result=((), ())):
+        super().__init__(driver_path=None, driver_class=DRIVER_CLASS, cursor_class=HiveCursor,
+                         parser=HiveArgParser, type_conversion=HiveTypeConversion, runtime_invocation_ok=False)
+        self.result = result
+
+    def load_driver(self):
+        return None
+
+    def probe(self, args):
+        # the stand-in is always reachable
+        pass
+
+    def open_connection(self, driver_class, conn_str, args, type_conversion=None):
+        return HiveConnection(FakeConnection(lambda sql, params: self.result), self.cursor_class,
+                              type_conversion=type_conversion or self.make_type_conversion(args),
+                              fetch_size=args.get('fetch_size'), database=args.database)
@@ -0,0 +1,18 @@
+"""
+Connection overhead: argument parsing, url construction and opening a session
+"""
+from hivejdbc import ConnectionProfile
+from benchmarks.standin import StandinConnect
+
+ARGS = ('example.com', 'default')
+KWARGS = {'user': 'hive', 'password': 'secret', 'fetch_size': 10000}
+
+
+def test_connect(benchmark):
+    connect = StandinConnect()
+    benchmark(lambda: connect(*ARGS, **KWARGS).close())
+
+
+def test_connect_profile(benchmark):
+    profile = ConnectionProfile(*ARGS, connect_function=StandinConnect(), **KWARGS)
+    benchmark(lambda: profile.connect().close())
@@ -0,0 +1,99 @@
+"""
+Fetch paths over primitive columns
+"""
+import pytest
+
+from hivejdbc import DictCursor
+from benchmarks import standin
+
+
+@pytest.fixture(scope='module')
+def result(rows):
+    return standin.generate(rows, standin.PRIMITIVE_COLUMNS, null_fraction=0.05)
+
+
+def run(connection, fetch):
+    cursor = connection.cursor()
+    cursor.execute('select * from bench')
+    return fetch(cursor)
+
+
+def fetchone_all(cursor):
+    count = 0
+    while cursor.fetchone() is not None:
+        count += 1
+    return count
+
+
+def test_execute(benchmark, result):
+    conn = standin.connection(result)
+    benchmark(run, conn, lambda cursor: None)
+
+
+def test_execute_parameterized(benchmark):
+    conn = standin.connection(standin.generate(1))
+
+    def lookups():
+        cursor = conn.cursor()
+        for idx in range(1000):
+            cursor.execute('select * from bench where id = :id and name = :name', {'id': idx, 'name': 'a'})
+            cursor.fetchone()
+
+    benchmark(lookups)
+
+
+def test_fetchone(benchmark, result):
+    conn = standin.connection(result)
+    assert benchmark(run, conn, fetchone_all) == len(result[1])
+
+
+@pytest.mark.parametrize('size', [100, 1000])
+def test_fetchmany(benchmark, result, size):
+    conn = standin.connection(result)
+
+    def fetch(cursor):
+        count = 0
+        while True:
+            rows = cursor.fetchmany(size)
+            if not rows:
+                return count
+            count += len(rows)
+
+    assert benchmark(run, conn, fetch) == len(result[1])
+
+
+def test_fetchall(benchmark, result):
+    conn = standin.connection(result)
+    assert len(benchmark(run, conn, lambda cursor: cursor.fetchall())) == len(result[1])
+
+
+def test_fetchall_dict_cursor(benchmark, result):
+    conn = standin.connection(result, cursor_class=DictCursor)
+    assert len(benchmark(run, conn, lambda cursor: cursor.fetchall())) == len(result[1])
+
+
+def test_iterate(benchmark, result):
+    conn = standin.connection(result)
+    assert benchmark(run, conn, lambda cursor: sum(1 for _ in cursor)) == len(result[1])
+
+
+def test_stream(benchmark, result):
+    conn = standin.connection(result)
+
+    def fetch(cursor):
+        with cursor.stream(batch_rows=1000) as stream:
+            return sum(len(batch) for batch in stream)
+
+    assert benchmark(run, conn, fetch) == len(result[1])
+
+
+def test_fetch_numpy(benchmark, result):
+    pytest.importorskip('numpy')
+    conn = standin.connection(result)
+    benchmark(run, conn, lambda cursor: cursor.fetch_numpy())
+
+
+def test_fetch_arrow(benchmark, result):
+    pytest.importorskip('pyarrow')
+    conn = standin.connection(result)
+    assert benchmark(run, conn, lambda cursor: cursor.fetch_arrow()).num_rows == len(result[1])
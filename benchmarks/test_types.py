@@ -0,0 +1,52 @@
+"""
+Decoding of ARRAY, MAP and STRUCT columns
+"""
+import pytest
+
+from hivejdbc.types import JSON_BACKENDS, json_loader
+from benchmarks import standin
+
+
+@pytest.fixture(scope='module')
+def result(rows):
+    return standin.generate(rows, standin.COMPLEX_COLUMNS, null_fraction=0.05)
+
+
+def installed_backends():
+    backends = []
+    for backend in JSON_BACKENDS:
+        try:
+            json_loader(backend)
+        except ImportError:
+            continue
+        backends.append(backend)
+    return backends
+
+
+def run(connection, fetch):
+    cursor = connection.cursor()
+    cursor.execute('select * from bench')
+    return fetch(cursor)
+
+
+@pytest.mark.parametrize('json_backend', installed_backends())
+def test_fetchall_eager(benchmark, result, json_backend):
+    conn = standin.connection(result, json_backend=json_backend)
+    benchmark(run, conn, lambda cursor: cursor.fetchall())
+
+
+def test_fetchall_lazy(benchmark, result):
+    conn = standin.connection(result, complex_types='lazy')
+    benchmark(run, conn, lambda cursor: cursor.fetchall())
+
+
+def test_fetchall_lazy_one_column_read(benchmark, result):
+    conn = standin.connection(result, complex_types='lazy')
+    benchmark(run, conn, lambda cursor: [len(row[0]) for row in cursor.fetchall() if row[0] is not None])
+
+
+@pytest.mark.parametrize('json_backend', installed_backends())
+def test_fetch_numpy(benchmark, result, json_backend):
+    pytest.importorskip('numpy')
+    conn = standin.connection(result, json_backend=json_backend)
+    benchmark(run, conn, lambda cursor: cursor.fetch_numpy())
@@ -0,0 +1,279 @@
+"""
+asyncio interface for `hivejdbc`
+
+jdbc calls block, so they are run on a bounded thread pool whose threads are attached to the jvm. The event loop
+is free while Hive compiles and runs a query, so a single loop can drive many concurrent queries, one per
+connection.
+
+    conn = await hivejdbc.aio.connect('example.com', 'default')
+    async with conn.cursor() as cursor:
+        await cursor.execute('select * from test.persons')
+        async for row in cursor:
+            print(row)
+    await conn.close()
+
+Calls on a connection (and its cursors) are serialized, jdbc connections must not be used by two threads at once.
+Cancelling a task awaiting ``execute()`` cancels the running statement with ``Statement.cancel()``.
+"""
+__all__ = ['connect', 'AsyncConnection', 'AsyncCursor', 'default_executor', 'DEFAULT_MAX_WORKERS']
+
+import asyncio
+import concurrent.futures
+import functools
+import logging
+import threading
+from collections import deque
+
+import hivejdbc
+from hivejdbc.jvm import JvmThreadPoolExecutor, jvm_call
+
+log = logging.getLogger(__name__)
+
+# size of the shared thread pool, this bounds the number of jdbc calls running at the same time
+DEFAULT_MAX_WORKERS = 32
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def default_executor():
+    """
+    The thread pool shared by async connections that were not given an executor
+
+    :rtype: hivejdbc.jvm.JvmThreadPoolExecutor
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = JvmThreadPoolExecutor(max_workers=DEFAULT_MAX_WORKERS, thread_name_prefix='hivejdbc-aio')
+        return _executor
+
+
+def _cancel(statement):
+    """
+    Call ``Statement.cancel()`` on a thread of its own, the executor may be busy running the statement being
+    cancelled and other long queries
+
+    :return: asyncio future completed once the statement was cancelled
+    """
+    cancelled = concurrent.futures.Future()
+
+    def call():
+        try:
+            cancelled.set_result(jvm_call(statement.cancel))
+        except BaseException as e:
+            cancelled.set_exception(e)
+
+    threading.Thread(target=call, name='hivejdbc-aio-cancel', daemon=True).start()
+    return asyncio.wrap_future(cancelled)
+
+
+async def connect(*args, executor=None, **kwargs):
+    """
+    Open a connection without blocking the event loop, accepts the same arguments as ``hivejdbc.connect``
+
+    :param executor: executor used to run jdbc calls, defaults to ``default_executor()``
+    :return: async connection
+    :rtype: AsyncConnection
+    """
+    executor = executor or default_executor()
+    loop = asyncio.get_event_loop()
+    connection = await loop.run_in_executor(executor, functools.partial(hivejdbc.connect, *args, **kwargs))
+    return AsyncConnection(connection, executor=executor)
+
+
+class AsyncConnection:
+
+    def __init__(self, connection, executor=None):
+        """
+        :param connection: a connection returned by ``hivejdbc.connect``
+        :type connection: pyjdbc.dbapi.JdbcConnection
+        :param executor: executor used to run jdbc calls, defaults to ``default_executor()``
+        """
+        self._connection = connection
+        self._executor = executor or default_executor()
+        self._lock = asyncio.Lock()
+
+    @property
+    def connection(self):
+        """
+        :return: the wrapped blocking connection
+        :rtype: pyjdbc.dbapi.JdbcConnection
+        """
+        return self._connection
+
+    async def run(self, fn, *args, **kwargs):
+        """
+        Run a blocking call on the executor, holding the connection lock
+
+        :param fn: callable
+        :return: return value of ``fn``
+        """
+        async with self._lock:
+            return await self._submit(fn, *args, **kwargs)
+
+    def _submit(self, fn, *args, **kwargs):
+        loop = asyncio.get_event_loop()
+        return loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+    def cursor(self):
+        """
+        :return: new async cursor
+        :rtype: AsyncCursor
+        """
+        return AsyncCursor(self, self._connection.cursor())
+
+    def is_closed(self):
+        return self._connection.is_closed()
+
+    async def close(self):
+        await self.run(self._connection.close)
+
+    async def commit(self):
+        await self.run(self._connection.commit)
+
+    async def rollback(self):
+        await self.run(self._connection.rollback)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+
+class AsyncCursor:
+
+    # rows fetched per call into the jvm when iterating with `async for`
+    arraysize = 1000
+
+    def __init__(self, connection, cursor):
+        """
+        :param connection: the async connection that owns this cursor
+        :type connection: AsyncConnection
+        :param cursor: the wrapped blocking cursor
+        :type cursor: pyjdbc.dbapi.JdbcCursor
+        """
+        self._connection = connection
+        self._cursor = cursor
+        self._buffer = deque()
+
+    @property
+    def cursor(self):
+        """
+        :return: the wrapped blocking cursor
+        :rtype: pyjdbc.dbapi.JdbcCursor
+        """
+        return self._cursor
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    async def _run_cancellable(self, fn, *args):
+        """
+        Run a statement on the executor, if the awaiting task is cancelled the statement is cancelled through
+        ``Statement.cancel()`` and the call is allowed to finish before ``CancelledError`` propagates.
+        """
+        cursor = self._cursor
+        started = threading.Event()
+
+        def call():
+            # close the statement of the previous call first, a statement seen once `started` is set is this call's
+            cursor._reset()
+            started.set()
+            return fn(*args)
+
+        async with self._connection._lock:
+            future = self._connection._submit(call)
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                try:
+                    await self._cancel_statement(future, started)
+                finally:
+                    # the connection must not be used by another call until the worker finished
+                    while not future.done():
+                        try:
+                            await asyncio.wait([future])
+                        except asyncio.CancelledError:
+                            continue
+                raise
+
+    async def _cancel_statement(self, future, started):
+        while not future.done():
+            # the statement is created by `execute` on the worker thread, it may not exist yet
+            statement = getattr(self._cursor, '_statement', None) if started.is_set() else None
+            if statement is not None:
+                try:
+                    await _cancel(statement)
+                except Exception as e:
+                    log.warning('unable to cancel statement: %s', e)
+                break
+            await asyncio.sleep(0.05)
+
+    async def execute(self, operation, params=None):
+        """
+        Execute a sql statement, see ``pyjdbc.dbapi.JdbcCursor.execute``
+
+        Cancelling the awaiting task cancels the statement on the Hive server.
+        """
+        self._buffer = deque()
+        await self._run_cancellable(self._cursor.execute, operation, params)
+
+    async def executemany(self, operation, seq_of_parameters):
+        self._buffer = deque()
+        await self._run_cancellable(self._cursor.executemany, operation, seq_of_parameters)
+
+    async def cancel(self):
+        """cancel the running statement"""
+        statement = getattr(self._cursor, '_statement', None)
+        if statement is not None:
+            await _cancel(statement)
+
+    async def fetchone(self):
+        if self._buffer:
+            return self._buffer.popleft()
+        return await self._connection.run(self._cursor.fetchone)
+
+    async def fetchmany(self, size=None):
+        size = self.arraysize if size is None else size
+        rows = [self._buffer.popleft() for _ in range(min(size, len(self._buffer)))]
+        if len(rows) < size:
+            rows.extend(await self._connection.run(self._cursor.fetchmany, size - len(rows)))
+        return rows
+
+    async def fetchall(self):
+        rows = list(self._buffer)
+        self._buffer.clear()
+        rows.extend(await self._connection.run(self._cursor.fetchall))
+        return rows
+
+    async def fetch_numpy(self, size=None):
+        return await self._connection.run(self._cursor.fetch_numpy, size)
+
+    async def fetch_arrow(self, size=None):
+        return await self._connection.run(self._cursor.fetch_arrow, size)
+
+    async def close(self):
+        await self._connection.run(self._cursor.close)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self._buffer:
+            self._buffer.extend(await self._connection.run(self._cursor.fetchmany, self.arraysize))
+            if not self._buffer:
+                raise StopAsyncIteration
+        return self._buffer.popleft()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
@@ -0,0 +1,316 @@
+"""
+Client side query result cache
+
+A ``ResultCache`` attached to a connection stores the rows of read-only queries. Executing the same query again
+(same normalized sql, parameters, current database and session settings) serves the rows from the cache instead of
+running a Hive job.
+
+    cache = ResultCache(ttl=300, directory=os.path.expanduser('~/.cache/hivejdbc'))
+    conn = hivejdbc.connect('example.com', 'default', result_cache=cache)
+
+Rows are stored when a result is read to the end with the row fetch methods (``fetchone``, ``fetchmany``,
+``fetchall``, iteration, ``stream``). Statements that write to a table (``INSERT``, ``LOAD DATA``, ``DROP``, ...)
+executed through a cached connection invalidate the cached results reading from that table, changes made by
+other clients are only noticed when entries expire.
+
+Queries calling non-deterministic functions (``rand()``, ``current_timestamp``, ...) are never cached, nor are
+queries whose tables could not be determined.
+
+The disk tier unpickles the files of its directory, it is created readable by the current user only and a directory
+owned by another user is refused.
+"""
+__all__ = ['ResultCache', 'CacheEntry']
+
+import hashlib
+import logging
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from hivejdbc import sql
+from hivejdbc.stream import row_size
+
+# one cached result, ``tables`` are the qualified names of the tables the query reads
+CacheEntry = namedtuple('CacheEntry', ['description', 'column_names', 'codes', 'rows', 'tables', 'created',
+                                       'expires', 'size'])
+
+log = logging.getLogger(__name__)
+
+
+def _freeze_params(params):
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return tuple(sorted((str(k), repr(v)) for k, v in params.items()))
+    return tuple(repr(v) for v in params)
+
+
+def _private_directory(directory):
+    """
+    Create ``directory`` readable by the current user only, cache files are unpickled so a directory others can
+    write to must not be used
+
+    :raises ValueError: the directory is not owned by the current user
+    """
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    if hasattr(os, 'getuid'):
+        stat = os.stat(directory)
+        if stat.st_uid != os.getuid():
+            raise ValueError('cache directory {} is not owned by the current user'.format(directory))
+        if stat.st_mode & 0o022:
+            raise ValueError('cache directory {} is writable by other users'.format(directory))
+
+
+class ResultCache:
+
+    def __init__(self, ttl=300.0, max_entries=256, max_bytes=64 * 1024 * 1024, max_entry_bytes=None,
+                 directory=None, max_disk_bytes=1024 * 1024 * 1024):
+        """
+        :param ttl: default seconds a result is cached, ``None`` caches results until they are invalidated or
+                    evicted. set ``cursor.cache_ttl`` to override it for the queries of a cursor
+        :param max_entries: maximum number of results held in memory
+        :param max_bytes: maximum approximate memory used by cached rows
+        :param max_entry_bytes: results larger than this are not cached, defaults to ``max_bytes / 4``
+        :param directory: directory of the on-disk tier, results evicted from memory are still served from disk.
+                          ``None`` disables the disk tier. The directory must be owned by the current user, it
+                          is created with mode ``0o700`` if it does not exist
+        :param max_disk_bytes: maximum size of the on-disk tier
+        """
+        if max_entries < 1:
+            raise ValueError('max_entries must be at least 1, got: {}'.format(max_entries))
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_bytes // 4 if max_entry_bytes is None else max_entry_bytes
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        if directory:
+            _private_directory(directory)
+
+        self._entries = OrderedDict()  # key -> CacheEntry, least recently used first
+        self._bytes = 0
+        self._invalidated = {}  # table -> time of the last invalidation, checked for entries loaded from disk
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def stats(self):
+        """
+        :return: cache counters
+        :rtype: dict
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'disk_hits': self.disk_hits,
+                'evictions': self.evictions, 'invalidations': self.invalidations,
+                'entries': len(self._entries), 'bytes': self._bytes}
+
+    @staticmethod
+    def key(operation, params=None, database=None, settings=None):
+        """
+        Build the cache key of a query
+
+        :param operation: sql text
+        :param params: query parameters
+        :param database: current database of the session
+        :param settings: ``dict`` of session settings
+        :return: cache key, ``None`` if the statement must not be cached
+        :rtype: str
+        """
+        if not sql.is_query(operation) or not sql.is_deterministic(operation):
+            return None
+        if sql.table_references(operation, database)[0] is None:
+            return None
+        identity = (sql.normalize(operation), _freeze_params(params), (database or '').lower(),
+                    tuple(sorted((settings or {}).items())))
+        return hashlib.sha256(repr(identity).encode('utf-8')).hexdigest()
+
+    def tables(self, operation, database=None):
+        """
+        :param operation: sql text of a statement with a cache key
+        :param database: current database of the session
+        :return: qualified names of the tables whose changes invalidate the result of ``operation``
+        :rtype: set
+        """
+        reads, _ = sql.table_references(operation, database)
+        return reads
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.pickle')
+
+    def _is_stale(self, entry, now):
+        if entry.expires is not None and entry.expires <= now:
+            return True
+        return any(self._invalidated.get(table, 0) >= entry.created for table in entry.tables)
+
+    def get(self, key):
+        """
+        :param key: key from ``ResultCache.key``
+        :return: the cached result, ``None`` on a miss
+        :rtype: CacheEntry
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if not self._is_stale(entry, now):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry
+                self._remove(key)
+
+            entry = self._load(key, now)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self._store_memory(key, entry)
+            return entry
+
+    def _load(self, key, now):
+        if not self.directory:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                entry = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            log.debug('discarding unreadable cache file %s: %s', path, e)
+            self._delete_file(key)
+            return None
+        if self._is_stale(entry, now):
+            self._delete_file(key)
+            return None
+        return entry
+
+    def put(self, key, description, column_names, codes, rows, tables, ttl=None, size=None):
+        """
+        Store the rows of a query
+
+        :param key: key from ``ResultCache.key``
+        :param description: cursor description
+        :param column_names: column names
+        :param codes: jdbc type codes of the columns
+        :param rows: list of rows
+        :param tables: qualified names of the tables the query reads
+        :param ttl: seconds to cache the result, defaults to ``ResultCache.ttl``
+        :param size: approximate size of the rows in bytes, computed if not given
+        :return: ``True`` if the result was stored
+        """
+        ttl = self.ttl if ttl is None else ttl
+        if ttl is not None and ttl <= 0:
+            return False
+        if size is None:
+            size = sum(row_size(row) for row in rows)
+        if size > self.max_entry_bytes:
+            return False
+
+        now = time.time()
+        entry = CacheEntry(description=description, column_names=column_names, codes=codes, rows=rows,
+                           tables=frozenset(tables), created=now, expires=None if ttl is None else now + ttl,
+                           size=size)
+        with self._lock:
+            self._store_memory(key, entry)
+        if self.directory:
+            self._store_disk(key, entry)
+        return True
+
+    def _store_memory(self, key, entry):
+        self._remove(key)
+        self._entries[key] = entry
+        self._bytes += entry.size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._bytes -= self._entries.pop(oldest).size
+            self.evictions += 1
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def _store_disk(self, key, entry):
+        path = self._path(key)
+        temp = '{}.{}.tmp'.format(path, threading.get_ident())
+        try:
+            with open(temp, 'wb') as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp, path)
+        except Exception as e:
+            log.debug('unable to write cache file %s: %s', path, e)
+            try:
+                os.remove(temp)
+            except OSError:
+                pass
+            return
+        self._trim_disk()
+
+    def _trim_disk(self):
+        files = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.pickle'):
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    def _delete_file(self, key):
+        if not self.directory:
+            return
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def invalidate(self, *tables):
+        """
+        Remove the cached results reading from any of the given tables
+
+        :param tables: table names, qualified with the database (``sales.orders``)
+        :return: number of results removed from memory, results on disk are removed when they are next read
+        :rtype: int
+        """
+        tables = {table.lower() for table in tables}
+        if not tables:
+            return 0
+        now = time.time()
+        with self._lock:
+            for table in tables:
+                self._invalidated[table] = now
+            keys = [key for key, entry in self._entries.items() if entry.tables & tables]
+            for key in keys:
+                self._remove(key)
+                self._delete_file(key)
+            self.invalidations += len(keys)
+        return len(keys)
+
+    def clear(self):
+        """remove all cached results, including the disk tier"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            if self.directory:
+                for name in os.listdir(self.directory):
+                    if name.endswith('.pickle'):
+                        try:
+                            os.remove(os.path.join(self.directory, name))
+                        except OSError:
+                            pass
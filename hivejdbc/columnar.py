@@ -0,0 +1,159 @@
+"""
+Columnar fetch path
+
+Rows are read from the ``java.sql.ResultSet`` into per-column python lists one batch at a time, using
+column readers resolved once per result-set by ``HiveTypeConversion.column_reader``. Each batch is then converted
+to numpy arrays or a pyarrow ``RecordBatch`` in bulk, keeping at most one batch of python objects alive.
+
+numpy and pyarrow are optional dependencies, they are imported when first used.
+"""
+__all__ = ['resolve_readers', 'read_batch', 'numpy_array', 'concat_numpy', 'arrow_batch', 'concat_arrow']
+
+
+def _import(module_name, extra):
+    try:
+        # a non-empty fromlist returns the submodule itself, ie: ``pyarrow.parquet``
+        return __import__(module_name, fromlist=['_'])
+    except ImportError:
+        raise ModuleNotFoundError('"{}" is required for this operation, install it with: '
+                                  '`pip install hivejdbc[{}]`'.format(module_name, extra)) from None
+
+
+def resolve_readers(resultset, metadata, type_conversion, lazy=None, columns=None):
+    """
+    Resolve a reader for every column of the result-set
+
+    Complex columns (ARRAY, MAP, STRUCT) are read as json text and decoded a whole batch at a time.
+
+    :param resultset: Java ResultSet object
+    :param metadata: Java ResultSetMetaData object
+    :param type_conversion: type conversion instance
+    :type type_conversion: hivejdbc.types.HiveTypeConversion
+    :param lazy: decode complex values lazily, defaults to the ``complex_types`` setting of ``type_conversion``
+    :param columns: column descriptors of the result-set, read from ``metadata`` if not given
+    :type columns: hivejdbc.metadata.ColumnInfo
+    :return: tuple of (jdbc type codes, column readers, batch decoders)
+    """
+    if columns is not None:
+        codes = list(columns.codes)
+        type_names = list(columns.type_names)
+    else:
+        indexes = range(1, metadata.getColumnCount() + 1)
+        codes = [int(metadata.getColumnType(column)) for column in indexes]
+        type_names = [str(metadata.getColumnTypeName(column)) for column in indexes]
+    readers = [type_conversion.column_reader(resultset, column, code, type_name, raw_complex=True)
+               for column, (code, type_name) in enumerate(zip(codes, type_names), start=1)]
+    decoders = [type_conversion.batch_decoder(code, type_name, lazy=lazy)
+                for code, type_name in zip(codes, type_names)]
+    return codes, readers, decoders
+
+
+def read_batch(resultset, readers, max_rows, decoders=None):
+    """
+    Advance the result-set by at most ``max_rows`` rows collecting values column by column
+
+    :param resultset: Java ResultSet object
+    :param readers: column readers from ``resolve_readers``
+    :param max_rows: maximum number of rows to read
+    :param decoders: batch decoders from ``resolve_readers``
+    :return: tuple of (list of column value lists, number of rows read)
+    """
+    columns = [[] for _ in readers]
+    appenders = [(values.append, read) for values, read in zip(columns, readers)]
+    advance = resultset.next
+    rows = 0
+    while rows < max_rows and advance():
+        for append, read in appenders:
+            append(read())
+        rows += 1
+
+    for idx, decode in enumerate(decoders or ()):
+        if decode is not None:
+            columns[idx] = decode(columns[idx])
+    return columns, rows
+
+
+def numpy_array(values, dtype):
+    """
+    Convert a list of column values to a numpy array
+
+    Columns with a primitive dtype containing nulls are returned as ``numpy.ma.MaskedArray``,
+    columns without a primitive dtype are stored as ``object`` arrays.
+
+    :param values: list of python values
+    :param dtype: numpy dtype name or ``None``
+    :return: numpy array
+    """
+    numpy = _import('numpy', 'numpy')
+
+    if dtype is None:
+        array = numpy.empty(len(values), dtype=object)
+        for idx, value in enumerate(values):
+            array[idx] = value
+        return array
+
+    if any(value is None for value in values):
+        mask = [value is None for value in values]
+        filled = [0 if value is None else value for value in values]
+        return numpy.ma.masked_array(numpy.array(filled, dtype=dtype), mask=mask)
+
+    return numpy.array(values, dtype=dtype)
+
+
+def concat_numpy(chunks, dtype):
+    """
+    Join per-batch arrays of a single column
+
+    :param chunks: list of numpy arrays
+    :param dtype: numpy dtype name or ``None``
+    :return: numpy array
+    """
+    numpy = _import('numpy', 'numpy')
+
+    if not chunks:
+        return numpy.array([], dtype=dtype or object)
+    if len(chunks) == 1:
+        return chunks[0]
+    if any(isinstance(chunk, numpy.ma.MaskedArray) for chunk in chunks):
+        return numpy.ma.concatenate(chunks)
+    return numpy.concatenate(chunks)
+
+
+def arrow_batch(names, columns, types):
+    """
+    Convert per-column value lists to a pyarrow ``RecordBatch``
+
+    :param names: column names
+    :param columns: list of column value lists
+    :param types: pyarrow data types, ``None`` entries are inferred from the values
+    :return: pyarrow.RecordBatch
+    """
+    pyarrow = _import('pyarrow', 'arrow')
+    arrays = [pyarrow.array(values, type=arrow_type) for values, arrow_type in zip(columns, types)]
+    return pyarrow.RecordBatch.from_arrays(arrays, names=list(names))
+
+
+def concat_arrow(names, batches, types):
+    """
+    Join record batches into a single ``Table``
+
+    Inferred column types can differ between batches (a batch of nulls for example),
+    batches are unified to a common schema before they are joined.
+
+    :param names: column names
+    :param batches: list of pyarrow.RecordBatch
+    :param types: pyarrow data types, ``None`` entries are inferred from the values
+    :return: pyarrow.Table
+    """
+    pyarrow = _import('pyarrow', 'arrow')
+
+    if not batches:
+        batches = [arrow_batch(names, [[] for _ in names], [t or pyarrow.null() for t in types])]
+
+    schemas = [batch.schema for batch in batches]
+    if all(schema.equals(schemas[0]) for schema in schemas):
+        return pyarrow.Table.from_batches(batches)
+
+    schema = pyarrow.unify_schemas(schemas)
+    tables = [pyarrow.Table.from_batches([batch]).cast(schema) for batch in batches]
+    return pyarrow.concat_tables(tables)
@@ -0,0 +1,242 @@
+"""
+Kerberos credential cache
+
+Connecting with a keytab used to log in to the KDC for every connection: the driver ran the JAAS login configured
+by ``pyjdbc.kerberos.configure_jaas`` each time a session was opened. A ``KerberosCredential`` logs in once per
+principal and keytab, connections are opened as the resulting ``javax.security.auth.Subject`` (the driver is told to
+use it with ``kerberosAuthType=fromSubject``) and the tickets are renewed on a background thread before they expire.
+
+    credential = get_credential('etl@EXAMPLE.COM', '/etc/security/etl.keytab')
+    java_conn = credential.run_as(lambda: driver.connect(url, properties))
+
+``hivejdbc.connect`` uses the cache for keytab logins unless ``kerberos_cache=False`` is given.
+"""
+__all__ = ['KerberosCredential', 'get_credential', 'configure_jaas', 'set_property']
+
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from pyjdbc import kerberos
+from pyjdbc.java import Jvm, System
+
+from hivejdbc.jvm import jvm_call
+
+# the login configuration entry written for each credential
+LOGIN_ENTRY = 'hivejdbc'
+# seconds between renewals when the ticket lifetime is unknown, and the minimum time between renewals
+DEFAULT_RENEW_SECONDS = 3600.0
+MIN_RENEW_SECONDS = 30.0
+
+_CREDENTIALS = {}
+_CREDENTIALS_LOCK = threading.Lock()
+
+_JAAS = {}
+_JAAS_LOCK = threading.Lock()
+
+log = logging.getLogger(__name__)
+
+
+def set_property(name, value):
+    """
+    Set a java system property, as a jvm argument if the jvm has not been started yet
+
+    The property is left alone if it already has this value.
+    """
+    if not Jvm.is_running():
+        Jvm.add_argument(name, '-D{}={}'.format(name, value))
+    elif System.get_property(name) != value:
+        System.set_property(name, value)
+
+
+def configure_jaas(**options):
+    """
+    ``pyjdbc.kerberos.configure_jaas``, skipped when the same configuration was applied before
+
+    :param options: keyword arguments of ``pyjdbc.kerberos.configure_jaas``
+    :return: the path of the jaas configuration
+    """
+    key = tuple(sorted(options.items()))
+    with _JAAS_LOCK:
+        path = _JAAS.get(key)
+        if path is None or not os.path.isfile(path):
+            path = kerberos.configure_jaas(**options)
+            _JAAS.clear()
+            _JAAS[key] = path
+        else:
+            set_property('java.security.auth.login.config', path)
+        return path
+
+
+class KerberosCredential:
+
+    # fraction of the ticket lifetime after which the tickets are renewed
+    renew_fraction = 0.8
+
+    def __init__(self, principal, keytab):
+        """
+        :param principal: client principal, ie: ``etl@EXAMPLE.COM``
+        :param keytab: path of the keytab of ``principal``
+        """
+        self.principal = principal
+        self.keytab = os.path.abspath(keytab)
+        self.logins = 0
+        self._subject = None
+        self._expires = None
+        self._lock = threading.Lock()
+        self._login_lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self._jaas_path = None
+
+    def jaas_text(self):
+        """
+        :return: the login configuration of this credential
+        :rtype: str
+        """
+        options = ['useKeyTab=true', 'keyTab="{}"'.format(self.keytab), 'principal="{}"'.format(self.principal),
+                   'storeKey=true', 'doNotPrompt=true', 'useTicketCache=false', 'refreshKrb5Config=true']
+        return '{} {{\n  com.sun.security.auth.module.Krb5LoginModule required\n  {};\n}};\n'.format(
+            LOGIN_ENTRY, '\n  '.join(options))
+
+    def jaas_config(self):
+        """
+        Write the login configuration to a new private temporary file, the file is reused by later logins of this
+        credential and removed by ``close()``
+
+        :return: path of the login configuration file
+        :rtype: str
+        """
+        with self._lock:
+            path = self._jaas_path
+            if path is not None and os.path.isfile(path):
+                return path
+            descriptor, path = tempfile.mkstemp(prefix='hivejdbc-jaas-', suffix='.conf')
+            with os.fdopen(descriptor, 'w') as fp:
+                fp.write(self.jaas_text())
+            self._jaas_path = path
+            return path
+
+    def _login(self):
+        """
+        Log in with the keytab
+
+        :return: tuple of (``javax.security.auth.Subject``, ticket start, ticket end) times are in epoch seconds,
+                 ``None`` if the subject has no ticket granting ticket
+        """
+        from jpype import JClass
+
+        File = JClass('java.io.File')
+        Configuration = JClass('javax.security.auth.login.Configuration')
+        config = Configuration.getInstance('JavaLoginConfig',
+                                           JClass('java.security.URIParameter')(File(self.jaas_config()).toURI()))
+        subject = JClass('javax.security.auth.Subject')()
+        JClass('javax.security.auth.login.LoginContext')(LOGIN_ENTRY, subject, None, config).login()
+
+        KerberosTicket = JClass('javax.security.auth.kerberos.KerberosTicket')
+        for ticket in subject.getPrivateCredentials(KerberosTicket):
+            if str(ticket.getServer().getName()).startswith('krbtgt/'):
+                return subject, ticket.getStartTime().getTime() / 1000, ticket.getEndTime().getTime() / 1000
+        return subject, None, None
+
+    def _renew_delay(self, start, end):
+        """seconds until tickets valid from ``start`` to ``end`` should be renewed"""
+        if start is None or end is None:
+            return DEFAULT_RENEW_SECONDS
+        renew_at = start + (end - start) * self.renew_fraction
+        return max(renew_at - time.time(), MIN_RENEW_SECONDS)
+
+    def login(self):
+        """log in to the KDC, replacing the current subject"""
+        subject, start, end = self._login()
+        with self._lock:
+            self._subject = subject
+            self._expires = end
+            self.logins += 1
+        log.debug('kerberos login for %s, tickets valid until %s', self.principal, end)
+        return self._renew_delay(start, end)
+
+    def _renew(self, delay):
+        while not self._stop.wait(delay):
+            try:
+                delay = self.login()
+            except Exception as e:
+                log.warning('kerberos renewal for %s failed, retrying in %.0f seconds: %s',
+                            self.principal, MIN_RENEW_SECONDS, e)
+                delay = MIN_RENEW_SECONDS
+
+    def subject(self):
+        """
+        The logged in subject, logging in first if needed
+
+        :return: javax.security.auth.Subject
+        """
+        with self._login_lock:
+            with self._lock:
+                subject = self._subject
+                expired = self._expires is not None and self._expires <= time.time()
+            if subject is not None and not expired:
+                return subject
+
+            delay = self.login()
+            if self._thread is None:
+                self._thread = threading.Thread(target=jvm_call, args=(self._renew, delay),
+                                                name='hivejdbc-kerberos-renew', daemon=True)
+                self._thread.start()
+            return self._subject
+
+    def run_as(self, function):
+        """
+        Call ``function`` as the logged in subject, kerberos connections opened by ``function`` use its tickets
+
+        :param function: function without arguments
+        :return: the return value of ``function``
+        """
+        from jpype import JClass, JProxy
+
+        subject = self.subject()
+        outcome = []
+
+        def run():
+            try:
+                outcome.append((True, function()))
+            except Exception as e:
+                outcome.append((False, e))
+
+        action = JProxy('java.security.PrivilegedExceptionAction', dict={'run': run})
+        JClass('javax.security.auth.Subject').doAs(subject, action)
+        succeeded, value = outcome[0]
+        if not succeeded:
+            raise value
+        return value
+
+    def close(self):
+        """stop renewing the tickets and remove the login configuration file"""
+        self._stop.set()
+        with self._lock:
+            path, self._jaas_path = self._jaas_path, None
+        if path is not None:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def __repr__(self):
+        return '{}(principal={!r}, keytab={!r})'.format(self.__class__.__name__, self.principal, self.keytab)
+
+
+def get_credential(principal, keytab):
+    """
+    Get the shared credential of a principal and keytab, creating it if needed
+
+    :rtype: KerberosCredential
+    """
+    key = (principal, os.path.abspath(keytab))
+    with _CREDENTIALS_LOCK:
+        credential = _CREDENTIALS.get(key)
+        if credential is None:
+            credential = KerberosCredential(principal, keytab)
+            _CREDENTIALS[key] = credential
+        return credential
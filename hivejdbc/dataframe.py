@@ -0,0 +1,153 @@
+"""
+pandas integration
+
+``read_dataframe`` builds DataFrame columns directly from the result-set with the columnar fetch path, column
+dtypes come from the result-set metadata instead of being inferred from python tuples as ``pandas.read_sql`` does.
+
+    df = hivejdbc.read_dataframe(conn, 'select * from test.persons')
+    for chunk in hivejdbc.read_dataframe(conn, 'select * from test.events', chunksize=100000):
+        process(chunk)
+
+pandas is an optional dependency, install it with ``pip install hivejdbc[pandas]``.
+"""
+__all__ = ['read_dataframe', 'DTYPE_BACKENDS']
+
+from hivejdbc.columnar import _import
+from hivejdbc.types import PRIMITIVE_TYPES
+
+# `numpy` uses numpy dtypes (integer columns containing nulls become float64), `numpy_nullable` uses the pandas
+# nullable extension dtypes and `pyarrow` uses ``pandas.ArrowDtype``
+DTYPE_BACKENDS = ('numpy', 'numpy_nullable', 'pyarrow')
+
+# numpy dtype of primitive columns: pandas nullable dtype
+NULLABLE_DTYPES = {
+    'bool': 'boolean',
+    'int8': 'Int8',
+    'int16': 'Int16',
+    'int32': 'Int32',
+    'int64': 'Int64',
+    'float32': 'Float32',
+    'float64': 'Float64',
+}
+
+DATETIME_TYPES = ('TIMESTAMP', 'DATE')
+
+
+def _datetimes(pandas, values, type_name):
+    # DATE values are converted to "yyyy-mm-dd" strings by `HiveTypeConversion`
+    return pandas.to_datetime(values, format='%Y-%m-%d' if type_name == 'DATE' else None).array
+
+
+def _numpy_column(pandas, values, type_name):
+    numpy = _import('numpy', 'numpy')
+    if type_name in DATETIME_TYPES:
+        return _datetimes(pandas, values, type_name)
+
+    primitive = PRIMITIVE_TYPES.get(type_name)
+    dtype = primitive[2] if primitive else None
+    has_nulls = any(value is None for value in values)
+    if dtype is not None and not has_nulls:
+        return numpy.array(values, dtype=dtype)
+    if dtype is not None and dtype != 'bool':
+        return numpy.array([numpy.nan if value is None else value for value in values], dtype='float64')
+
+    array = numpy.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+
+def _nullable_column(pandas, values, type_name):
+    if type_name in DATETIME_TYPES:
+        return _datetimes(pandas, values, type_name)
+
+    primitive = PRIMITIVE_TYPES.get(type_name)
+    if primitive is None:
+        return pandas.array(values, dtype=object)
+    if primitive[1] is str:
+        return pandas.array(values, dtype='string')
+    return pandas.array(values, dtype=NULLABLE_DTYPES[primitive[2]])
+
+
+def _arrow_column(pandas, values, type_name, arrow_type):
+    pyarrow = _import('pyarrow', 'arrow')
+    if type_name == 'DATE':
+        array = pyarrow.array(values, type=pyarrow.string()).cast(pyarrow.date32())
+    else:
+        array = pyarrow.array(values, type=arrow_type)
+    return pandas.arrays.ArrowExtensionArray(array)
+
+
+def _frame(pandas, names, columns, type_names, arrow_types, dtype_backend):
+    arrays = {}
+    for idx, (values, type_name) in enumerate(zip(columns, type_names)):
+        if dtype_backend == 'pyarrow':
+            arrays[idx] = _arrow_column(pandas, values, type_name, arrow_types[idx])
+        elif dtype_backend == 'numpy_nullable':
+            arrays[idx] = _nullable_column(pandas, values, type_name)
+        else:
+            arrays[idx] = _numpy_column(pandas, values, type_name)
+
+    # columns are keyed by position first, result-sets can contain duplicate column names
+    frame = pandas.DataFrame(arrays, copy=False)
+    frame.columns = list(names)
+    return frame
+
+
+def _frames(cursor, pandas, dtype_backend, chunked):
+    try:
+        codes, batches = cursor._column_batches(lazy=False)
+        names = cursor.column_names
+        conversion = cursor._type_conversion
+        type_names = [conversion.jdbc_name(code) for code in codes]
+        arrow_types = [conversion.arrow_type(code) for code in codes] if dtype_backend == 'pyarrow' else None
+
+        empty = True
+        for columns in batches:
+            empty = False
+            yield _frame(pandas, names, columns, type_names, arrow_types, dtype_backend)
+        if empty and not chunked:
+            yield _frame(pandas, names, [[] for _ in names], type_names, arrow_types, dtype_backend)
+    finally:
+        cursor.close()
+
+
+def read_dataframe(connection, sql, params=None, chunksize=None, dtype_backend='numpy_nullable'):
+    """
+    Run a query and return its result as a ``pandas.DataFrame``
+
+    Values are read column by column, the rows are never materialized as python tuples. Column dtypes follow
+    the column types: integer, floating point, boolean and string columns use the dtypes of ``dtype_backend``,
+    ``TIMESTAMP`` and ``DATE`` columns become ``datetime64`` (``date32`` with ``pyarrow``), decimal and complex
+    columns hold python objects (arrow decimals and nested types with ``pyarrow``).
+
+    :param connection: connection returned by ``hivejdbc.connect``
+    :param sql: sql query
+    :param params: a sequence or dictionary of parameters
+    :param chunksize: return an iterator of DataFrames of at most ``chunksize`` rows instead of a single DataFrame
+    :param dtype_backend: ``numpy``, ``numpy_nullable`` or ``pyarrow``
+    :return: DataFrame, or iterator of DataFrames if ``chunksize`` is given
+    :rtype: pandas.DataFrame
+    """
+    pandas = _import('pandas', 'pandas')
+    if dtype_backend not in DTYPE_BACKENDS:
+        raise ValueError('dtype_backend must be one of {}, got: {}'.format(DTYPE_BACKENDS, dtype_backend))
+    if chunksize is not None and chunksize < 1:
+        raise ValueError('chunksize must be `None` or at least 1, got: {}'.format(chunksize))
+
+    cursor = connection.cursor()
+    try:
+        cursor.execute(sql, params)
+        if chunksize is not None:
+            cursor.columnar_batch_size = chunksize
+    except Exception:
+        cursor.close()
+        raise
+
+    frames = _frames(cursor, pandas, dtype_backend, chunked=chunksize is not None)
+    if chunksize is not None:
+        return frames
+
+    chunks = list(frames)
+    if len(chunks) == 1:
+        return chunks[0]
+    return pandas.concat(chunks, ignore_index=True, copy=False)
@@ -0,0 +1,791 @@
+"""
+dbapi.py - Hive specific Cursor implementations extending the pyjdbc db-api-2.0 base classes
+"""
+__all__ = ['HiveConnection', 'HiveCursor', 'DictCursor']
+
+import time
+import weakref
+
+from jpype import JClass
+from pyjdbc.dbapi import JdbcConnection, JdbcCursor, JdbcDictCursor
+from pyjdbc.exceptions import DatabaseError, Error, NotSupportedError, ProgrammingError
+
+from hivejdbc import columnar, instrument, sql
+from hivejdbc.metadata import ColumnInfo
+from hivejdbc.operation import QueryHandle
+from hivejdbc.row import row_class
+from hivejdbc.statements import StatementCache
+from hivejdbc.stream import RowStream, row_size
+from hivejdbc.types import PRIMITIVE_TYPES, LazyJson
+
+class HiveConnection(JdbcConnection):
+
+    def __init__(self, connection, cursor_class, type_conversion=None, fetch_size=None, result_cache=None,
+                 database=None, listeners=(), metadata_cache=None, catalog_cache=None, session_settings=None,
+                 statement_cache_size=128):
+        """
+        :param connection: java.sql.Connection
+        :param cursor_class: pyjdbc.dbapi.JdbcCursor or subclass
+        :param type_conversion:
+        :param fetch_size: default number of rows fetched from the server per round trip by new cursors,
+                           ``None`` uses the driver default
+        :param result_cache: cache serving repeated queries, ``None`` disables caching
+        :type result_cache: hivejdbc.cache.ResultCache
+        :param database: the database the session was opened with
+        :param listeners: ``hivejdbc.instrument.Listener`` instances observing this connection only
+        :param metadata_cache: cache of the column descriptors of queries, ``None`` disables caching
+        :type metadata_cache: hivejdbc.metadata.MetadataCache
+        :param catalog_cache: cache serving repeated catalog statements (``DESCRIBE``, ``SHOW PARTITIONS``, ...),
+                              ``None`` disables caching
+        :type catalog_cache: hivejdbc.metadata.CatalogCache
+        :param session_settings: hive settings the session was opened with, ``SET`` statements are added to them
+        :param statement_cache_size: parameterized statements whose parsed sql and ``PreparedStatement`` are kept for
+                                     reuse, ``0`` disables the cache
+        """
+        super().__init__(connection, cursor_class, type_conversion=type_conversion)
+        if fetch_size is not None and fetch_size < 1:
+            raise ValueError('fetch_size must be `None` or at least 1, got: {}'.format(fetch_size))
+        self.fetch_size = fetch_size
+        self.result_cache = result_cache
+        # session state, updated by `USE` and `SET` statements executed through this connection's cursors
+        self.database = database
+        self.session_settings = dict(session_settings or {})
+        self.listeners = list(listeners or ())
+        self.metadata_cache = metadata_cache
+        self.catalog_cache = catalog_cache
+        self.statement_cache = StatementCache(statement_cache_size)
+        # the connect function and (args, kwargs) the connection was opened with, used to open further sessions
+        self.connect_function = None
+        self.connect_args = None
+
+    def executescript(self, sql_script, max_parallel=1, pool=None):
+        """
+        Run the statements of a script, statements not depending on each other run at the same time on up to
+        ``max_parallel`` sessions, see ``hivejdbc.script``
+
+        :param sql_script: statements separated by semicolons
+        :param max_parallel: maximum number of statements running at the same time
+        :param pool: pool the additional sessions are borrowed from, defaults to a pool opened with the arguments
+                     of this connection
+        :type pool: hivejdbc.pool.ConnectionPool
+        :return: the statements of the script with their timings
+        :rtype: list of hivejdbc.script.ScriptStatement
+        """
+        from hivejdbc import script
+        return script.execute_script(self, sql_script, max_parallel=max_parallel, pool=pool)
+
+    def close(self):
+        self.statement_cache.close()
+        super().close()
+
+    def caches(self):
+        """
+        :return: the caches of this connection serving or describing results
+        :rtype: list
+        """
+        return [cache for cache in (self.result_cache, self.catalog_cache, self.metadata_cache)
+                if cache is not None]
+
+
+class _ResultTee:
+    """rows of a query collected while they are fetched, stored in the result cache once all rows are read"""
+    __slots__ = ('cache', 'key', 'tables', 'rows', 'size')
+
+    def __init__(self, cache, key, tables):
+        self.cache = cache
+        self.key = key
+        self.tables = tables
+        self.rows = []
+        self.size = 0
+
+
+class HiveCursor(JdbcCursor):
+
+    # number of rows decoded per batch by the columnar fetch methods
+    columnar_batch_size = 10000
+    # `executemany` inserts: maximum rows per statement, and maximum statement length in characters
+    insert_chunk_size = 1000
+    insert_max_statement_length = 1024 * 1024
+
+    def __init__(self, connection, type_conversion, rowcounts=True):
+        super().__init__(connection, type_conversion, rowcounts=rowcounts)
+        # rows fetched from the server per round trip, set before `execute` to tune a single cursor
+        self.fetch_size = getattr(connection, 'fetch_size', None)
+        # seconds results of this cursor are kept by the connection's result cache, ``None`` uses the cache
+        # default and ``0`` disables caching for this cursor
+        self.cache_ttl = None
+        self._cached = None
+        self._cached_rows = None
+        self._tee = None
+        # (statement cache, sql text) the current statement is returned to instead of being closed
+        self._borrowed = None
+        # column descriptors and row readers of the current result set, resolved when first needed
+        self._info = None
+        self._info_key = None
+        self._info_operation = None
+        self._row_readers = None
+        # weak reference to the `stream()` reading the current result set, closed with the result set
+        self._stream = None
+        # instrumentation state, timings are only taken while listeners observe the cursor
+        self._listeners = ()
+        self._operation = None
+        self._started = None
+        self._first_row_pending = False
+        self._conversion = None
+
+    def execute(self, operation, params=None):
+        """
+        Execute a sql statement with an optional set of parameters
+
+        Hive fetches rows when the result set is first read, so ``fetch_size`` is applied to the result set
+        after the statement runs.
+
+        If the connection has a result cache, cached results of queries are returned without running the query.
+
+        :param operation: Sql text
+        :param params: a sequence or dictionary of parameters
+                       Parameters can be positional templates ``%s`` or named templates ``:name``
+        """
+        self._finish_conversion()
+        observers = instrument.listeners(self._connection)
+        self._listeners = observers
+        self._first_row_pending = False
+        if not observers:
+            return self._execute(operation, params)
+
+        self._operation = operation
+        started = time.perf_counter()
+        try:
+            self._execute(operation, params)
+        except Exception as e:
+            instrument.emit(observers, 'on_execute', self, operation, time.perf_counter() - started, error=e)
+            raise
+        instrument.emit(observers, 'on_execute', self, operation, time.perf_counter() - started)
+        self._started = started
+        self._first_row_pending = True
+        self._conversion = {}
+
+    def _execute(self, operation, params):
+        connection = self._connection
+        cache, key = self._cache_key(operation, params)
+        if key is not None and self._serve_cached(cache, key):
+            return
+
+        self._execute_statement(operation, params)
+        if self._resultset is not None and self.fetch_size:
+            self._resultset.setFetchSize(self.fetch_size)
+
+        self._track_session(operation)
+        if self._resultset is not None:
+            metadata_cache = getattr(connection, 'metadata_cache', None)
+            if metadata_cache is not None:
+                # keyed by the session state the query ran with
+                self._info_key = metadata_cache.key(operation, connection.database, connection.session_settings)
+                self._info_operation = operation
+            if key is not None:
+                self._tee = _ResultTee(cache, key, cache.tables(operation, connection.database))
+
+    def _execute_statement(self, operation, params):
+        """execute ``operation``, parameterized statements are prepared through the connection's statement cache"""
+        cache = getattr(self._connection, 'statement_cache', None)
+        if params is None or cache is None:
+            return super().execute(operation, params)
+
+        if not self._connection_valid():
+            raise Error('the connection has been closed')
+        self._reset()
+        if not params:
+            raise ValueError('params must be `None` or a non empty sequence or dictionary, got: {}'.format(params))
+        self._check_params(params)
+
+        parsed = cache.parse(operation, params)
+        values = parsed.bind(params)
+        self._statement = statement = cache.acquire(self._connection.jdbc_connection(), parsed.sql)
+        self._borrowed = (cache, parsed.sql)
+        statement.clearParameters()
+        parsed.set_parameters(statement, values, self._type_conversion)
+        try:
+            has_resultset = statement.execute()
+        except JClass('org.apache.hive.service.cli.HiveSQLException') as e:
+            raise ProgrammingError('Error executing statement:\n{}\n{}'.format(operation, e)) from None
+
+        self._rowcount = -1
+        if has_resultset:
+            self._resultset = resultset = statement.getResultSet()
+            self._metadata = resultset.getMetaData()
+            if self._get_rowcounts:
+                try:
+                    if resultset.last():  # if the cursor can be moved to the last row.
+                        self._rowcount = resultset.getRow()
+                    resultset.beforeFirst()
+                except JClass('java.sql.SQLException'):
+                    # ResultSet.last() is not supported
+                    pass
+        else:
+            try:
+                self._rowcount = statement.getUpdateCount()
+            except JClass('java.sql.SQLException'):
+                # not supported
+                pass
+
+    def _close_statement(self):
+        borrowed = self._borrowed
+        if borrowed is None:
+            return super()._close_statement()
+        # the result set is closed before the statement can be used by another cursor
+        self._close_resultset()
+        statement = self._statement
+        self._statement = None
+        self._borrowed = None
+        borrowed[0].release(borrowed[1], statement)
+
+    def _cache_key(self, operation, params):
+        """the cache serving the results of ``operation`` and its key, ``(None, None)`` if it is not cached"""
+        connection = self._connection
+        if self.cache_ttl == 0:
+            return None, None
+        for cache in (getattr(connection, 'result_cache', None), getattr(connection, 'catalog_cache', None)):
+            if cache is not None:
+                key = cache.key(operation, params, connection.database, connection.session_settings)
+                if key is not None:
+                    return cache, key
+        return None, None
+
+    def _serve_cached(self, cache, key):
+        """read the result from the cache, returns ``False`` on a miss"""
+        entry = cache.get(key)
+        if entry is None:
+            return False
+        self._reset()
+        self._cached = entry
+        self._cached_rows = iter(entry.rows)
+        # as reported when the query runs, Hive result sets cannot be scrolled to count their rows
+        self._rowcount = -1
+        return True
+
+    def columns(self, table, database=None):
+        """
+        Describe the columns of a table with ``DatabaseMetaData.getColumns()``, the description is read through
+        this cursor like the result of a query: one row per column with the fields defined by jdbc
+        (``TABLE_SCHEM``, ``TABLE_NAME``, ``COLUMN_NAME``, ``DATA_TYPE``, ``TYPE_NAME``, ...)
+
+        Results are served from the connection's catalog cache when it has one.
+
+        :param table: table name, optionally qualified with the database: ``db.table``
+        :param database: database of the table, defaults to the current database
+        :return: this cursor
+        """
+        if not self._connection_valid():
+            raise Error('the connection has been closed')
+        if '.' in table:
+            database, table = table.split('.', 1)
+        database = database or self._connection.database
+        qualified = '{}.{}'.format(database, table).lower() if database else table.lower()
+
+        cache = getattr(self._connection, 'catalog_cache', None)
+        key = cache.columns_key(qualified) if cache is not None and self.cache_ttl != 0 else None
+        if key is not None and self._serve_cached(cache, key):
+            return self
+
+        self._finish_conversion()
+        self._reset()
+        self._listeners = ()
+        self._resultset = resultset = self._connection.jdbc_connection().getMetaData().getColumns(
+            None, database, table, '%')
+        self._metadata = resultset.getMetaData()
+        self._rowcount = -1
+        if key is not None:
+            self._tee = _ResultTee(cache, key, {qualified})
+        return self
+
+    def execute_async(self, operation, params=None):
+        """
+        Submit a sql statement without waiting for it to complete
+
+        Returns once Hive has compiled the statement, use the returned handle to follow the query and
+        ``handle.result()`` to read its rows through this cursor. Results are not served from or stored in the
+        result cache. Requires the Hive 2.2 (or later) jdbc driver.
+
+        :param operation: Sql text
+        :param params: a sequence or dictionary of parameters, rendered as Hive literals
+                       Parameters can be positional templates ``%s`` or named templates ``:name``
+        :return: handle of the running query
+        :rtype: hivejdbc.operation.QueryHandle
+        """
+        if not self._connection_valid():
+            raise Error('the connection has been closed')
+        if params is not None:
+            operation, _ = sql.render(operation, params, self._type_conversion.sql_literal)
+
+        statement = self._connection.jdbc_connection().createStatement()
+        if self.fetch_size:
+            statement.setFetchSize(self.fetch_size)
+
+        observers = instrument.listeners(self._connection)
+        started = time.perf_counter()
+        try:
+            has_resultset = statement.executeAsync(operation)
+        except AttributeError:
+            statement.close()
+            raise NotSupportedError('asynchronous execution requires the Hive 2.2 (or later) jdbc driver') from None
+        except Exception as e:
+            statement.close()
+            instrument.emit(observers, 'on_execute', self, operation, time.perf_counter() - started, error=e)
+            raise DatabaseError('Error executing statement:\n{}\n{}'.format(operation, e)) from None
+
+        return QueryHandle(self, statement, operation, bool(has_resultset), listeners=observers, started=started)
+
+    def _attach_result(self, statement, operation, has_resultset, rowcount, listeners, started):
+        """read the result of a completed asynchronous query through this cursor"""
+        self._finish_conversion()
+        self._reset()
+        self._statement = statement
+        self._rowcount = -1
+        if has_resultset:
+            self._resultset = resultset = statement.getResultSet()
+            self._metadata = resultset.getMetaData()
+        else:
+            self._rowcount = rowcount
+
+        self._track_session(operation)
+        self._listeners = listeners
+        if listeners:
+            self._operation = operation
+            self._started = started
+            self._first_row_pending = has_resultset
+            self._conversion = {}
+
+    def _track_session(self, operation):
+        """follow `USE` and `SET` statements and invalidate cached results of tables written by `operation`"""
+        connection = self._connection
+        if not isinstance(connection, HiveConnection):
+            return
+
+        database = sql.parse_use(operation)
+        if database is not None:
+            connection.database = database
+            return
+
+        setting = sql.parse_set(operation)
+        if setting is not None:
+            connection.session_settings[setting[0]] = setting[1]
+            return
+
+        caches = connection.caches()
+        if caches:
+            _, writes = sql.table_references(operation, connection.database)
+            if writes:
+                for cache in caches:
+                    cache.invalidate(*writes)
+
+    def _close_stream(self):
+        """stop the prefetch thread of the stream reading the current result set"""
+        stream = self._stream() if self._stream is not None else None
+        self._stream = None
+        if stream is not None:
+            stream.close()
+
+    def _reset(self):
+        self._close_stream()
+        self._cached = None
+        self._tee = None
+        self._info = None
+        self._info_key = None
+        self._info_operation = None
+        self._row_readers = None
+        super()._reset()
+
+    def close(self):
+        self._close_stream()
+        self._finish_conversion()
+        self._cached = None
+        self._tee = None
+        self._info = None
+        self._row_readers = None
+        super().close()
+
+    def _resultset_valid(self):
+        return self._cached is not None or super()._resultset_valid()
+
+    def fetchone(self):
+        if self._cached is not None:
+            row = next(self._cached_rows, None)
+        else:
+            row = self._read_row()
+
+        if self._first_row_pending:
+            self._first_row_pending = False
+            if row is not None:
+                instrument.emit(self._listeners, 'on_first_row', self, self._operation,
+                                time.perf_counter() - self._started)
+
+        tee = self._tee
+        if tee is not None:
+            if row is None:
+                self._tee = None
+                tee.cache.put(tee.key, self.description, self.column_names, self._column_codes(), tee.rows,
+                              tee.tables, ttl=self.cache_ttl, size=tee.size)
+            else:
+                tee.rows.append(row)
+                tee.size += row_size(row)
+                if tee.size > tee.cache.max_entry_bytes:
+                    # too large to cache, stop collecting rows
+                    self._tee = None
+        return row
+
+    def _read_row(self):
+        """read and convert the next row of the result set"""
+        if not self._resultset_valid():
+            raise DatabaseError('result set is no longer valid ' + self._warnings())
+
+        readers = self._row_readers
+        if readers is None:
+            readers = self._row_readers = self._resolve_row_readers()
+
+        if not self._resultset.next():
+            self._finish_conversion()
+            return None
+        return tuple([read() for read in readers])
+
+    def _resolve_row_readers(self):
+        """column readers of the current result set, timing conversions while listeners observe the cursor"""
+        info = self._column_info()
+        resultset = self._resultset
+        conversion = self._type_conversion
+        readers = [conversion.row_reader(resultset, column, code) for column, code in enumerate(info.codes, start=1)]
+        if self._conversion is not None:
+            readers = [self._timed_reader(read, code) for read, code in zip(readers, info.codes)]
+        return readers
+
+    def _column_info(self):
+        """
+        The column descriptors of the current result set, from the connection's metadata cache when the query
+        was executed before
+
+        :rtype: hivejdbc.metadata.ColumnInfo
+        """
+        if self._info is not None or not self._metadata:
+            return self._info
+
+        metadata = self._metadata
+        connection = self._connection
+        cache = getattr(connection, 'metadata_cache', None)
+        key = self._info_key
+
+        info = cache.get(key) if key is not None else None
+        # rows are read by column type, the types guard against results whose shape changed since the query was
+        # cached by a change made by another client
+        if info is not None and (len(info.codes) != metadata.getColumnCount() or
+                                 any(int(metadata.getColumnType(column)) != code
+                                     for column, code in enumerate(info.codes, start=1))):
+            info = None
+        if info is None:
+            info = ColumnInfo.read(metadata, self._type_conversion)
+            if key is not None:
+                reads, _ = sql.table_references(self._info_operation, connection.database)
+                cache.put(key, info, reads)
+        self._info = info
+        return info
+
+    def _finish_conversion(self):
+        """report the conversion timings of the current result to the listeners"""
+        conversion = self._conversion
+        self._conversion = None
+        if not conversion:
+            return
+
+        timings = {}
+        for code, (values, seconds) in conversion.items():
+            name = self._type_conversion.jdbc_name(code) or str(code)
+            total_values, total_seconds = timings.get(name, (0, 0.0))
+            timings[name] = (total_values + values, total_seconds + seconds)
+        instrument.emit(self._listeners, 'on_conversion', self, self._operation, timings)
+
+    def _fetched(self, rows, seconds):
+        """report a batch of fetched rows to the listeners"""
+        instrument.emit(self._listeners, 'on_fetch', self, self._operation, len(rows), seconds,
+                        sum(row_size(row) for row in rows))
+
+    def _column_codes(self):
+        return list(self._column_info().codes)
+
+    @property
+    def description(self):
+        if self._cached is not None:
+            return self._cached.description
+        info = self._column_info()
+        return info.description if info is not None else None
+
+    @property
+    def column_names(self):
+        if self._cached is not None:
+            return self._cached.column_names
+        info = self._column_info()
+        return info.column_names if info is not None else None
+
+    def fetchmany(self, size=None):
+        """
+        Fetch the next ``size`` rows, ``size`` defaults to ``batch_size``
+
+        When ``fetch_size`` is set the result set fetch size is left alone, otherwise each call fetches ``size``
+        rows from the server as ``pyjdbc.dbapi.JdbcCursor.fetchmany`` does.
+        """
+        if not self._listeners:
+            return self._fetchmany(size)
+        started = time.perf_counter()
+        rows = self._fetchmany(size)
+        self._fetched(rows, time.perf_counter() - started)
+        return rows
+
+    def _fetchmany(self, size):
+        if not self.fetch_size and self._cached is None:
+            return super().fetchmany(size)
+
+        if not self._resultset_valid():
+            raise DatabaseError('result set is no longer valid ' + self._warnings())
+
+        rows = []
+        for _ in range(self.batch_size if size is None else size):
+            row = self.fetchone()
+            if row is None:
+                break
+            rows.append(row)
+        return rows
+
+    def fetchall(self):
+        if not self._listeners:
+            return super().fetchall()
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(rows, time.perf_counter() - started)
+        return rows
+
+    def stream(self, batch_rows=1000, max_bytes=None, prefetch=True):
+        """
+        Iterate over the remaining rows in batches with bounded memory
+
+        The next batch is fetched on a background thread while the current batch is processed, the cursor must
+        not be used for anything else until the stream is exhausted or closed. At most three batches are held in
+        memory at once. Executing or closing the cursor closes the stream.
+
+        :param batch_rows: maximum rows per batch
+        :param max_bytes: maximum approximate size of a batch in bytes, ``None`` limits batches by rows only
+        :param prefetch: fetch the next batch on a background thread
+        :return: iterator of row lists, reporting ``rows``, ``batches``, ``elapsed`` and ``rows_per_second``
+        :rtype: hivejdbc.stream.RowStream
+        """
+        if not self._resultset_valid():
+            raise DatabaseError('result set is no longer valid ' + self._warnings())
+        self._close_stream()
+        on_batch = self._fetched if self._listeners else None
+        stream = RowStream(self.fetchone, batch_rows=batch_rows, max_bytes=max_bytes, prefetch=prefetch,
+                           on_batch=on_batch)
+        # a weak reference, the stream stops its thread when the caller drops it
+        self._stream = weakref.ref(stream)
+        return stream
+
+    def _column_batches(self, size=None, lazy=None, batch_rows=None, decode=True):
+        """
+        Read the remaining rows (or at most ``size`` rows) of the result set one column batch at a time
+
+        :param size: maximum number of rows to read, ``None`` reads all remaining rows
+        :param lazy: decode complex values lazily, defaults to the connections ``complex_types`` setting
+        :param batch_rows: maximum rows per batch, defaults to ``columnar_batch_size``
+        :param decode: ``False`` returns complex values read from the server as json text
+        :return: tuple of (jdbc type codes, generator of column value lists)
+        """
+        batch_rows = batch_rows or self.columnar_batch_size
+        if not self._resultset_valid():
+            raise DatabaseError('result set is no longer valid ' + self._warnings())
+
+        if self._cached is not None:
+            return self._cached_column_batches(size, batch_rows)
+
+        # rows read column by column are not collected for the result cache
+        self._tee = None
+        resultset = self._resultset
+        codes, readers, decoders = columnar.resolve_readers(resultset, self._metadata, self._type_conversion, lazy,
+                                                            columns=self._column_info())
+        if not decode:
+            decoders = None
+        observed = bool(self._listeners)
+        if self._conversion is not None:
+            readers = [self._timed_reader(read, code) for read, code in zip(readers, codes)]
+
+        def batches():
+            remaining = size
+            while remaining is None or remaining > 0:
+                max_rows = batch_rows if remaining is None else min(remaining, batch_rows)
+                started = time.perf_counter() if observed else None
+                columns, count = columnar.read_batch(resultset, readers, max_rows, decoders)
+                if count:
+                    if observed:
+                        instrument.emit(self._listeners, 'on_fetch', self, self._operation, count,
+                                        time.perf_counter() - started, sum(row_size(column) for column in columns))
+                    yield columns
+                if count < max_rows:
+                    break
+                if remaining is not None:
+                    remaining -= count
+            self._finish_conversion()
+
+        return codes, batches()
+
+    def _timed_reader(self, read, jdbc_type):
+        """wrap a column reader timing its conversions for ``on_conversion``"""
+        counts = self._conversion.setdefault(jdbc_type, [0, 0.0])
+
+        def timed_read():
+            started = time.perf_counter()
+            value = read()
+            counts[1] += time.perf_counter() - started
+            counts[0] += 1
+            return value
+        return timed_read
+
+    def _cached_column_batches(self, size=None, batch_rows=None):
+        """column batches of a cached result, values are converted to the types the columnar readers return"""
+        batch_rows = batch_rows or self.columnar_batch_size
+        codes = list(self._cached.codes)
+        casts = []
+        for code in codes:
+            primitive = PRIMITIVE_TYPES.get(self._type_conversion.jdbc_name(code))
+            casts.append(primitive[1] if primitive else None)
+
+        def convert(value, cast):
+            if value is None:
+                return None
+            if isinstance(value, LazyJson):
+                return value.value
+            return cast(value) if cast is not None else value
+
+        def batches():
+            remaining = size
+            while remaining is None or remaining > 0:
+                max_rows = batch_rows if remaining is None else min(remaining, batch_rows)
+                rows = [row for _, row in zip(range(max_rows), self._cached_rows)]
+                if rows:
+                    yield [[convert(value, cast) for value in column] for column, cast in zip(zip(*rows), casts)]
+                if len(rows) < max_rows:
+                    break
+                if remaining is not None:
+                    remaining -= len(rows)
+
+        return codes, batches()
+
+    def executemany(self, operation, seq_of_parameters):
+        """
+        Execute a statement once for each set of parameters
+
+        ``INSERT INTO ... VALUES (...)`` statements are rewritten into multi-row inserts of at most
+        ``insert_chunk_size`` rows and ``insert_max_statement_length`` characters, Hive compiles and runs a job
+        for every statement so this avoids one job per row. Values are rendered as Hive literals by
+        ``HiveTypeConversion.sql_literal``, rows containing ``list``, ``dict`` or named tuple values are inserted
+        with ``INSERT INTO ... SELECT`` because Hive does not allow functions within ``VALUES``.
+
+        Other statements are executed once per parameter set.
+
+        :param operation: Sql text
+        :param seq_of_parameters: a sequence of sequences containing parameters to pass into `operation`
+                                  Parameters can be positional templates ``%s`` or named templates ``:name``
+        :return:
+        """
+        template = sql.parse_insert(operation)
+        if template is None:
+            return super().executemany(operation, seq_of_parameters)
+
+        conversion = self._type_conversion
+        statements = template.statements(seq_of_parameters,
+                                         literal=conversion.sql_literal,
+                                         is_constant=conversion.is_constant,
+                                         chunk_size=self.insert_chunk_size,
+                                         max_length=self.insert_max_statement_length)
+        rowcount = 0
+        for statement in statements:
+            self.execute(statement)
+            if self._rowcount > 0:
+                rowcount += self._rowcount
+
+        self._rowcount = rowcount if self._get_rowcounts else -1
+
+    def fetch_numpy(self, size=None):
+        """
+        Fetch the remaining rows as numpy arrays, one array per column
+
+        Column dtypes are chosen by ``HiveTypeConversion.numpy_dtype``, primitive columns containing nulls
+        are returned as masked arrays, all other columns use the ``object`` dtype.
+
+        :param size: maximum number of rows to fetch, ``None`` fetches all remaining rows
+        :return: dictionary of numpy arrays keyed by column name
+        :rtype: dict
+        """
+        codes, batches = self._column_batches(size)
+        names = self.column_names
+        dtypes = [self._type_conversion.numpy_dtype(code) for code in codes]
+
+        chunks = [[] for _ in names]
+        for columns in batches:
+            for column_chunks, values, dtype in zip(chunks, columns, dtypes):
+                column_chunks.append(columnar.numpy_array(values, dtype))
+
+        return {name: columnar.concat_numpy(column_chunks, dtype)
+                for name, column_chunks, dtype in zip(names, chunks, dtypes)}
+
+    def fetch_arrow(self, size=None):
+        """
+        Fetch the remaining rows as a ``pyarrow.Table``
+
+        Column types are chosen by ``HiveTypeConversion.arrow_type``, types without a fixed mapping are inferred
+        from the values.
+
+        :param size: maximum number of rows to fetch, ``None`` fetches all remaining rows
+        :return: arrow table
+        :rtype: pyarrow.Table
+        """
+        # arrow needs decoded values to infer nested types
+        codes, batches = self._column_batches(size, lazy=False)
+        names = self.column_names
+        types = [self._type_conversion.arrow_type(code) for code in codes]
+
+        record_batches = [columnar.arrow_batch(names, columns, types) for columns in batches]
+        return columnar.concat_arrow(names, record_batches, types)
+
+    def export(self, path, format='parquet', row_group_rows=100000, compression=None, schema=None, header=True,
+               queue_size=2):
+        """
+        Write the remaining rows to a Parquet, csv or json lines file, see ``hivejdbc.export.export``
+
+        Rows are fetched and written one batch of ``row_group_rows`` rows at a time on separate threads, memory use
+        does not grow with the size of the result.
+
+        :return: number of rows written
+        :rtype: int
+        """
+        from hivejdbc import export
+        return export.export(self, path, format=format, row_group_rows=row_group_rows, compression=compression,
+                             schema=schema, header=header, queue_size=queue_size)
+
+
+class DictCursor(JdbcDictCursor, HiveCursor):
+    """
+    Cursor returning ``hivejdbc.row.Row`` rows: tuples whose values are also read by column name, ``row['name']``
+    or ``row.name``. ``row.asdict()`` converts a row to a plain ``dict``.
+    """
+
+    def __init__(self, connection, type_conversion, rowcounts=True):
+        super().__init__(connection, type_conversion, rowcounts=rowcounts)
+        self._row_class = None
+
+    def _reset(self):
+        self._row_class = None
+        super()._reset()
+
+    def fetchone(self):
+        row = HiveCursor.fetchone(self)
+        if row is None:
+            return None
+        make_row = self._row_class
+        if make_row is None:
+            # one class per result set, the rows only hold their values
+            make_row = self._row_class = row_class(self.column_names)
+        return make_row(row)
@@ -0,0 +1,614 @@
+"""
+driver.py - the ``connect`` function, its argument parser and jdbc url construction
+
+Importing this module imports JPype, ``hivejdbc`` imports it on first use.
+"""
+__all__ = ['connect', 'HiveConnect', 'HiveArgParser', 'check_server', 'DRIVER_CLASS']
+
+import contextlib
+import logging
+import threading
+import time
+from os.path import abspath, isfile
+import getpass
+from urllib.parse import quote
+
+from jpype import JClass
+
+from pyjdbc.connect import ArgumentParser, ArgumentOpts, ConnectFunction, ConnectArguments, Decorator
+from pyjdbc.java import Properties, Jvm, System
+from pyjdbc.dbapi import JdbcConnection, JdbcCursor
+from pyjdbc.exceptions import Error
+from pyjdbc import kerberos
+
+from hivejdbc import credentials, failover, instrument, jvm, tuning
+from hivejdbc.cache import ResultCache
+from hivejdbc.metadata import CatalogCache, MetadataCache
+from hivejdbc.network import check_server
+from hivejdbc.types import HiveTypeConversion
+from hivejdbc.dbapi import HiveConnection, HiveCursor
+
+DRIVER_CLASS = 'org.apache.hive.jdbc.HiveDriver'
+
+# connects currently applying `login_timeout`, and the jvm login timeout to restore once none is
+_LOGIN_TIMEOUT = {'active': 0, 'saved': 0}
+_LOGIN_TIMEOUT_LOCK = threading.Lock()
+
+# errors:
+# java.lang.RuntimeException: java.lang.RuntimeException: Illegal Hadoop Version: Unknown (expected A.B.* format)
+#    see: https://community.cloudera.com/t5/Community-Articles/Connecting-DbVisualizer-and-DataGrip-to-Hive-with-Kerberos/ta-p/248539
+#    see: https://github.com/timveil/hive-jdbc-uber-jar/blob/master/src/main/java/org/apache/hadoop/util/VersionInfo.java
+# java.security.UnrecoverableKeyException: java.security.UnrecoverableKeyException: Password verification failed
+# Caused by: org.ietf.jgss.GSSException: No valid credentials provided (Mechanism level: Failed to find any Kerberos tgt
+# javax.net.ssl.SSLHandshakeException: PKIX path building failed: sun.security.provider.certpath.SunCertPathBuilderException: unable to find valid certification path to requested target
+# Caused by: org.ietf.jgss.GSSException: No valid credentials provided (Mechanism level: Attempt to obtain new INITIATE credentials failed! (null))
+# -- when a ticket cannot be found.
+# org.apache.thrift.transport.TTransportException: org.apache.thrift.transport.TTransportException: javax.net.ssl.SSLHandshakeException: Remote host terminated the handshake
+# -- when trust-store is bad
+
+# org.apache.hive.service.cli.HiveSQLException: org.apache.hive.service.cli.HiveSQLException:
+# Error while compiling statement: FAILED: SemanticException [Error 10293]:
+# Unable to create temp file for insert values Expression of type TOK_FUNCTION not supported in insert/values
+# -- when user attempts to directly insert an array value
+#    `HiveCursor.executemany` inserts rows containing complex values with INSERT ... SELECT instead
+
+
+@contextlib.contextmanager
+def _login_timeout(driver_manager, seconds):
+    """
+    Apply ``DriverManager.setLoginTimeout`` while a connection is opened
+
+    The login timeout is global to the jvm, the value found by the first of concurrent connects is restored by the
+    last of them.
+
+    :param driver_manager: ``java.sql.DriverManager`` class
+    :param seconds: login timeout of the connection
+    """
+    with _LOGIN_TIMEOUT_LOCK:
+        if not _LOGIN_TIMEOUT['active']:
+            _LOGIN_TIMEOUT['saved'] = driver_manager.getLoginTimeout()
+        _LOGIN_TIMEOUT['active'] += 1
+        driver_manager.setLoginTimeout(seconds)
+    try:
+        yield
+    finally:
+        with _LOGIN_TIMEOUT_LOCK:
+            _LOGIN_TIMEOUT['active'] -= 1
+            if not _LOGIN_TIMEOUT['active']:
+                driver_manager.setLoginTimeout(_LOGIN_TIMEOUT['saved'])
+
+
+class HiveArgParser(ArgumentParser):
+    host = ArgumentOpts(position=0, argtype=str, description='Hive Host, ie: `example.org`, can also be a comma'
+                                                             'separated list of hosts to attempt')
+    database = ArgumentOpts(position=1, argtype=str, description='Database name to connect to, `default`')
+    port = ArgumentOpts(argtype=int, default=10000, description='Hive port, deafults to `10000`')
+    driver = ArgumentOpts(argtype=str, description='Location to hive uber-jar (not required if Hive, Hadoop jars '
+                                                   'are on the classpath already)')
+    cursor = ArgumentOpts(argtype=JdbcCursor, description='cursor class for queries')
+    ssl = ArgumentOpts(argtype=bool, description='enable ssl connection mode, if the server is running with '
+                                                 'ssl certificates enabled this is required')
+    trust_password = ArgumentOpts(argtype=str, secret=True, requires=['trust_store', 'ssl'])
+    user = ArgumentOpts(argtype=str, description='Hive username if using username/password auth')
+    password = ArgumentOpts(argtype=str, secret=True, requires=['user'], description='Hive basic auth password')
+    user_principal = ArgumentOpts(argtype=str, description='Kerberos user principal', requires=['user_keytab'])
+    realm = ArgumentOpts(argtype=str, description='Kerberos realm (domain), if set, "realm" must also be set,'
+                                                  'normally this value can be obtained automatically '
+                                                  'from "default_realm" within krb5.conf',
+                         requires=['principal', 'user_keytab', 'kdc'])
+    properties = ArgumentOpts(argtype=dict, default={},
+                              description='properties passed to org.apache.hive.jdbc.HiveDriver "connect" method')
+    transport = ArgumentOpts(argtype=str, default='binary', choices=('binary', 'http'))
+    http_path = ArgumentOpts(argtype=str, description='HTTP endpoint for when HiveServer2 is running in HTTP mode.\n'
+                                                      'this is a rarely used option. Only set this if `transport` '
+                                                      'is set to `binary`')
+    init_file = ArgumentOpts(argtype=str, description='This script file is written with SQL statements which will be '
+                                                      'executed automatically after connection')
+    service_discovery_mode = ArgumentOpts(argtype=str, choices=['zooKeeper'], requires=['zookeeper_namespace'],
+                                          description='If using zookeeper service discovery you must set this')
+    zookeeper_namespace = ArgumentOpts(argtype=str,
+                                       requires=['service_discovery_mode'],
+                                       description='Zookeeper namespace string for service discovery')
+    json_backend = ArgumentOpts(argtype=str, default='auto', choices=('auto', 'orjson', 'simdjson', 'json'),
+                                description='json library used to decode ARRAY, MAP and STRUCT columns, `auto` '
+                                            'uses the fastest installed library')
+    complex_types = ArgumentOpts(argtype=str, default='eager', choices=('eager', 'lazy'),
+                                 description='`lazy` returns ARRAY, MAP and STRUCT values as proxies that are only '
+                                             'decoded when accessed')
+    result_cache = ArgumentOpts(argtype=ResultCache, description='`hivejdbc.cache.ResultCache` serving repeated '
+                                                                  'read-only queries without running them again')
+    catalog_cache = ArgumentOpts(argtype=CatalogCache, description='`hivejdbc.metadata.CatalogCache` serving repeated '
+                                                                    '`DESCRIBE`, `SHOW PARTITIONS`, `SHOW TABLES` and '
+                                                                    '`cursor.columns()` results')
+    metadata_cache = ArgumentOpts(argtype=MetadataCache, description='`hivejdbc.metadata.MetadataCache` keeping the '
+                                                                      'column descriptors of queries, not cached by '
+                                                                      'default')
+    statement_cache_size = ArgumentOpts(argtype=int, default=128,
+                                        description='parameterized statements whose parsed sql and jdbc '
+                                                    '`PreparedStatement` are kept for reuse, `0` disables the cache')
+    fetch_size = ArgumentOpts(argtype=int, description='rows fetched from the server per round trip, larger values '
+                                                       'reduce round trips for big results at the cost of memory')
+    host_selection = ArgumentOpts(argtype=str, default='latency', choices=failover.STRATEGIES,
+                                  description='how a host is chosen from a comma separated host list, `latency` '
+                                              'prefers the fastest host, `round_robin` spreads connections')
+    connect_timeout = ArgumentOpts(argtype=float, description='seconds the reachability check of a host may take, '
+                                                              'defaults to 10 seconds, 2 seconds for host lists')
+    probe = ArgumentOpts(argtype=bool, default=True, description='check the server accepts connections before the '
+                                                                 'driver connects, `False` skips the check for '
+                                                                 'servers known to be up')
+    login_timeout = ArgumentOpts(argtype=int, description='seconds the driver may take to open the session, '
+                                                          'applied with `java.sql.DriverManager.setLoginTimeout` '
+                                                          'while the connection is opened')
+    kerberos_cache = ArgumentOpts(argtype=bool, default=True,
+                                  description='log in once per `user_principal` and `user_keytab`, sharing and '
+                                              'renewing the tickets for all connections, `False` logs in for '
+                                              'every connection')
+    listeners = ArgumentOpts(argtype=list, description='`hivejdbc.instrument.Listener` instances receiving timings '
+                                                       'of this connection and its queries')
+
+    @Decorator.argument(argtype=str, requires=['trust_password', 'ssl'])
+    def trust_store(self, path):
+        """Path to the java ssl trust-store, generally required if ssl=True"""
+        if not isinstance(path, str):
+            raise ValueError('expected `str`, got: {}'.format(type(path)))
+
+        if not isfile(path):
+            raise ValueError('not a valid file')
+        return path
+
+    @Decorator.argument(argtype=str, excludes=['username', 'password'])
+    def principal(self, user):
+        """Hive SERVICE principal, usually "hive" - should be fully qualified: `hive@EXAMPLE.COM`"""
+        if not isinstance(user, str):
+            raise ValueError('expected `str`, got: {}'.format(type(user)))
+
+        credentials.set_property('javax.security.auth.useSubjectCredsOnly', 'false')
+        return user
+
+    @Decorator.argument(argtype=str, requires=['principal', 'user_principal'])
+    def user_keytab(self, path):
+        """Kerberos keytab - if provided the module will attempt kerberos login without the need for ``kinit``"""
+        if not isinstance(path, str):
+            raise ValueError('expected `str`, got: {}'.format(type(path)))
+
+        if not isfile(path):
+            raise ValueError('not a valid file')
+        return path
+
+    @Decorator.argument(argtype=str, requires=['principal'])
+    def krb5_conf(self, path):
+        """Kerberos krb5.conf - default locations for the file are platform dependent
+         or set via environment variable: "KRB5_CONFIG" - if your configuration is in a default location you
+         typically do not need to explicitly provide this configuration."""
+        if not isinstance(path, str):
+            raise ValueError('expected `str`, got: {}'.format(type(path)))
+
+        credentials.set_property('java.security.krb5.conf', path)
+
+        if not isfile(path):
+            raise ValueError('not a valid file')
+        return path
+
+    @Decorator.argument(argtype=str, requires=['principal', 'user_principal', 'user_keytab'])
+    def kdc(self, kdc_host):
+        """Kerberos kdc hostname:port combination"""
+        if not isinstance(kdc_host, str):
+            raise ValueError('expecting `str`, got: {}'.format(type(kdc_host)))
+
+        if ':' not in kdc_host or len(kdc_host.split(':')) != 2 or not str(kdc_host.split(':')[-1]).isdigit():
+            raise ValueError('kdc must contain a host and numerical port separated by ":", '
+                             'kdc invalid: {}'. format(kdc_host))
+
+        credentials.set_property('java.security.krb5.kdc', kdc_host)
+
+        return kdc_host
+
+    @Decorator.argument(argtype=dict)
+    def hive_conf_list(self, conf_map):
+        """
+        dictionary of key/value pairs of hive configuration variables for the session.
+        the driver will automatically url encode the variables as needed
+        """
+        return tuning.conf_dict(conf_map)
+
+    @Decorator.argument(argtype=dict)
+    def hive_var_list(self, var_map):
+        """
+        dictionary of key/value pairs of Hive variables for this session.
+        the driver will automatically url encode the variables as needed
+        """
+        return tuning.conf_dict(var_map)
+
+    @Decorator.argument(argtype=str)
+    def profile(self, name):
+        """
+        name of a tuning profile from ``hivejdbc.tuning``: `interactive`, `batch` or a registered profile.
+        its hive configuration settings are applied when the session is opened, `hive_conf_list` overrides them
+        """
+        tuning.get_profile(name)
+        return name
+
+
+def encode_settings(settings):
+    """
+    Encode settings for the ``hive_conf_list`` or ``hive_var_list`` part of a jdbc url
+
+    >>> encode_settings({'hive.exec.parallel': 'true', 'mapreduce.job.queuename': 'etl;adhoc'})
+    'hive.exec.parallel=true;mapreduce.job.queuename=etl%3Badhoc'
+
+    :param settings: ``dict`` of names and string values
+    :rtype: str
+    """
+    return ';'.join('{}={}'.format(quote(name, safe=''), quote(value, safe=''))
+                    for name, value in settings.items())
+
+
+class HiveConnect(ConnectFunction):
+
+    @staticmethod
+    def prepare_jvm():
+        """Set the jvm options hivejdbc needs regardless of connection arguments"""
+        if not Jvm.is_running():
+            # we don't want to see warnings about log4j not being configured, so we'll disable the log4j logger
+            # this will not prevent other log messages from appearing in stdout
+            Jvm.add_argument('org.apache.logging.log4j.simplelog.StatusLogger.level',
+                             '-Dorg.apache.logging.log4j.simplelog.StatusLogger.level=OFF')
+        else:
+            System.set_property('org.apache.logging.log4j.simplelog.StatusLogger.level', 'OFF')
+
+    def parse_args(self, *args, **kwargs):
+        """
+        Parse and validate connection arguments, waits for a jvm pre-warm started by ``hivejdbc.prewarm`` to finish
+        first because ``handle_args`` configures the jvm differently once it is running.
+
+        :rtype: ConnectArguments
+        """
+        jvm.wait_prewarm()
+        return super().parse_args(*args, **kwargs)
+
+    def handle_args(self, args: ConnectArguments):
+        """
+        Handle args is called before the JVM is started
+
+        :param args:
+        :return:
+        """
+        # set driver path from connect function argument `driver`
+        driver_path = args.get('driver')
+        self.driver_path = abspath(driver_path) if driver_path else None
+
+        # override the cursor class if requested.
+        if args.get('cursor'):
+            self.cursor_class = args.get('cursor')
+
+        # handle various ways kerberos can be configured:
+        if args.get('principal'):  # kerberos is method of auth
+            if self.uses_credential_cache(args):
+                # connections are opened as the subject logged in by `hivejdbc.credentials`, no jaas login is needed
+                pass
+            elif args.get('user_keytab'):
+                # if user_keytab is set, this means we are expected to perform the kerberos authentication.
+                # we'll use jaas to accomplish this.
+                credentials.configure_jaas(use_password=False, no_prompt=True, use_ticket_cache=False,
+                                           principal=args.user_principal, keytab=args.user_keytab)
+            elif args.get('principal'):
+                # If principal is set, but user_keytab is not set, this means we're just looking for an existing
+                # kinit session to authenticate
+                # this jaas configuration DOES NOT PROMPT for username/password
+                # but looks for an existing kerberos ticket created by the operating system or `kinit`
+                credentials.configure_jaas(use_password=False, no_prompt=True, use_ticket_cache=True)
+            else:
+                pass
+
+        self.prepare_jvm()
+
+        # if the realm is not set try to set it from the principal
+        if args.get('kdc') and not args.get('realm'):
+            args.realm = (kerberos.realm_from_principal(args.principal) or
+                          kerberos.realm_from_principal(args.get('user_principal', '')))
+            if not args.realm:
+                raise ValueError('Argument "realm" must be set if "kdc" is set, either explicitly or in '
+                                 'the principal name')
+
+        if args.get('kdc') and args.get('realm'):
+            # set the realm
+
+            credentials.set_property('java.security.krb5.realm', args.realm)
+
+    @staticmethod
+    def uses_credential_cache(args: ConnectArguments):
+        """
+        :return: ``True`` if connections are opened with a shared ``hivejdbc.credentials.KerberosCredential``
+        :rtype: bool
+        """
+        return bool(args.get('principal') and args.get('user_keytab') and args.get('kerberos_cache', True))
+
+    def connect(self, *args, **kwargs):
+        """
+        Parse arguments, load the driver and open a connection, reporting the time taken by each phase to the
+        instrumentation listeners
+
+        :return: db-api-2 connection instance
+        :rtype: hivejdbc.dbapi.HiveConnection
+        """
+        started = time.perf_counter()
+        arguments = self.parse_args(*args, **kwargs)
+        parsed = time.perf_counter()
+        driver_class = self.load_driver()
+        loaded = time.perf_counter()
+        endpoints = self.endpoints(arguments)
+        probed = time.perf_counter()
+        connection = self.open_endpoints(driver_class, endpoints, arguments)
+        opened = time.perf_counter()
+        connection.connect_function = self
+        connection.connect_args = (args, kwargs)
+
+        observers = instrument.listeners(connection)
+        if observers:
+            timings = {'parse': parsed - started, 'driver': loaded - parsed, 'probe': probed - loaded,
+                       'open': opened - probed, 'total': opened - started}
+            instrument.emit(observers, 'on_connect', connection, timings)
+        return connection
+
+    def get_connection(self, driver_class: JClass, args: ConnectArguments):
+        """
+        Hive specific implementation of JdbcConnection setup
+
+        When this method is called the jvm has been started, and the driver_class has been found
+
+        see: https://cwiki.apache.org/confluence/display/Hive/HiveServer2+Clients
+
+        :param driver_class: HiveDriver `JClass` reference
+        :type driver_class: org.apache.hive.jdbc.HiveDriver
+        :param args: Connection arguments containing options derived from ``hivejdbc.HiveArgParser``
+        :type args: pyjdbc.connect.ConnectArguments
+        :return: db-api-2 connection instance
+        :rtype: hivejdbc.dbapi.HiveConnection
+        """
+        return self.open_endpoints(driver_class, self.endpoints(args), args)
+
+    def probe(self, args: ConnectArguments):
+        """
+        Check the server is reachable before the driver attempts to connect
+
+        :param args: Connection arguments containing options derived from ``hivejdbc.HiveArgParser``
+        :raises: pyjdbc.exceptions.Error if the server is not reachable
+        """
+        if args.get('probe', True) and ',' not in args.host:
+            check_server(args.host, args.port, args.get('connect_timeout'))
+
+    def selector(self, args: ConnectArguments):
+        """
+        :param args: Connection arguments containing options derived from ``hivejdbc.HiveArgParser``
+        :return: the shared host selector of a host list, ``None`` for a single host or service discovery
+        :rtype: hivejdbc.failover.HostSelector
+        """
+        if args.get('service_discovery_mode'):
+            # the hosts are zookeeper servers, the driver discovers the Hive servers
+            return None
+        endpoints = failover.parse_hosts(args.host, args.port)
+        if len(endpoints) < 2:
+            return None
+        return failover.get_selector(endpoints, check_server, args.get('host_selection') or 'latency')
+
+    def endpoints(self, args: ConnectArguments):
+        """
+        The hosts to attempt, in order. Host lists are probed in parallel and unreachable hosts are left out.
+
+        :param args: Connection arguments containing options derived from ``hivejdbc.HiveArgParser``
+        :return: list of (host, port) tuples
+        :raises: pyjdbc.exceptions.Error if no host is reachable
+        """
+        selector = self.selector(args)
+        if selector is None:
+            self.probe(args)
+            return [(args.host, args.port)]
+        if not args.get('probe', True):
+            # skip the reachability check only, the hosts are still spread by the strategy
+            candidates = [endpoint for endpoint in selector.endpoints if not selector.is_blacklisted(endpoint)]
+            return selector.order(candidates or selector.endpoints)
+        return selector.select(args.get('connect_timeout') or failover.DEFAULT_PROBE_TIMEOUT)
+
+    def open_endpoints(self, driver_class: JClass, endpoints, args: ConnectArguments, type_conversion=None):
+        """
+        Open a connection to the first of ``endpoints`` accepting it, hosts of a host list that fail to connect
+        are skipped by later connects for a while. Authentication errors are raised without trying other hosts
+
+        :param driver_class: HiveDriver `JClass` reference
+        :param endpoints: (host, port) tuples from ``endpoints``
+        :param args: Connection arguments containing options derived from ``hivejdbc.HiveArgParser``
+        :param type_conversion: type conversion instance, created from ``args`` if not given
+        :return: db-api-2 connection instance
+        :rtype: hivejdbc.dbapi.HiveConnection
+        """
+        selector = self.selector(args)
+        error = None
+        for host, port in endpoints:
+            try:
+                return self.open_connection(driver_class, self.connection_url(args, host, port), args,
+                                            type_conversion=type_conversion)
+            except Exception as e:
+                # every host refuses the same credentials, the host is not at fault
+                if selector is None or failover.is_authentication_error(e):
+                    raise
+                logging.getLogger(self.__class__.__name__).warning('connecting to %s:%s failed - %s', host, port, e)
+                selector.blacklist((host, port))
+                error = e
+        raise error
+
+    def connection_url(self, args: ConnectArguments, host=None, port=None):
+        """
+        Build the jdbc url for the given connection arguments
+
+        :param args: Connection arguments containing options derived from ``hivejdbc.HiveArgParser``
+        :type args: pyjdbc.connect.ConnectArguments
+        :param host: host to connect to, defaults to the ``host`` argument
+        :param port: port to connect to, defaults to the ``port`` argument
+        :return: jdbc url
+        :rtype: str
+        """
+        options = []
+
+        # Create the Connection String based on Arguments
+        host_part = 'jdbc:hive2://{host}:{port}/{database}'.format(host=host or args.host,
+                                                                   port=port or args.port,
+                                                                   database=args.database)
+        options.append(host_part)
+
+        # -- all options after the database are called "session-variables" ------------------------
+
+        # Configure initFile - must be the first option in session-vars
+        if args.get('init_file'):
+            options.append('initFile={}'.format(args.init_file))
+
+        # username/password support - note that user can be given without password for unsecured hive servers
+        if args.get('user'):
+            options.append('user={}'.format(args.user))
+        if args.get('password'):
+            options.append('password={}'.format(args.password))
+
+        # Configure transport mode
+        if args.get('transport'):
+            options.append('transportMode={}'.format(args.transport))
+
+        # Configure SSL options
+        if args.get('ssl'):
+            options.append('ssl=true')
+        if args.get('trust_store'):
+            options.append('sslTrustStore={}'.format(args.trust_store))
+        if args.get('trust_password'):
+            options.append('trustStorePassword={}'.format(args.trust_password))
+
+        # Configure Kerberos if given
+        if args.get('principal'):
+            options.append('principal={}'.format(args.principal))
+        if self.uses_credential_cache(args):
+            options.append('kerberosAuthType=fromSubject')
+
+        if args.get('transport') == 'http' and args.get('http_path'):
+            options.append('httpPath={}'.format(args.http_path))
+
+        if args.get('fetch_size'):
+            options.append('fetchSize={}'.format(args.fetch_size))
+
+        if args.get('service_discovery_mode'):
+            options.append('serviceDiscoveryMode={}'.format(args.service_discovery_mode))
+            options.append('zooKeeperNamespace={}'.format(args.zookeeper_namespace))
+
+        url = ';'.join(options)
+        conf = self.session_conf(args)
+        if conf:
+            url += '?' + encode_settings(conf)
+        if args.get('hive_var_list'):
+            url += '#' + encode_settings(args.hive_var_list)
+        return url
+
+    @staticmethod
+    def session_conf(args: ConnectArguments):
+        """
+        :param args: Connection arguments containing options derived from ``hivejdbc.HiveArgParser``
+        :return: hive configuration settings of the session: the tuning profile overridden by `hive_conf_list`
+        :rtype: dict
+        """
+        conf = tuning.get_profile(args.profile) if args.get('profile') else {}
+        conf.update(args.get('hive_conf_list') or {})
+        return conf
+
+    @classmethod
+    def session_settings(cls, args: ConnectArguments):
+        """
+        :param args: Connection arguments containing options derived from ``hivejdbc.HiveArgParser``
+        :return: the settings the session is opened with, named like ``SET`` statements would set them
+        :rtype: dict
+        """
+        settings = cls.session_conf(args)
+        for name, value in (args.get('hive_var_list') or {}).items():
+            settings['hivevar:' + name] = value
+        return settings
+
+    def open_connection(self, driver_class: JClass, conn_str, args: ConnectArguments, type_conversion=None):
+        """
+        Open a connection to the given jdbc url
+
+        :param driver_class: HiveDriver `JClass` reference
+        :param conn_str: jdbc url from ``connection_url``
+        :param args: Connection arguments containing options derived from ``hivejdbc.HiveArgParser``
+        :param type_conversion: type conversion instance, created from ``args`` if not given
+        :return: db-api-2 connection instance
+        :rtype: hivejdbc.dbapi.HiveConnection
+        """
+        log = logging.getLogger(self.__class__.__name__)
+
+        HiveDriver = driver_class
+
+        java_props = Properties.from_dict(args.properties or {})
+
+        log.debug('hive connection string: %s', conn_str)  # TODO make secure
+
+        # the driver reads the login timeout when the session is opened
+        timeout = (_login_timeout(JClass('java.sql.DriverManager'), int(args.login_timeout))
+                   if args.get('login_timeout') else contextlib.suppress())
+
+        hive_driver = HiveDriver()
+        try:
+            with timeout:
+                if self.uses_credential_cache(args):
+                    credential = credentials.get_credential(args.user_principal, args.user_keytab)
+                    java_conn = credential.run_as(lambda: hive_driver.connect(conn_str, java_props))
+                else:
+                    # 	connect(String url, Properties info)
+                    java_conn = hive_driver.connect(conn_str, java_props)
+        except JClass('java.sql.SQLException') as e:
+            # TODO self.handle_exception(e)
+            raise
+
+        if type_conversion is None:
+            type_conversion = self.make_type_conversion(args)
+        return HiveConnection(connection=java_conn,
+                              cursor_class=self.cursor_class,
+                              type_conversion=type_conversion,
+                              fetch_size=args.get('fetch_size'),
+                              result_cache=args.get('result_cache'),
+                              database=args.database,
+                              listeners=args.get('listeners'),
+                              metadata_cache=args.get('metadata_cache'),
+                              catalog_cache=args.get('catalog_cache'),
+                              session_settings=self.session_settings(args),
+                              statement_cache_size=args.get('statement_cache_size', 128))
+
+    def make_type_conversion(self, args: ConnectArguments):
+        """
+        :return: type conversion instance configured from the connection arguments
+        :rtype: hivejdbc.types.HiveTypeConversion
+        """
+        return self.type_conversion(json_backend=args.get('json_backend', 'auto'),
+                                    complex_types=args.get('complex_types', 'eager'))
+
+    def handle_exception(self, exc):
+        """
+        Looks for known exceptions and raises more useful errors.
+
+        :param exc:
+        :return:
+        """
+        # TODO handle known exceptions
+        # resolve the exception hierarchy so we can search through all exception messages.
+        hierarchy = []
+        cause = exc
+        while True:
+            cause = getattr(cause, '__cause__', None)
+            if not cause:
+                break
+            else:
+                hierarchy.append(cause)
+
+    def handle_missing_kerberos_ticket(self, exc):
+        pass
+
+
+connect = HiveConnect(driver_path=None,  # we'll set this later based on user input
+                      driver_class=DRIVER_CLASS,
+                      cursor_class=HiveCursor,
+                      parser=HiveArgParser,
+                      type_conversion=HiveTypeConversion,
+                      runtime_invocation_ok=False)
\ No newline at end of file
@@ -0,0 +1,299 @@
+"""
+Streaming export of query results to files
+
+``cursor.export()`` writes the remaining rows of a result to a Parquet, CSV or JSON lines file without collecting
+them in memory. One thread fetches column batches from the result set while another encodes and writes them, at
+most ``queue_size`` batches wait between the two so memory use does not grow with the size of the result.
+
+    cursor.execute('select * from test.events')
+    rows = cursor.export('/data/events.parquet', row_group_rows=100000, compression='zstd')
+
+Parquet column types come from the result set metadata: ``ARRAY``, ``MAP`` and ``STRUCT`` columns are written as
+nested Parquet types. Columns whose type is not described by the metadata (complex columns reported without their
+element types) use the type inferred from the first row group, pass ``schema`` with their Hive types to fix them.
+Parquet files are written with pyarrow: ``pip install hivejdbc[arrow]``.
+
+The file is written next to ``path`` under a temporary name and renamed when the export succeeds.
+"""
+__all__ = ['export', 'FORMATS', 'TEXT_COMPRESSIONS']
+
+import bz2
+import csv
+import datetime
+import gzip
+import json
+import lzma
+import os
+import queue
+import threading
+import uuid
+from decimal import Decimal
+
+from hivejdbc import load
+from hivejdbc.columnar import _import
+from hivejdbc.jvm import jvm_call
+
+FORMATS = ('parquet', 'csv', 'jsonl')
+# compression of csv and jsonl files: function opening the file for writing text
+TEXT_COMPRESSIONS = {
+    None: lambda path: open(path, 'w', encoding='utf8', newline=''),
+    'gzip': lambda path: gzip.open(path, 'wt', encoding='utf8', newline=''),
+    'bz2': lambda path: bz2.open(path, 'wt', encoding='utf8', newline=''),
+    'xz': lambda path: lzma.open(path, 'wt', encoding='utf8', newline=''),
+}
+DEFAULT_ROW_GROUP_ROWS = 100000
+
+_DONE = object()
+
+
+def _json_text(value):
+    """a decoded complex value as json, values read from the server are json text already"""
+    if value is None or isinstance(value, str):
+        return value
+    return json.dumps(value, default=_json_default)
+
+
+def _json_default(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value).hex()
+    raise TypeError('unable to write {} as json: {!r}'.format(type(value), value))
+
+
+class _ParquetWriter:
+
+    def __init__(self, path, names, type_names, description, compression, row_group_rows, schema, conversion):
+        self.pyarrow = _import('pyarrow', 'arrow')
+        self.pq = _import('pyarrow.parquet', 'arrow')
+        self.path = path
+        self.names = list(names)
+        self.compression = compression or 'snappy'
+        self.row_group_rows = row_group_rows
+        self.types = [self._arrow_type(name, type_name, column, schema, conversion)
+                      for name, type_name, column in zip(self.names, type_names, description)]
+        self._writer = None
+        self._schema = None
+
+    def _arrow_type(self, name, type_name, column, schema, conversion):
+        """the arrow type of a column, ``None`` if it is inferred from the values"""
+        if schema and name in schema:
+            return load.arrow_type(schema[name])
+        code, jdbc_name, hive_type = type_name
+        if '<' in hive_type:
+            # the driver reports the element types of complex columns
+            return load.arrow_type(hive_type)
+        if jdbc_name == 'DECIMAL':
+            precision, scale = column[4], column[5]
+            return self.pyarrow.decimal128(precision, scale or 0) if precision else None
+        if conversion.complex_type(code, hive_type):
+            return None
+        arrow_type = conversion.arrow_type(code)
+        if arrow_type is not None:
+            return arrow_type
+        try:
+            return load.arrow_type(jdbc_name)
+        except ValueError:
+            return None
+
+    def _array(self, values, arrow_type):
+        pyarrow = self.pyarrow
+        try:
+            return pyarrow.array(values, type=arrow_type)
+        except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError, TypeError):
+            if arrow_type is None:
+                raise
+            # DATE and DECIMAL values may be read as text, ie: "yyyy-mm-dd" strings from `HiveTypeConversion`
+            texts = [None if value is None else str(value) for value in values]
+            return pyarrow.array(texts, type=pyarrow.string()).cast(arrow_type)
+
+    def write(self, columns):
+        pyarrow = self.pyarrow
+        arrays = [self._array(values, arrow_type) for values, arrow_type in zip(columns, self.types)]
+        batch = pyarrow.RecordBatch.from_arrays(arrays, names=self.names)
+        if self._writer is None:
+            self._schema = batch.schema
+            self._writer = self.pq.ParquetWriter(self.path, self._schema, compression=self.compression)
+        elif not batch.schema.equals(self._schema):
+            try:
+                batch = pyarrow.Table.from_batches([batch]).cast(self._schema)
+            except (pyarrow.ArrowInvalid, pyarrow.ArrowNotImplementedError, ValueError) as e:
+                raise ValueError('column types differ from the types inferred from the first row group, pass the '
+                                 'Hive types of the columns with `schema`: {}'.format(e)) from None
+        self._writer.write(batch, row_group_size=self.row_group_rows)
+
+    def close(self):
+        if self._writer is None:
+            # an empty result, the file holds the schema only
+            pyarrow = self.pyarrow
+            schema = pyarrow.schema([(name, arrow_type or pyarrow.null())
+                                     for name, arrow_type in zip(self.names, self.types)])
+            self._writer = self.pq.ParquetWriter(self.path, schema, compression=self.compression)
+        self._writer.close()
+
+
+class _TextWriter:
+
+    def __init__(self, path, names, type_names, compression, conversion):
+        if compression not in TEXT_COMPRESSIONS:
+            raise ValueError('compression must be one of: {}, got: {}'.format(
+                ', '.join(str(name) for name in TEXT_COMPRESSIONS), compression))
+        self.names = list(names)
+        self.complex = [bool(conversion.complex_type(code, hive_type)) for code, _, hive_type in type_names]
+        self.boolean = [jdbc_name == 'BOOLEAN' for _, jdbc_name, _ in type_names]
+        self.file = TEXT_COMPRESSIONS[compression](path)
+
+    def close(self):
+        self.file.close()
+
+
+class _CsvWriter(_TextWriter):
+
+    def __init__(self, path, names, type_names, compression, conversion, header=True):
+        super().__init__(path, names, type_names, compression, conversion)
+        self.writer = csv.writer(self.file)
+        if header:
+            self.writer.writerow(self.names)
+
+    def write(self, columns):
+        for idx, (is_complex, is_boolean) in enumerate(zip(self.complex, self.boolean)):
+            if is_complex:
+                columns[idx] = [_json_text(value) for value in columns[idx]]
+            elif is_boolean:
+                columns[idx] = [None if value is None else ('true' if value else 'false') for value in columns[idx]]
+        self.writer.writerows(zip(*columns))
+
+
+class _JsonLinesWriter(_TextWriter):
+
+    def __init__(self, path, names, type_names, compression, conversion):
+        super().__init__(path, names, type_names, compression, conversion)
+        self.keys = [json.dumps(name) + ':' for name in self.names]
+
+    def write(self, columns):
+        encoded = []
+        for values, is_complex in zip(columns, self.complex):
+            if is_complex:
+                encoded.append(['null' if value is None else _json_text(value) for value in values])
+            else:
+                encoded.append([json.dumps(value, default=_json_default) for value in values])
+        keys = self.keys
+        self.file.writelines('{' + ','.join([key + value for key, value in zip(keys, row)]) + '}\n'
+                             for row in zip(*encoded))
+
+
+def _transfer(batches, write, queue_size):
+    """fetch ``batches`` on one thread and ``write`` them on another, returns the number of rows written"""
+    pending = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    errors = []
+    rows = [0]
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                pending.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for columns in batches:
+                if not put(columns):
+                    return
+        except BaseException as e:
+            errors.append(e)
+            stop.set()
+            return
+        put(_DONE)
+
+    def consume():
+        try:
+            while True:
+                try:
+                    columns = pending.get(timeout=0.1)
+                except queue.Empty:
+                    if stop.is_set():
+                        return
+                    continue
+                if columns is _DONE:
+                    return
+                write(columns)
+                rows[0] += len(columns[0]) if columns else 0
+        except BaseException as e:
+            errors.append(e)
+            stop.set()
+
+    threads = [threading.Thread(target=jvm_call, args=(produce,), name='hivejdbc-export-fetch', daemon=True),
+               threading.Thread(target=consume, name='hivejdbc-export-write', daemon=True)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+    return rows[0]
+
+
+def export(cursor, path, format='parquet', row_group_rows=DEFAULT_ROW_GROUP_ROWS, compression=None, schema=None,
+           header=True, queue_size=2):
+    """
+    Write the remaining rows of a result to a file
+
+    :param cursor: cursor holding a result
+    :type cursor: hivejdbc.dbapi.HiveCursor
+    :param path: path of the file to write, an existing file is replaced
+    :param format: one of ``FORMATS``: ``parquet``, ``csv`` or ``jsonl`` (one json object per row)
+    :param row_group_rows: rows fetched and written per batch, Parquet files get a row group per batch
+    :param compression: Parquet compression codec (``snappy`` when not given, ``zstd``, ``gzip``, ``none``, ...),
+                        or for csv and jsonl files one of ``TEXT_COMPRESSIONS``: ``gzip``, ``bz2`` or ``xz``
+    :param schema: ``dict`` of column name: Hive type (``ARRAY<STRING>``) of Parquet columns whose type is not
+                   given by the result set metadata
+    :param header: write the column names as the first line of csv files
+    :param queue_size: maximum number of batches fetched but not yet written
+    :return: number of rows written
+    :rtype: int
+    """
+    if format not in FORMATS:
+        raise ValueError('format must be one of: {}, got: {}'.format(', '.join(FORMATS), format))
+    if row_group_rows < 1:
+        raise ValueError('row_group_rows must be at least 1, got: {}'.format(row_group_rows))
+    if queue_size < 1:
+        raise ValueError('queue_size must be at least 1, got: {}'.format(queue_size))
+
+    # complex values are written as the json text read from the server unless they are written as nested types
+    codes, batches = cursor._column_batches(batch_rows=row_group_rows, lazy=False, decode=format == 'parquet')
+    conversion = cursor._type_conversion
+    names = cursor.column_names
+    info = cursor._column_info() if cursor._cached is None else None
+    hive_types = info.type_names if info is not None else [''] * len(codes)
+    type_names = [(code, conversion.jdbc_name(code) or '', str(hive_type or ''))
+                  for code, hive_type in zip(codes, hive_types)]
+
+    path = os.fspath(path)
+    temp = '{}.{}.tmp'.format(path, uuid.uuid4().hex[:8])
+    if format == 'parquet':
+        writer = _ParquetWriter(temp, names, type_names, cursor.description, compression, row_group_rows, schema,
+                                conversion)
+    elif format == 'csv':
+        writer = _CsvWriter(temp, names, type_names, compression, conversion, header=header)
+    else:
+        writer = _JsonLinesWriter(temp, names, type_names, compression, conversion)
+
+    try:
+        try:
+            rows = _transfer(batches, writer.write, queue_size)
+        finally:
+            writer.close()
+        os.replace(temp, path)
+    except BaseException:
+        try:
+            os.remove(temp)
+        except OSError:
+            pass
+        raise
+    return rows
@@ -0,0 +1,220 @@
+"""
+Client side host selection for a list of HiveServer2 hosts
+
+The Hive driver tries the hosts of a ``host1,host2`` url in order, a hung server stalls every connect until it
+times out and all clients connect to the first host. ``HostSelector`` probes the hosts in parallel with a short
+timeout and orders the reachable hosts by latency (or round robin), hosts that fail a probe or a connect are
+skipped for ``blacklist_seconds``. A connect refused because of the credentials is not the host's fault, the
+host is not skipped and the other hosts are not tried.
+
+    conn = hivejdbc.connect('hs2-a.example.com,hs2-b.example.com,hs2-c.example.com', 'default',
+                            host_selection='round_robin', connect_timeout=2, login_timeout=30)
+
+Selectors are shared by every connect to the same list of hosts, see ``get_selector``.
+"""
+__all__ = ['HostSelector', 'get_selector', 'parse_hosts', 'is_authentication_error', 'STRATEGIES', 'DEFAULT_PROBE_TIMEOUT',
+           'DEFAULT_BLACKLIST_SECONDS']
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from pyjdbc.exceptions import Error
+
+STRATEGIES = ('latency', 'round_robin')
+# seconds a reachability probe may take when connecting to a list of hosts
+DEFAULT_PROBE_TIMEOUT = 2.0
+# seconds an unreachable host is skipped
+DEFAULT_BLACKLIST_SECONDS = 30.0
+# lower case messages of errors raised when the server refuses the credentials
+AUTHENTICATION_ERRORS = ('error validating the login', 'authentication failed', 'gss initiate failed',
+                         'invalid credentials', 'loginexception')
+
+_SELECTORS = {}
+_SELECTORS_LOCK = threading.Lock()
+
+log = logging.getLogger(__name__)
+
+
+def parse_hosts(host, port):
+    """
+    Split a comma separated host list into ``(host, port)`` endpoints
+
+    >>> parse_hosts('hs2-a, hs2-b:10001', 10000)
+    [('hs2-a', 10000), ('hs2-b', 10001)]
+
+    :param host: host name or comma separated list of host names, each optionally followed by ``:port``
+    :param port: port of hosts without an explicit port
+    :return: list of (host, port) tuples
+    :rtype: list
+    """
+    endpoints = []
+    for part in host.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        name, separator, host_port = part.rpartition(':')
+        if separator and host_port.isdigit() and ':' not in name:
+            endpoints.append((name, int(host_port)))
+        else:
+            endpoints.append((part, port))
+    return endpoints
+
+
+def is_authentication_error(exc):
+    """
+    :param exc: exception raised opening a connection, its causes (python and java) are searched as well
+    :return: ``True`` if the server refused the credentials
+    :rtype: bool
+    """
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        message = str(exc).lower()
+        if any(marker in message for marker in AUTHENTICATION_ERRORS):
+            return True
+        cause = getattr(exc, '__cause__', None)
+        if cause is None and hasattr(exc, 'getCause'):
+            try:
+                cause = exc.getCause()
+            except Exception:
+                cause = None
+        exc = cause
+    return False
+
+
+class HostSelector:
+
+    def __init__(self, endpoints, probe, strategy='latency', blacklist_seconds=DEFAULT_BLACKLIST_SECONDS):
+        """
+        :param endpoints: list of (host, port) tuples
+        :param probe: function ``probe(host, port, timeout)`` raising an exception if the server is not reachable
+        :param strategy: ``latency`` prefers the host answering the probe first, ``round_robin`` rotates between
+                         the reachable hosts
+        :param blacklist_seconds: seconds a host failing a probe or a connect is skipped
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError('strategy must be one of {}, got: {}'.format(STRATEGIES, strategy))
+        self.endpoints = list(endpoints)
+        self.strategy = strategy
+        self.blacklist_seconds = blacklist_seconds
+        self._probe = probe
+        self._blacklist = {}
+        self._latencies = {}  # endpoint -> latency of its last successful probe
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def blacklist(self, endpoint, seconds=None):
+        """
+        Skip ``endpoint`` for ``seconds`` (defaults to ``blacklist_seconds``)
+
+        :param endpoint: (host, port) tuple
+        """
+        seconds = self.blacklist_seconds if seconds is None else seconds
+        log.warning('skipping hive server %s:%s for %.0f seconds', endpoint[0], endpoint[1], seconds)
+        with self._lock:
+            self._blacklist[endpoint] = time.monotonic() + seconds
+
+    def is_blacklisted(self, endpoint):
+        """
+        :param endpoint: (host, port) tuple
+        :rtype: bool
+        """
+        with self._lock:
+            until = self._blacklist.get(endpoint)
+            if until is not None and until <= time.monotonic():
+                del self._blacklist[endpoint]
+                until = None
+            return until is not None
+
+    def _timed_probe(self, endpoint, timeout):
+        started = time.perf_counter()
+        self._probe(endpoint[0], endpoint[1], timeout)
+        return time.perf_counter() - started
+
+    def latencies(self, endpoints, timeout=DEFAULT_PROBE_TIMEOUT):
+        """
+        Probe ``endpoints`` in parallel, endpoints that fail or do not answer within ``timeout`` are blacklisted
+
+        :return: dictionary of endpoint to probe latency in seconds, for the reachable endpoints
+        :rtype: dict
+        """
+        executor = ThreadPoolExecutor(max_workers=len(endpoints), thread_name_prefix='hivejdbc-probe')
+        try:
+            futures = {executor.submit(self._timed_probe, endpoint, timeout): endpoint for endpoint in endpoints}
+            # a probe stuck in name resolution may outlive its socket timeout, stop waiting for it
+            wait(futures, timeout=timeout)
+        finally:
+            executor.shutdown(wait=False)
+
+        latencies = {}
+        for future, endpoint in futures.items():
+            if future.done() and future.exception() is None:
+                latencies[endpoint] = future.result()
+            else:
+                self.blacklist(endpoint)
+        with self._lock:
+            self._latencies.update(latencies)
+        return latencies
+
+    def order(self, endpoints, latencies=None):
+        """
+        Order hosts by the strategy without probing them
+
+        :param endpoints: (host, port) tuples to order
+        :param latencies: dictionary of endpoint to latency, defaults to the latencies of the last probes, hosts
+                          without a latency are attempted last
+        :return: (host, port) tuples, the preferred host first
+        :rtype: list
+        """
+        endpoints = list(endpoints)
+        if not endpoints:
+            return endpoints
+        if self.strategy == 'latency':
+            if latencies is None:
+                with self._lock:
+                    latencies = dict(self._latencies)
+            endpoints.sort(key=lambda endpoint: (endpoint not in latencies, latencies.get(endpoint, 0)))
+            return endpoints
+        with self._lock:
+            start = self._next % len(endpoints)
+            self._next += 1
+        return endpoints[start:] + endpoints[:start]
+
+    def select(self, timeout=DEFAULT_PROBE_TIMEOUT):
+        """
+        Order the reachable hosts to attempt
+
+        Blacklisted hosts are skipped, unless every host is blacklisted.
+
+        :param timeout: seconds each probe may take
+        :return: reachable (host, port) tuples, the preferred host first
+        :rtype: list
+        :raises: pyjdbc.exceptions.Error if no host is reachable
+        """
+        candidates = [endpoint for endpoint in self.endpoints if not self.is_blacklisted(endpoint)]
+        latencies = self.latencies(candidates or self.endpoints, timeout)
+        reachable = [endpoint for endpoint in (candidates or self.endpoints) if endpoint in latencies]
+        if not reachable:
+            raise Error('No Hive server is reachable at: {}'.format(
+                ', '.join('{}:{}'.format(host, port) for host, port in self.endpoints)))
+        return self.order(reachable, latencies)
+
+
+def get_selector(endpoints, probe, strategy='latency'):
+    """
+    Get the shared selector for a list of hosts, creating it if needed
+
+    :param endpoints: list of (host, port) tuples
+    :param probe: function ``probe(host, port, timeout)``, used when the selector is created
+    :param strategy: ``latency`` or ``round_robin``
+    :rtype: HostSelector
+    """
+    key = (tuple(endpoints), strategy)
+    with _SELECTORS_LOCK:
+        selector = _SELECTORS.get(key)
+        if selector is None:
+            selector = HostSelector(endpoints, probe, strategy=strategy)
+            _SELECTORS[key] = selector
+        return selector
@@ -0,0 +1,289 @@
+"""
+Instrumentation hooks
+
+Listeners receive timings for each phase of a query: connecting, executing, the latency of the first row, each
+batch of rows fetched and the time spent converting values per column type.
+
+    class SlowQueries(Listener):
+        def on_execute(self, cursor, operation, seconds, error=None):
+            if seconds > 60:
+                log.warning('slow query (%.1fs): %s', seconds, operation)
+
+    hivejdbc.instrument.add_listener(SlowQueries())             # every connection
+    conn = hivejdbc.connect('example.com', 'default', listeners=[SlowQueries()])  # a single connection
+
+Without listeners the cursors skip all timing, a listener enables timing for the cursors it observes.
+``PrometheusListener`` and ``OpenTelemetryListener`` export the timings as metrics and spans.
+"""
+__all__ = ['Listener', 'StatsListener', 'PrometheusListener', 'OpenTelemetryListener',
+           'add_listener', 'remove_listener', 'listeners', 'emit']
+
+import logging
+import threading
+import time
+
+from hivejdbc.columnar import _import
+
+log = logging.getLogger(__name__)
+
+# listeners observing every connection, replaced (never mutated) so it can be read without a lock
+_LISTENERS = ()
+_LISTENERS_LOCK = threading.Lock()
+
+
+class Listener:
+    """
+    Base class of instrumentation listeners, every method is optional
+
+    Listeners are called on the thread running the query and should return quickly, exceptions raised by a
+    listener are logged and ignored.
+    """
+
+    def on_connect(self, connection, timings):
+        """
+        :param connection: the new connection
+        :param timings: ``dict`` of seconds per phase: ``parse`` (argument handling and kerberos configuration),
+                        ``driver`` (jvm start and driver loading), ``probe`` (server reachability check),
+                        ``open`` (session open including the thrift, ssl and kerberos handshakes) and ``total``
+        """
+
+    def on_execute(self, cursor, operation, seconds, error=None):
+        """
+        :param cursor: the cursor that ran the statement
+        :param operation: sql text
+        :param seconds: time to compile and execute the statement on the server
+        :param error: the exception raised by the statement, ``None`` on success
+        """
+
+    def on_first_row(self, cursor, operation, seconds):
+        """
+        :param seconds: time from the start of ``execute`` until the first row was fetched
+        """
+
+    def on_fetch(self, cursor, operation, rows, seconds, size):
+        """
+        Called for each ``fetchmany``, ``fetchall``, stream batch and columnar batch
+
+        :param rows: number of rows fetched
+        :param seconds: time to transfer and convert the rows
+        :param size: approximate size of the converted rows in bytes
+        """
+
+    def on_conversion(self, cursor, operation, timings):
+        """
+        Called when a result has been read to the end, or is discarded
+
+        :param timings: ``dict`` of jdbc type name to ``(values converted, seconds)``
+        """
+
+
+def add_listener(listener):
+    """
+    Observe every connection
+
+    :param listener: listener instance
+    :type listener: Listener
+    """
+    global _LISTENERS
+    with _LISTENERS_LOCK:
+        if listener not in _LISTENERS:
+            _LISTENERS = _LISTENERS + (listener,)
+
+
+def remove_listener(listener):
+    """
+    :param listener: a listener added with ``add_listener``
+    """
+    global _LISTENERS
+    with _LISTENERS_LOCK:
+        _LISTENERS = tuple(registered for registered in _LISTENERS if registered is not listener)
+
+
+def listeners(connection=None):
+    """
+    :param connection: connection whose own listeners are included
+    :return: the listeners observing ``connection``
+    :rtype: tuple
+    """
+    own = getattr(connection, 'listeners', None)
+    return _LISTENERS + tuple(own) if own else _LISTENERS
+
+
+def emit(observers, event, *args, **kwargs):
+    """
+    Call ``event`` on every listener, errors raised by listeners are logged
+
+    :param observers: listeners
+    :param event: listener method name, ie: ``on_execute``
+    """
+    for listener in observers:
+        try:
+            getattr(listener, event)(*args, **kwargs)
+        except Exception as e:
+            log.warning('instrumentation listener %r failed in %s: %s', listener, event, e)
+
+
+class StatsListener(Listener):
+    """
+    Aggregates timings in memory, ``stats()`` returns the totals
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.connects = 0
+            self.connect_seconds = {}
+            self.executes = 0
+            self.errors = 0
+            self.execute_seconds = 0.0
+            self.first_row_seconds = 0.0
+            self.fetches = 0
+            self.rows = 0
+            self.bytes = 0
+            self.fetch_seconds = 0.0
+            self.conversion = {}
+
+    def on_connect(self, connection, timings):
+        with self._lock:
+            self.connects += 1
+            for phase, seconds in timings.items():
+                self.connect_seconds[phase] = self.connect_seconds.get(phase, 0.0) + seconds
+
+    def on_execute(self, cursor, operation, seconds, error=None):
+        with self._lock:
+            self.executes += 1
+            self.errors += error is not None
+            self.execute_seconds += seconds
+
+    def on_first_row(self, cursor, operation, seconds):
+        with self._lock:
+            self.first_row_seconds += seconds
+
+    def on_fetch(self, cursor, operation, rows, seconds, size):
+        with self._lock:
+            self.fetches += 1
+            self.rows += rows
+            self.bytes += size
+            self.fetch_seconds += seconds
+
+    def on_conversion(self, cursor, operation, timings):
+        with self._lock:
+            for type_name, (values, seconds) in timings.items():
+                total_values, total_seconds = self.conversion.get(type_name, (0, 0.0))
+                self.conversion[type_name] = (total_values + values, total_seconds + seconds)
+
+    def stats(self):
+        """
+        :rtype: dict
+        """
+        with self._lock:
+            return {'connects': self.connects, 'connect_seconds': dict(self.connect_seconds),
+                    'executes': self.executes, 'errors': self.errors, 'execute_seconds': self.execute_seconds,
+                    'first_row_seconds': self.first_row_seconds, 'fetches': self.fetches, 'rows': self.rows,
+                    'bytes': self.bytes, 'fetch_seconds': self.fetch_seconds, 'conversion': dict(self.conversion)}
+
+
+class PrometheusListener(Listener):
+    """
+    Export timings as Prometheus metrics with ``prometheus_client``
+    """
+
+    def __init__(self, registry=None, namespace='hivejdbc'):
+        """
+        :param registry: ``prometheus_client.CollectorRegistry``, defaults to the global registry
+        :param namespace: metric name prefix
+        """
+        prometheus = _import('prometheus_client', 'prometheus')
+        options = {'namespace': namespace}
+        if registry is not None:
+            options['registry'] = registry
+        self.connect_seconds = prometheus.Histogram('connect_seconds', 'time to open a connection per phase',
+                                                    ['phase'], **options)
+        self.execute_seconds = prometheus.Histogram('execute_seconds', 'time to execute a statement', **options)
+        self.execute_errors = prometheus.Counter('execute_errors', 'statements that failed', **options)
+        self.first_row_seconds = prometheus.Histogram('first_row_seconds', 'time from execute to the first row',
+                                                      **options)
+        self.fetch_seconds = prometheus.Histogram('fetch_seconds', 'time to fetch a batch of rows', **options)
+        self.rows = prometheus.Counter('rows', 'rows fetched', **options)
+        self.bytes = prometheus.Counter('bytes', 'approximate bytes of rows fetched', **options)
+        self.conversion_seconds = prometheus.Counter('conversion_seconds', 'time converting values per type',
+                                                     ['type'], **options)
+        self.conversion_values = prometheus.Counter('conversion_values', 'values converted per type', ['type'],
+                                                    **options)
+
+    def on_connect(self, connection, timings):
+        for phase, seconds in timings.items():
+            self.connect_seconds.labels(phase).observe(seconds)
+
+    def on_execute(self, cursor, operation, seconds, error=None):
+        self.execute_seconds.observe(seconds)
+        if error is not None:
+            self.execute_errors.inc()
+
+    def on_first_row(self, cursor, operation, seconds):
+        self.first_row_seconds.observe(seconds)
+
+    def on_fetch(self, cursor, operation, rows, seconds, size):
+        self.fetch_seconds.observe(seconds)
+        self.rows.inc(rows)
+        self.bytes.inc(size)
+
+    def on_conversion(self, cursor, operation, timings):
+        for type_name, (values, seconds) in timings.items():
+            self.conversion_values.labels(type_name).inc(values)
+            self.conversion_seconds.labels(type_name).inc(seconds)
+
+
+class OpenTelemetryListener(Listener):
+    """
+    Export timings as OpenTelemetry spans and metrics
+
+    Each connect and execute becomes a span, fetch and conversion timings are recorded as histograms.
+    """
+
+    def __init__(self, tracer_provider=None, meter_provider=None):
+        """
+        :param tracer_provider: defaults to the global tracer provider
+        :param meter_provider: defaults to the global meter provider
+        """
+        trace = _import('opentelemetry.trace', 'opentelemetry')
+        metrics = _import('opentelemetry.metrics', 'opentelemetry')
+        self._status = trace.Status
+        self._error = trace.StatusCode.ERROR
+        self.tracer = trace.get_tracer('hivejdbc', tracer_provider=tracer_provider)
+        meter = metrics.get_meter('hivejdbc', meter_provider=meter_provider)
+        self.first_row_seconds = meter.create_histogram('hivejdbc.first_row.duration', unit='s')
+        self.fetch_seconds = meter.create_histogram('hivejdbc.fetch.duration', unit='s')
+        self.rows = meter.create_counter('hivejdbc.rows')
+        self.bytes = meter.create_counter('hivejdbc.bytes', unit='By')
+        self.conversion_seconds = meter.create_histogram('hivejdbc.conversion.duration', unit='s')
+
+    def _span(self, name, seconds, attributes, error=None):
+        end = time.time_ns()
+        span = self.tracer.start_span(name, start_time=end - int(seconds * 1e9), attributes=attributes)
+        if error is not None:
+            span.record_exception(error)
+            span.set_status(self._status(self._error, str(error)))
+        span.end(end_time=end)
+
+    def on_connect(self, connection, timings):
+        attributes = {'hivejdbc.connect.{}'.format(phase): seconds for phase, seconds in timings.items()}
+        self._span('hivejdbc.connect', timings.get('total', 0.0), attributes)
+
+    def on_execute(self, cursor, operation, seconds, error=None):
+        self._span('hivejdbc.execute', seconds, {'db.system': 'hive', 'db.statement': operation}, error)
+
+    def on_first_row(self, cursor, operation, seconds):
+        self.first_row_seconds.record(seconds)
+
+    def on_fetch(self, cursor, operation, rows, seconds, size):
+        self.fetch_seconds.record(seconds)
+        self.rows.add(rows)
+        self.bytes.add(size)
+
+    def on_conversion(self, cursor, operation, timings):
+        for type_name, (values, seconds) in timings.items():
+            self.conversion_seconds.record(seconds, {'hive.type': type_name})
@@ -0,0 +1,95 @@
+"""
+Helpers for calling into the jvm from python threads
+
+JPype attaches any thread that calls into Java automatically, threads started by `hivejdbc` attach explicitly as
+daemon threads so they never prevent the jvm from shutting down.
+
+JPype is imported when first needed, importing this module is cheap.
+"""
+__all__ = ['attach_thread', 'jvm_call', 'JvmThreadPoolExecutor', 'prewarm', 'wait_prewarm']
+
+import copy
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from os.path import abspath
+
+log = logging.getLogger(__name__)
+
+_prewarm_thread = None
+_prewarm_lock = threading.Lock()
+
+
+def attach_thread():
+    """attach the current thread to the jvm as a daemon thread, does nothing if the jvm is not running"""
+    import jpype
+    from pyjdbc.java import Jvm
+
+    if Jvm.is_running() and not jpype.isThreadAttachedToJVM():
+        jpype.JClass('java.lang.Thread').attachAsDaemon()
+
+
+def jvm_call(fn, *args, **kwargs):
+    """call ``fn`` after attaching the current thread to the jvm"""
+    attach_thread()
+    return fn(*args, **kwargs)
+
+
+class JvmThreadPoolExecutor(ThreadPoolExecutor):
+    """
+    ``ThreadPoolExecutor`` whose worker threads are attached to the jvm as daemon threads before running a task
+    """
+
+    def __init__(self, max_workers=None, thread_name_prefix='hivejdbc'):
+        super().__init__(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+
+    def submit(self, fn, *args, **kwargs):
+        return super().submit(jvm_call, fn, *args, **kwargs)
+
+
+def _load_driver(driver):
+    from hivejdbc.driver import connect
+
+    connect_function = copy.copy(connect)
+    connect_function.driver_path = abspath(driver) if driver else None
+    try:
+        connect_function.prepare_jvm()
+        connect_function.load_driver()
+    except Exception as e:
+        # `connect` loads the driver again and reports the error
+        log.warning('jvm pre-warm failed: %s', e)
+
+
+def prewarm(driver=None, wait=False):
+    """
+    Start the jvm and load ``org.apache.hive.jdbc.HiveDriver`` on a background thread
+
+    Call this as early as possible, jvm startup then overlaps with the rest of the program startup. ``connect``
+    waits for the pre-warm to finish. Jvm options given to ``connect`` later (kerberos ``krb5_conf``, ``kdc``,
+    ``realm``) are applied as system properties of the running jvm.
+
+    Setting the environment variable ``HIVEJDBC_PREWARM=1`` pre-warms when ``hivejdbc`` is imported, using the
+    driver jar in ``HIVEJDBC_DRIVER`` if set.
+
+    :param driver: location of the hive uber-jar, as for the ``driver`` argument of ``connect``
+    :param wait: block until the driver is loaded
+    :return: the pre-warm thread
+    :rtype: threading.Thread
+    """
+    global _prewarm_thread
+    with _prewarm_lock:
+        if _prewarm_thread is None:
+            _prewarm_thread = threading.Thread(target=_load_driver, args=(driver,), name='hivejdbc-prewarm',
+                                               daemon=True)
+            _prewarm_thread.start()
+        thread = _prewarm_thread
+    if wait:
+        thread.join()
+    return thread
+
+
+def wait_prewarm():
+    """wait for a pre-warm started by ``prewarm`` to finish, returns immediately if none was started"""
+    thread = _prewarm_thread
+    if thread is not None and thread is not threading.current_thread():
+        thread.join()
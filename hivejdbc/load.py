@@ -0,0 +1,364 @@
+"""
+Bulk loading
+
+Inserting rows through JDBC sends every value through HiveServer2 as sql text. ``bulk_load`` writes the rows to
+ORC, Parquet or delimited text files in a staging directory Hive can read, several files at once, and moves them
+into the table with a single statement:
+
+``method='load'``
+    ``LOAD DATA INPATH ... INTO TABLE``, the files are moved into the table as they are. The table must be stored
+    as ``format`` with the columns in the same order.
+``method='insert'``
+    ``CREATE EXTERNAL TABLE`` over the staged files followed by ``INSERT ... SELECT``, for tables stored in another
+    format, partitioned or bucketed tables.
+
+    rows = [(1, 'Bob', datetime.date(2020, 1, 1)), (2, 'Alice', None)]
+    hivejdbc.bulk_load(conn, 'test.persons', rows, columns=['id', 'name', 'first'],
+                       staging_dir='/mnt/hdfs/tmp/staging', staging_location='hdfs:///tmp/staging')
+
+Column types are mapped from the python values with ``HiveTypeConversion.column_type`` unless a ``schema`` is given.
+ORC and Parquet files are written with pyarrow: ``pip install hivejdbc[arrow]``.
+"""
+__all__ = ['bulk_load', 'FORMATS', 'METHODS', 'MODES', 'arrow_type']
+
+import base64
+import datetime
+import math
+import os
+import posixpath
+import re
+import shutil
+import tempfile
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from pyjdbc.exceptions import NotSupportedError
+
+from hivejdbc import sql
+from hivejdbc.columnar import _import
+from hivejdbc.types import HiveTypeConversion
+
+FORMATS = ('orc', 'parquet', 'csv')
+METHODS = ('load', 'insert')
+MODES = ('append', 'overwrite')
+
+# rows written to each staged file, files are written in parallel
+DEFAULT_ROWS_PER_FILE = 1000000
+
+STORAGE = {
+    'orc': 'STORED AS ORC',
+    'parquet': 'STORED AS PARQUET',
+    # `LazySimpleSerDe` text: fields separated by commas, delimiters, backslashes and line breaks escaped with a
+    # backslash and nulls written as \N
+    'csv': "ROW FORMAT DELIMITED FIELDS TERMINATED BY ',' ESCAPED BY '\\\\' STORED AS TEXTFILE",
+}
+PROPERTIES = {
+    'csv': " TBLPROPERTIES ('serialization.escape.crlf'='true')",
+}
+
+PRIMITIVE_ARROW_TYPES = {
+    'BOOLEAN': 'bool_',
+    'TINYINT': 'int8',
+    'SMALLINT': 'int16',
+    'INT': 'int32',
+    'INTEGER': 'int32',
+    'BIGINT': 'int64',
+    'FLOAT': 'float32',
+    'DOUBLE': 'float64',
+    'STRING': 'string',
+    'VARCHAR': 'string',
+    'CHAR': 'string',
+    'DATE': 'date32',
+    'BINARY': 'binary',
+}
+
+TEXT_ESCAPES = {
+    '\\': '\\\\',
+    ',': '\\,',
+    '\n': '\\n',
+    '\r': '\\r',
+}
+TEXT_NULL = '\\N'
+
+TABLE_NAME = re.compile(sql.NAME)
+
+
+def _split(text):
+    """split a list of types on the commas outside of ``<>`` and ``()``"""
+    parts = []
+    depth = 0
+    start = 0
+    for idx, char in enumerate(text):
+        if char in '<(':
+            depth += 1
+        elif char in '>)':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            parts.append(text[start:idx].strip())
+            start = idx + 1
+    parts.append(text[start:].strip())
+    return parts
+
+
+def arrow_type(hive_type):
+    """
+    The pyarrow ``DataType`` of a Hive column type
+
+    :param hive_type: Hive type, ie: ``BIGINT``, ``DECIMAL(10,2)`` or ``MAP<STRING,ARRAY<INT>>``
+    :return: pyarrow data type
+    :raises: ValueError for unsupported types
+    """
+    pyarrow = _import('pyarrow', 'arrow')
+    hive_type = hive_type.strip()
+    name, _, inner = hive_type.partition('<')
+    name, _, arguments = name.partition('(')
+    name = name.strip().upper()
+    inner = inner[:-1] if inner.endswith('>') else inner
+    arguments = arguments.rstrip(')')
+
+    if name == 'ARRAY':
+        return pyarrow.list_(arrow_type(inner))
+    if name == 'MAP':
+        key, value = _split(inner)
+        return pyarrow.map_(arrow_type(key), arrow_type(value))
+    if name == 'STRUCT':
+        fields = []
+        for field in _split(inner):
+            field_name, _, field_type = field.partition(':')
+            fields.append((field_name.strip().strip('`'), arrow_type(field_type)))
+        return pyarrow.struct(fields)
+    if name in ('DECIMAL', 'NUMERIC'):
+        precision, scale = (_split(arguments) + ['0'])[:2] if arguments else (10, 0)
+        return pyarrow.decimal128(int(precision), int(scale))
+    if name == 'TIMESTAMP':
+        return pyarrow.timestamp('us')
+    if name in PRIMITIVE_ARROW_TYPES:
+        return getattr(pyarrow, PRIMITIVE_ARROW_TYPES[name])()
+    raise ValueError('unable to map Hive type to an arrow type: {}'.format(hive_type))
+
+
+def _text(value):
+    """a value as a field of a delimited text file"""
+    if value is None:
+        return TEXT_NULL
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, float):
+        if math.isnan(value):
+            return 'NaN'
+        if math.isinf(value):
+            return 'Infinity' if value > 0 else '-Infinity'
+        return repr(value)
+    if isinstance(value, datetime.datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S.%f')
+    if isinstance(value, datetime.date):
+        return value.strftime('%Y-%m-%d')
+    if isinstance(value, (bytes, bytearray)):
+        return base64.b64encode(bytes(value)).decode('ascii')
+    return ''.join(TEXT_ESCAPES.get(char, char) for char in str(value))
+
+
+def _frame_columns(frame):
+    columns = []
+    for idx in range(frame.shape[1]):
+        series = frame.iloc[:, idx].astype(object)
+        columns.append(series.where(series.notna(), None).tolist())
+    return [str(name) for name in frame.columns], columns
+
+
+def _columns(data, columns=None):
+    """
+    Column names and values of a ``pandas.DataFrame``, or a sequence of tuples or dicts
+
+    :return: tuple of (names, list of column value lists)
+    """
+    if hasattr(data, 'iloc') and hasattr(data, 'columns'):
+        return _frame_columns(data)
+
+    rows = list(data)
+    if rows and isinstance(rows[0], dict):
+        names = list(columns or rows[0])
+        return names, [[row.get(name) for row in rows] for name in names]
+
+    if columns is None:
+        raise ValueError('`columns` is required unless the rows are dicts or a DataFrame')
+    names = list(columns)
+    for row in rows:
+        if len(row) != len(names):
+            raise ValueError('expected {} values per row, got: {!r}'.format(len(names), row))
+    if not rows:
+        return names, [[] for _ in names]
+    return names, [list(column) for column in zip(*rows)]
+
+
+def _quote(name):
+    return '`{}`'.format(name.replace('`', '``'))
+
+
+class _Stage:
+    """a staging directory on the local filesystem or a ``pyarrow.fs.FileSystem``"""
+
+    def __init__(self, staging_dir, staging_location=None, filesystem=None):
+        name = 'hivejdbc-load-{}'.format(uuid.uuid4().hex)
+        self.filesystem = filesystem
+        if filesystem is None:
+            self.path = os.path.join(os.path.abspath(staging_dir), name)
+            default_location = 'file://' + self.path
+        else:
+            self.path = posixpath.join(staging_dir, name)
+            default_location = self.path
+        self.location = posixpath.join(staging_location, name) if staging_location else default_location
+
+    def create(self):
+        if self.filesystem is None:
+            os.makedirs(self.path)
+        else:
+            self.filesystem.create_dir(self.path, recursive=True)
+
+    def open(self, name):
+        if self.filesystem is None:
+            return open(os.path.join(self.path, name), 'wb')
+        return self.filesystem.open_output_stream(posixpath.join(self.path, name))
+
+    def remove(self):
+        if self.filesystem is None:
+            shutil.rmtree(self.path, ignore_errors=True)
+        else:
+            self.filesystem.delete_dir(self.path)
+
+
+def _write_file(stage, name, file_format, names, columns, types):
+    if file_format == 'csv':
+        lines = [','.join(_text(value) for value in row) for row in zip(*columns)]
+        with stage.open(name) as fp:
+            fp.write(''.join(line + '\n' for line in lines).encode('utf8'))
+        return
+
+    pyarrow = _import('pyarrow', 'arrow')
+    table = pyarrow.table([pyarrow.array(values, type=arrow_type(hive_type))
+                           for values, hive_type in zip(columns, types)], names=names)
+    with stage.open(name) as fp:
+        if file_format == 'parquet':
+            # int96 timestamps are readable by every Hive version
+            _import('pyarrow.parquet', 'arrow').write_table(table, fp, use_deprecated_int96_timestamps=True)
+        else:
+            _import('pyarrow.orc', 'arrow').write_table(table, fp)
+
+
+def _write_files(stage, file_format, names, columns, types, rows_per_file, workers):
+    """write the rows in files of at most ``rows_per_file`` rows, returns the file names"""
+    count = len(columns[0]) if columns else 0
+    starts = range(0, count, rows_per_file)
+    files = ['part-{:05d}.{}'.format(idx, file_format) for idx in range(len(starts))]
+    workers = workers or min(len(files), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix='hivejdbc-load') as executor:
+        futures = [executor.submit(_write_file, stage, name, file_format, names,
+                                   [column[start:start + rows_per_file] for column in columns], types)
+                   for name, start in zip(files, starts)]
+        for future in futures:
+            future.result()
+    return files
+
+
+def _statements(table, staging_table, file_format, names, types, location, mode, method, create, literal):
+    """the statements loading the staged files, and the statements to run once they completed or failed"""
+    columns = ', '.join('{} {}'.format(_quote(name), hive_type) for name, hive_type in zip(names, types))
+    storage = STORAGE[file_format]
+    properties = PROPERTIES.get(file_format, '')
+    overwrite = mode == 'overwrite'
+
+    statements = []
+    if create:
+        statements.append('CREATE TABLE IF NOT EXISTS {} ({}) {}{}'.format(table, columns, storage, properties))
+    if method == 'load':
+        statements.append('LOAD DATA INPATH {} {}INTO TABLE {}'.format(literal(location),
+                                                                       'OVERWRITE ' if overwrite else '', table))
+        return statements, []
+
+    statements.append('CREATE EXTERNAL TABLE {} ({}) {} LOCATION {}{}'.format(staging_table, columns, storage,
+                                                                              literal(location), properties))
+    statements.append('INSERT {} TABLE {} SELECT {} FROM {}'.format('OVERWRITE' if overwrite else 'INTO', table,
+                                                                    ', '.join(_quote(name) for name in names),
+                                                                    staging_table))
+    return statements, ['DROP TABLE IF EXISTS {}'.format(staging_table)]
+
+
+def bulk_load(connection, table, data, format='orc', staging_dir=None, columns=None, schema=None, mode='append',
+              method='load', create=False, staging_location=None, filesystem=None,
+              rows_per_file=DEFAULT_ROWS_PER_FILE, workers=None):
+    """
+    Load rows into a table through staged files
+
+    The staging directory is removed once the rows are loaded or the load failed.
+
+    :param connection: connection returned by ``hivejdbc.connect``
+    :param table: table name, optionally qualified with the database: ``db.table``
+    :param data: a ``pandas.DataFrame`` or a sequence of rows, rows are tuples or dicts
+    :param format: format of the staged files: ``orc``, ``parquet`` or ``csv`` (comma delimited text)
+    :param staging_dir: directory the files are written to, defaults to the temporary directory
+    :param columns: column names of tuple rows, or the keys selected from dict rows
+    :param schema: Hive type of each column, a list or a dict by column name, mapped from the values if not given
+    :param mode: ``append`` or ``overwrite`` the rows of the table
+    :param method: ``load`` moves the files into the table, ``insert`` selects from an external staging table
+    :param create: create the table (stored as ``format``) if it does not exist
+    :param staging_location: location of ``staging_dir`` as seen by Hive, ie: ``hdfs:///tmp/staging``.
+                             Defaults to ``staging_dir`` (a ``file://`` url on the local filesystem)
+    :param filesystem: ``pyarrow.fs.FileSystem`` the files are written to, defaults to the local filesystem
+    :param rows_per_file: maximum number of rows per staged file
+    :param workers: number of files written in parallel, defaults to the number of cpus
+    :return: number of rows loaded
+    :rtype: int
+    """
+    if format not in FORMATS:
+        raise ValueError('format must be one of {}, got: {}'.format(FORMATS, format))
+    if mode not in MODES:
+        raise ValueError('mode must be one of {}, got: {}'.format(MODES, mode))
+    if method not in METHODS:
+        raise ValueError('method must be one of {}, got: {}'.format(METHODS, method))
+    if not TABLE_NAME.fullmatch(table):
+        raise ValueError('invalid table name: {}'.format(table))
+    if rows_per_file < 1:
+        raise ValueError('rows_per_file must be at least 1, got: {}'.format(rows_per_file))
+
+    names, values = _columns(data, columns)
+    if not names:
+        raise ValueError('no columns to load')
+    count = len(values[0])
+    if not count:
+        return 0
+
+    conversion = getattr(connection, '_type_conversion', None) or HiveTypeConversion()
+    if schema is None:
+        types = [conversion.column_type(column) for column in values]
+    elif isinstance(schema, dict):
+        types = [schema.get(name) or conversion.column_type(column) for name, column in zip(names, values)]
+    else:
+        types = list(schema)
+    if len(types) != len(names):
+        raise ValueError('schema has {} types for {} columns'.format(len(types), len(names)))
+    if format == 'csv':
+        for name, hive_type in zip(names, types):
+            if '<' in hive_type:
+                raise NotSupportedError('column "{}" of type {} cannot be loaded from csv files, '
+                                        'use the orc or parquet format'.format(name, hive_type))
+
+    stage = _Stage(staging_dir or tempfile.gettempdir(), staging_location, filesystem)
+    staging_table = '{}_staging_{}'.format(table, uuid.uuid4().hex[:12])
+    statements, cleanup = _statements(table, staging_table, format, names, types, stage.location, mode, method,
+                                      create, conversion.sql_literal)
+    stage.create()
+    try:
+        _write_files(stage, format, names, values, types, rows_per_file, workers)
+        cursor = connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            try:
+                for statement in cleanup:
+                    cursor.execute(statement)
+            finally:
+                cursor.close()
+    finally:
+        stage.remove()
+    return count
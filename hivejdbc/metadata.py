@@ -0,0 +1,262 @@
+"""
+Metadata caches
+
+Reading ``ResultSetMetaData`` takes several calls into the jvm for every column. A ``ColumnInfo`` holds the column
+descriptors of a result set, read once per result set. A ``MetadataCache`` given to the connection keeps them per
+query so executing a query again only checks the column types. Rows are converted by readers ``HiveTypeConversion``
+resolves once per column type.
+
+    conn = hivejdbc.connect('example.com', 'default', metadata_cache=MetadataCache(ttl=300))
+
+``CatalogCache`` keeps the results of catalog statements (``DESCRIBE``, ``SHOW PARTITIONS``, ``SHOW TABLES``, ...)
+and of ``cursor.columns()``:
+
+    conn = hivejdbc.connect('example.com', 'default', catalog_cache=CatalogCache(ttl=600))
+
+Both caches are invalidated by statements writing or altering a table executed through the connection, changes made
+by other clients are only noticed when entries expire.
+"""
+__all__ = ['ColumnInfo', 'MetadataCache', 'CatalogCache', 'unprefixed_names']
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from hivejdbc import sql
+from hivejdbc.cache import ResultCache, _freeze_params
+
+# java.lang.Integer.MAX_VALUE, returned by some drivers when column metadata is not present
+JAVA_MAX_INT = 2147483647
+
+
+def unprefixed_names(names):
+    """
+    Hive prefixes column names with the table name, the prefix is removed unless it is needed to tell the columns
+    apart
+
+    >>> unprefixed_names(['p.name', 'p.age'])
+    ['name', 'age']
+    >>> unprefixed_names(['a.id', 'b.id'])
+    ['a.id', 'b.id']
+
+    :param names: column names from the result set metadata
+    :rtype: list
+    """
+    if names and '.' in names[0]:
+        no_prefix = [name.split('.', 1)[-1] for name in names]
+        if len(set(no_prefix)) == len(names):
+            return no_prefix
+    return list(names)
+
+
+class ColumnInfo:
+    """column descriptors of a result set"""
+    __slots__ = ('names', 'column_names', 'codes', 'type_names', 'description')
+
+    def __init__(self, names, codes, type_names, description):
+        """
+        :param names: column names as reported by the result set metadata
+        :param codes: java.sql.Types codes of the columns
+        :param type_names: ``ResultSetMetaData.getColumnTypeName()`` of the columns
+        :param description: dbapi ``cursor.description``
+        """
+        self.names = names
+        self.column_names = unprefixed_names(names)
+        self.codes = codes
+        self.type_names = type_names
+        self.description = description
+
+    @classmethod
+    def read(cls, metadata, type_conversion):
+        """
+        Read the descriptors of all columns
+
+        :param metadata: Java ResultSetMetaData object
+        :param type_conversion: type conversion instance
+        :rtype: ColumnInfo
+        """
+        names = []
+        codes = []
+        type_names = []
+        description = []
+        for col in range(1, metadata.getColumnCount() + 1):
+            name = str(metadata.getColumnName(col))
+            jdbc_type = int(metadata.getColumnType(col))
+            column_type_name = str(metadata.getColumnTypeName(col))
+            if jdbc_type == 0:  # NULL
+                type_desc = 'NULL'
+            else:
+                dbapi_type = type_conversion.py_type(jdbc_type)
+                dbapi_type_str = getattr(dbapi_type, '__name__', None) or str(dbapi_type)
+                jdbc_type_name = type_conversion.jdbc_name(jdbc_type) or column_type_name.upper()
+                type_desc = '{} - JDBC:{}'.format(dbapi_type_str, jdbc_type_name)
+
+            size = metadata.getColumnDisplaySize(col)
+            size = size if size != JAVA_MAX_INT else None
+            precision = metadata.getPrecision(col)
+            precision = precision if precision != JAVA_MAX_INT else None
+            scale = metadata.getScale(col)
+            scale = scale if scale != JAVA_MAX_INT else None
+
+            names.append(name)
+            codes.append(jdbc_type)
+            type_names.append(column_type_name)
+            description.append((name, type_desc, size, size, precision, scale, metadata.isNullable(col)))
+        return cls(names, codes, type_names, description)
+
+
+class MetadataCache:
+
+    def __init__(self, ttl=300.0, max_entries=256):
+        """
+        :param ttl: seconds the column descriptors of a query are kept, ``None`` keeps them until they are
+                    invalidated or evicted, ``0`` disables the cache
+        :param max_entries: maximum number of queries
+        """
+        if max_entries < 1:
+            raise ValueError('max_entries must be at least 1, got: {}'.format(max_entries))
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (ColumnInfo, tables, expires), least recently used first
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def stats(self):
+        """
+        :return: cache counters
+        :rtype: dict
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'invalidations': self.invalidations,
+                'entries': len(self._entries)}
+
+    @staticmethod
+    def key(operation, database=None, settings=None):
+        """
+        Build the cache key of a query
+
+        :param operation: sql text
+        :param database: current database of the session
+        :param settings: ``dict`` of session settings
+        :return: cache key, ``None`` if the statement is not a query or its tables could not be determined
+        :rtype: str
+        """
+        if not sql.is_query(operation) or sql.table_references(operation, database)[0] is None:
+            return None
+        identity = (sql.normalize(operation), (database or '').lower(), tuple(sorted((settings or {}).items())))
+        return hashlib.sha256(repr(identity).encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """
+        :param key: key from ``MetadataCache.key``
+        :return: the column descriptors, ``None`` on a miss
+        :rtype: ColumnInfo
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[2] is None or entry[2] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, info, tables=()):
+        """
+        :param key: key from ``MetadataCache.key``
+        :param info: the column descriptors of the query
+        :type info: ColumnInfo
+        :param tables: qualified names of the tables the query reads
+        """
+        if self.ttl is not None and self.ttl <= 0:
+            return
+        expires = None if self.ttl is None else time.monotonic() + self.ttl
+        with self._lock:
+            self._entries[key] = (info, frozenset(tables), expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *tables):
+        """
+        Remove the descriptors of the queries reading from any of the given tables
+
+        :param tables: table names, qualified with the database (``sales.orders``)
+        :return: number of queries removed
+        :rtype: int
+        """
+        tables = {table.lower() for table in tables}
+        with self._lock:
+            keys = [key for key, entry in self._entries.items() if entry[1] & tables]
+            for key in keys:
+                del self._entries[key]
+            self.invalidations += len(keys)
+        return len(keys)
+
+    def clear(self):
+        """remove all entries"""
+        with self._lock:
+            self._entries.clear()
+
+
+class CatalogCache(ResultCache):
+    """
+    ``ResultCache`` of catalog statements: ``DESCRIBE``, ``SHOW PARTITIONS``, ``SHOW COLUMNS``, ``SHOW TABLES``,
+    ``SHOW CREATE TABLE``, ``SHOW TBLPROPERTIES`` and ``cursor.columns()``
+    """
+
+    def __init__(self, ttl=300.0, max_entries=1024, max_bytes=16 * 1024 * 1024, **kwargs):
+        """
+        :param ttl: default seconds a result is cached, ``None`` caches results until they are invalidated
+        :param max_entries: maximum number of results held in memory
+        :param max_bytes: maximum approximate memory used by cached rows
+        :param kwargs: other arguments of ``hivejdbc.cache.ResultCache``
+        """
+        super().__init__(ttl=ttl, max_entries=max_entries, max_bytes=max_bytes, **kwargs)
+
+    @staticmethod
+    def key(operation, params=None, database=None, settings=None):
+        """
+        Build the cache key of a catalog statement
+
+        :return: cache key, ``None`` if the statement is not a catalog statement
+        :rtype: str
+        """
+        if sql.catalog_references(operation, database) is None:
+            return None
+        identity = ('catalog', sql.normalize(operation), _freeze_params(params), (database or '').lower())
+        return hashlib.sha256(repr(identity).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def columns_key(table):
+        """
+        :param table: qualified table name
+        :return: cache key of the ``cursor.columns()`` result of a table
+        :rtype: str
+        """
+        identity = ('getColumns', table.lower())
+        return hashlib.sha256(repr(identity).encode('utf-8')).hexdigest()
+
+    def tables(self, operation, database=None):
+        return sql.catalog_references(operation, database) or set()
+
+    def invalidate(self, *tables):
+        """
+        Remove the cached results describing any of the given tables, and the table lists of their databases
+
+        :param tables: table names, qualified with the database (``sales.orders``)
+        :return: number of results removed from memory
+        :rtype: int
+        """
+        names = set(tables)
+        if names:
+            names.add('*')
+        for table in tables:
+            if '.' in table:
+                names.add('{}.*'.format(table.split('.', 1)[0]))
+        return super().invalidate(*names)
@@ -0,0 +1,166 @@
+"""
+Server reachability checks
+
+``check_server`` resolves the host with ``getaddrinfo`` (IPv4 and IPv6), caching the addresses for ``DNS_TTL``
+seconds, and connects to the resolved addresses happy-eyeballs style: the next address is attempted when the
+previous one has not answered within ``ATTEMPT_DELAY`` seconds, the first address accepting the connection wins.
+A slow resolver or a single unreachable address no longer stalls every connect.
+"""
+__all__ = ['check_server', 'resolve', 'clear_dns_cache', 'DNS_TTL', 'ATTEMPT_DELAY', 'DEFAULT_TIMEOUT']
+
+import errno
+import os
+import selectors
+import socket
+import threading
+import time
+
+from pyjdbc.exceptions import Error
+
+# seconds resolved addresses are cached
+DNS_TTL = 60.0
+# seconds before the next address is attempted while earlier attempts are pending, see RFC 8305
+ATTEMPT_DELAY = 0.25
+# seconds a reachability check may take when no timeout is given
+DEFAULT_TIMEOUT = 10.0
+
+_DNS_CACHE = {}
+_DNS_LOCK = threading.Lock()
+
+_IN_PROGRESS = (errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY, getattr(errno, 'WSAEWOULDBLOCK', None))
+
+
+def _interleave(addresses):
+    """alternate address families, starting with the family of the first address"""
+    families = []
+    for address in addresses:
+        for family in families:
+            if family[0][0] == address[0]:
+                family.append(address)
+                break
+        else:
+            families.append([address])
+
+    ordered = []
+    while any(families):
+        for family in families:
+            if family:
+                ordered.append(family.pop(0))
+    return ordered
+
+
+def resolve(hostname, port, ttl=None):
+    """
+    Resolve the TCP addresses of a host, results are cached
+
+    :param hostname: host name or ip address
+    :param port: port number
+    :param ttl: seconds to cache the addresses, defaults to ``DNS_TTL``
+    :return: list of (address family, socket address) tuples, alternating IPv6 and IPv4 addresses
+    :rtype: list
+    :raises: socket.gaierror if the host cannot be resolved
+    """
+    key = (hostname, int(port))
+    now = time.monotonic()
+    with _DNS_LOCK:
+        cached = _DNS_CACHE.get(key)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+
+    addresses = []
+    for family, _, _, _, sockaddr in socket.getaddrinfo(hostname, int(port), type=socket.SOCK_STREAM):
+        if (family, sockaddr) not in addresses:
+            addresses.append((family, sockaddr))
+    addresses = _interleave(addresses)
+
+    with _DNS_LOCK:
+        _DNS_CACHE[key] = (now + (DNS_TTL if ttl is None else ttl), addresses)
+    return addresses
+
+
+def clear_dns_cache():
+    """forget all resolved addresses"""
+    with _DNS_LOCK:
+        _DNS_CACHE.clear()
+
+
+def _connect_any(addresses, timeout, delay=ATTEMPT_DELAY):
+    """
+    Connect to the first of ``addresses`` accepting a connection, starting a new attempt every ``delay`` seconds
+    (or as soon as an attempt fails) while earlier attempts are pending
+
+    :return: the socket address that accepted the connection
+    :raises: OSError of the last failed attempt, or socket.timeout
+    """
+    pending = list(addresses)
+    attempts = {}
+    error = None
+    deadline = time.monotonic() + timeout
+    next_attempt = 0.0
+    # not `select.select`, it is limited to file descriptors below FD_SETSIZE (1024)
+    selector = selectors.DefaultSelector()
+    try:
+        while pending or attempts:
+            now = time.monotonic()
+            if now >= deadline:
+                raise socket.timeout('timed out after {} seconds'.format(timeout))
+
+            if pending and now >= next_attempt:
+                family, sockaddr = pending.pop(0)
+                sock = socket.socket(family, socket.SOCK_STREAM)
+                sock.setblocking(False)
+                result = sock.connect_ex(sockaddr)
+                if result == 0:
+                    sock.close()
+                    return sockaddr
+                if result not in _IN_PROGRESS:
+                    sock.close()
+                    error = OSError(result, os.strerror(result))
+                    continue
+                attempts[sock] = sockaddr
+                selector.register(sock, selectors.EVENT_WRITE)
+                next_attempt = now + delay
+
+            wait = deadline - now
+            if pending:
+                wait = min(wait, max(next_attempt - now, 0))
+            if not attempts:
+                continue
+
+            for key, _ in selector.select(wait):
+                sock = key.fileobj
+                selector.unregister(sock)
+                sockaddr = attempts.pop(sock)
+                result = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                sock.close()
+                if result == 0:
+                    return sockaddr
+                error = OSError(result, os.strerror(result))
+                # the attempt failed, start the next one right away
+                next_attempt = 0.0
+        raise error
+    finally:
+        selector.close()
+        for sock in attempts:
+            sock.close()
+
+
+def check_server(hostname, port, timeout=None):
+    """
+    Check a server accepts TCP connections
+
+    :param hostname: host name or ip address
+    :param port: port number
+    :param timeout: seconds the check may take (excluding name resolution), defaults to ``DEFAULT_TIMEOUT``
+    :raises: pyjdbc.exceptions.Error if the host cannot be resolved or no address accepts a connection
+    """
+    hostname = hostname.strip()
+    try:
+        addresses = resolve(hostname, port)
+    except socket.gaierror as e:
+        raise Error('Hive server at "{}:{}" is not reachable - {}'.format(hostname, port, e))
+
+    try:
+        _connect_any(addresses, DEFAULT_TIMEOUT if timeout is None else timeout)
+    except Exception as e:
+        raise Error('No Hive server is listening at "{}:{}" - {}'.format(hostname, port, e))
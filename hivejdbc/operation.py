@@ -0,0 +1,240 @@
+"""
+Asynchronous queries
+
+``HiveCursor.execute_async`` submits a statement with ``HiveStatement.executeAsync`` and returns once Hive has
+compiled it, the returned ``QueryHandle`` follows the query while it runs:
+
+    query = cursor.execute_async('insert overwrite table test.summary select ...')
+    while not query.poll():
+        print(query.progress())
+        for line in query.logs():
+            print(line)
+        time.sleep(5)
+    query.result()  # raises if the query failed or was cancelled
+
+A single thread can submit and follow many queries, each handle waits for its query to complete on a daemon
+thread. Asynchronous execution requires the Hive 2.2 (or later) jdbc driver.
+"""
+__all__ = ['QueryHandle', 'parse_progress', 'RUNNING', 'FINISHED', 'FAILED', 'CANCELLED']
+
+import logging
+import re
+import threading
+import time
+
+from pyjdbc.exceptions import DatabaseError, OperationalError
+
+from hivejdbc import instrument
+from hivejdbc.jvm import jvm_call
+
+RUNNING = 'running'
+FINISHED = 'finished'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+# mapreduce: "Stage-1 map = 45%,  reduce = 10%"
+MAPREDUCE_PROGRESS = re.compile(r'\bmap = (\d+)%,\s*reduce = (\d+)%')
+# tez and spark: "Map 1: 4(+2)/8	Reducer 2: 0(+1)/2", "Stage-1_0: 3(+1)/10"
+TASK_PROGRESS = re.compile(r'\b(?:Map|Reducer|Reduce|Stage-[\d_]+)(?: \d+)?: (\d+)(?:\([^)]*\))?/(\d+)')
+
+log = logging.getLogger(__name__)
+
+
+def parse_progress(line):
+    """
+    Progress of the running stage reported by a query log line
+
+    >>> parse_progress('INFO  : 2021-01-01 10:00:00,000 Stage-1 map = 50%,  reduce = 0%')
+    0.25
+    >>> parse_progress('INFO  : Map 1: 4(+2)/8	Reducer 2: 0(+1)/2')
+    0.4
+    >>> parse_progress('INFO  : Compiling command') is None
+    True
+
+    :param line: query log line
+    :return: fraction between 0 and 1, ``None`` if the line does not report progress
+    :rtype: float
+    """
+    match = MAPREDUCE_PROGRESS.search(line)
+    if match:
+        return (int(match.group(1)) + int(match.group(2))) / 200
+
+    tasks = TASK_PROGRESS.findall(line)
+    total = sum(int(count) for _, count in tasks)
+    if total:
+        return sum(int(completed) for completed, _ in tasks) / total
+    return None
+
+
+class QueryHandle:
+    """
+    A query submitted with ``HiveCursor.execute_async``
+    """
+
+    # lines requested from the server per query log fetch
+    log_fetch_size = 1000
+
+    def __init__(self, cursor, statement, operation, has_resultset, listeners=(), started=None):
+        """
+        :param cursor: the cursor that submitted the query, results are read through this cursor
+        :type cursor: hivejdbc.dbapi.HiveCursor
+        :param statement: the ``HiveStatement`` running the query
+        :param operation: sql text
+        :param has_resultset: the query returns rows
+        :param listeners: instrumentation listeners observing the query
+        :param started: ``time.perf_counter()`` when the query was submitted
+        """
+        self._cursor = cursor
+        self._statement = statement
+        self.operation = operation
+        self._has_resultset = has_resultset
+        self._listeners = listeners
+        self._started = time.perf_counter() if started is None else started
+
+        self._state = RUNNING
+        self._error = None
+        self._rowcount = -1
+        self._progress = None
+        self._unread = []
+        self._attached = False
+        self._closed = False
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+
+        self._thread = threading.Thread(target=jvm_call, args=(self._wait,), name='hivejdbc-query', daemon=True)
+        self._thread.start()
+
+    def _wait(self):
+        error = None
+        rowcount = -1
+        try:
+            # blocks until the operation completes, raises if it failed or was cancelled
+            rowcount = self._statement.getUpdateCount()
+        except Exception as e:
+            error = e
+
+        with self._lock:
+            if self._state == RUNNING:
+                self._state = FINISHED if error is None else FAILED
+                self._error = error
+                self._rowcount = rowcount
+        self._done.set()
+
+        if self._listeners:
+            instrument.emit(self._listeners, 'on_execute', self._cursor, self.operation,
+                            time.perf_counter() - self._started, error=error)
+
+    @property
+    def state(self):
+        """
+        :return: ``RUNNING``, ``FINISHED``, ``FAILED`` or ``CANCELLED``
+        :rtype: str
+        """
+        return self._state
+
+    def poll(self):
+        """
+        :return: ``True`` once the query has stopped running
+        :rtype: bool
+        """
+        return self._done.is_set()
+
+    def _fetch_logs(self):
+        if self._closed:
+            return
+        try:
+            lines = [str(line) for line in self._statement.getQueryLog(True, self.log_fetch_size)]
+        except Exception as e:
+            # the server has logging disabled, or the statement has been closed
+            log.debug('unable to fetch query log: %s', e)
+            return
+
+        for line in lines:
+            progress = parse_progress(line)
+            if progress is not None:
+                self._progress = progress
+        self._unread.extend(lines)
+
+    def logs(self):
+        """
+        Fetch the query log lines written since the last call, including the Tez, Spark or MapReduce progress
+        lines Hive logs while the query runs
+
+        :return: new log lines
+        :rtype: list
+        """
+        self._fetch_logs()
+        lines, self._unread = self._unread, []
+        return lines
+
+    def progress(self):
+        """
+        Progress of the running stage, parsed from the query log
+
+        :return: fraction between 0 and 1, ``None`` until the server reports progress
+        :rtype: float
+        """
+        if self._state == FINISHED:
+            return 1.0
+        self._fetch_logs()
+        return self._progress
+
+    def cancel(self):
+        """
+        Cancel the query if it is still running
+
+        :return: ``True`` if the query was running
+        :rtype: bool
+        """
+        with self._lock:
+            if self._state != RUNNING:
+                return False
+            self._state = CANCELLED
+        self._statement.cancel()
+        return True
+
+    def result(self, timeout=None):
+        """
+        Wait for the query to complete, its rows are then read with the fetch methods of the cursor
+
+        :param timeout: seconds to wait, ``None`` waits until the query completes
+        :return: the cursor that submitted the query
+        :rtype: hivejdbc.dbapi.HiveCursor
+        :raises: OperationalError if the query is still running after ``timeout`` seconds or was cancelled,
+                 DatabaseError if the query failed
+        """
+        if not self._done.wait(timeout):
+            raise OperationalError('query is still running after {} seconds:\n{}'.format(timeout, self.operation))
+        if self._state == CANCELLED:
+            raise OperationalError('query was cancelled:\n{}'.format(self.operation))
+        if self._state == FAILED:
+            raise DatabaseError('Error executing statement:\n{}\n{}'.format(self.operation, self._error)) from None
+
+        with self._lock:
+            if not self._attached:
+                self._attached = True
+                self._cursor._attach_result(self._statement, self.operation, self._has_resultset, self._rowcount,
+                                            self._listeners, self._started)
+        return self._cursor
+
+    def close(self):
+        """cancel the query if it is running, and release the statement unless its result is being read"""
+        self.cancel()
+        with self._lock:
+            self._closed = True
+            if self._attached:
+                return
+            self._attached = True
+        try:
+            self._statement.close()
+        except Exception:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __repr__(self):
+        return '<{} {} {!r}>'.format(self.__class__.__name__, self._state, self.operation[:80])
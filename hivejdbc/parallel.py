@@ -0,0 +1,286 @@
+"""
+Parallel, partition aware extraction
+
+A single Hive session serves one query at a time. ``read_table`` discovers the partitions of a table with
+``SHOW PARTITIONS``, runs one query per partition over several sessions opened from the same jvm, and merges the
+results.
+
+    table = hivejdbc.parallel.read_table({'host': 'example.com', 'database': 'default'}, 'logs.events',
+                                         partition_filter={'year': '2020'}, workers=8)
+
+Ordering:
+    ``output='arrow'`` returns partitions in ``SHOW PARTITIONS`` order, rows within a partition are in the order
+    the server returned them. ``output='stream'`` yields row batches as they arrive, batches of different
+    partitions are interleaved.
+
+Limit:
+    ``limit`` caps the total number of rows. It is also applied to every partition query, so which rows are
+    returned is only deterministic for ``output='arrow'``, where the first rows in partition order are kept.
+"""
+__all__ = ['read_table', 'partitions', 'parse_partition', 'partition_predicate']
+
+import logging
+import queue
+import threading
+from urllib.parse import unquote
+
+from pyjdbc.exceptions import Error
+
+from hivejdbc import columnar
+from hivejdbc.jvm import JvmThreadPoolExecutor
+from hivejdbc.pool import ConnectionPool
+from hivejdbc.types import HiveTypeConversion
+
+# value Hive uses for the partition of rows whose partition column is null
+DEFAULT_PARTITION = '__HIVE_DEFAULT_PARTITION__'
+
+_DONE = object()
+
+log = logging.getLogger(__name__)
+
+
+def parse_partition(name):
+    """
+    Parse a partition name as returned by ``SHOW PARTITIONS``
+
+    >>> parse_partition('year=2020/country=US%2FCA')
+    {'year': '2020', 'country': 'US/CA'}
+
+    :param name: partition name, ``key=value`` pairs separated by ``/`` with escaped values
+    :return: partition spec
+    :rtype: dict
+    """
+    spec = {}
+    for part in name.split('/'):
+        key, _, value = part.partition('=')
+        spec[unquote(key)] = unquote(value)
+    return spec
+
+
+def _column(key):
+    """:return: partition column name quoted as an identifier"""
+    return '`{}`'.format(key.replace('`', '``'))
+
+
+def partition_predicate(spec, literal=None):
+    """
+    Build a ``WHERE`` predicate selecting a single partition
+
+    >>> partition_predicate({'year': '2020', 'country': '__HIVE_DEFAULT_PARTITION__'})
+    "`year` = '2020' AND `country` IS NULL"
+
+    :param spec: partition spec
+    :param literal: function rendering a python value as a sql literal
+    :rtype: str
+    """
+    literal = literal or HiveTypeConversion().sql_literal
+    terms = []
+    for key, value in spec.items():
+        column = _column(key)
+        if value == DEFAULT_PARTITION:
+            terms.append('{} IS NULL'.format(column))
+        else:
+            terms.append('{} = {}'.format(column, literal(value)))
+    return ' AND '.join(terms)
+
+
+def partitions(cursor, table, partition_filter=None):
+    """
+    List the partitions of a table
+
+    :param cursor: cursor used to run ``SHOW PARTITIONS``
+    :param table: table name, optionally qualified with the database
+    :param partition_filter: ``dict`` partial partition spec filtered by the server, or a function accepting a
+                             partition spec and returning ``True`` for partitions to keep
+    :return: list of partition specs in ``SHOW PARTITIONS`` order, ``None`` if the table is not partitioned
+    :rtype: list
+    """
+    operation = 'SHOW PARTITIONS {}'.format(table)
+    if isinstance(partition_filter, dict) and partition_filter:
+        operation += ' PARTITION ({})'.format(', '.join(
+            '{} = {}'.format(_column(key), cursor._type_conversion.sql_literal(str(value)))
+            for key, value in partition_filter.items()))
+
+    try:
+        cursor.execute(operation)
+    except Error as e:
+        if 'not a partitioned table' in str(e).lower():
+            return None
+        raise
+
+    specs = [parse_partition(row[0]) for row in cursor.fetchall()]
+    if callable(partition_filter):
+        specs = [spec for spec in specs if partition_filter(spec)]
+    return specs
+
+
+def _select(table, columns, where, spec, limit, literal):
+    terms = [term for term in (where, spec and partition_predicate(spec, literal)) if term]
+    operation = 'SELECT {} FROM {}'.format(', '.join(columns) if columns else '*', table)
+    if terms:
+        operation += ' WHERE ' + ' AND '.join('({})'.format(term) for term in terms)
+    if limit is not None:
+        operation += ' LIMIT {:d}'.format(limit)
+    return operation
+
+
+def _fetch_arrow(pool, operation):
+    with pool.connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(operation)
+            return cursor.fetch_arrow()
+        finally:
+            cursor.close()
+
+
+def _put(out, item, stop):
+    while not stop.is_set():
+        try:
+            out.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _stream_rows(pool, operation, batch_rows, out, stop):
+    if stop.is_set():
+        return
+    try:
+        with pool.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(operation)
+                while not stop.is_set():
+                    rows = cursor.fetchmany(batch_rows)
+                    if not rows or not _put(out, rows, stop):
+                        break
+            finally:
+                cursor.close()
+    except BaseException as e:
+        _put(out, e, stop)
+    finally:
+        _put(out, _DONE, stop)
+
+
+def _read_arrow(pool, executor, operations, limit):
+    futures = [executor.submit(_fetch_arrow, pool, operation) for operation in operations]
+    tables = []
+    rows = 0
+    try:
+        for future in futures:
+            table = future.result()
+            tables.append(table)
+            rows += table.num_rows
+            if limit is not None and rows >= limit:
+                break
+    finally:
+        for future in futures:
+            future.cancel()
+
+    names = tables[0].column_names
+    batches = [batch for table in tables for batch in table.to_batches()]
+    table = columnar.concat_arrow(names, batches, [None] * len(names)) if batches else tables[0]
+    return table.slice(0, limit) if limit is not None else table
+
+
+def _read_stream(pool, executor, operations, limit, batch_rows, workers):
+    out = queue.Queue(maxsize=workers)
+    stop = threading.Event()
+    for operation in operations:
+        executor.submit(_stream_rows, pool, operation, batch_rows, out, stop)
+
+    remaining = len(operations)
+    rows = 0
+    try:
+        while remaining and (limit is None or rows < limit):
+            item = out.get()
+            if item is _DONE:
+                remaining -= 1
+                continue
+            if isinstance(item, BaseException):
+                raise item
+            if limit is not None:
+                item = item[:limit - rows]
+            rows += len(item)
+            yield item
+    finally:
+        stop.set()
+
+
+def read_table(conn_args, table,
+               columns=None,
+               where=None,
+               partition_filter=None,
+               workers=4,
+               limit=None,
+               output='arrow',
+               batch_rows=10000):
+    """
+    Read a table with one query per partition, running ``workers`` queries at a time
+
+    Tables that are not partitioned are read with a single query.
+
+    :param conn_args: ``dict`` of keyword arguments for ``hivejdbc.connect``, or a ``hivejdbc.pool.ConnectionPool``
+    :param table: table name, optionally qualified with the database
+    :param columns: list of column expressions to select, defaults to all columns
+    :param where: additional predicate applied to every partition query
+    :param partition_filter: ``dict`` partial partition spec filtered by the server, or a function accepting a
+                             partition spec and returning ``True`` for partitions to read
+    :param workers: number of Hive sessions used at the same time
+    :param limit: maximum number of rows to return
+    :param output: ``arrow`` returns a ``pyarrow.Table``, ``stream`` returns a generator of row lists
+    :param batch_rows: rows per batch yielded when ``output='stream'``
+    :return: ``pyarrow.Table`` or generator of row lists, close the generator if it is not read to the end
+    """
+    if output not in ('arrow', 'stream'):
+        raise ValueError('output must be "arrow" or "stream", got: {}'.format(output))
+    if workers < 1:
+        raise ValueError('workers must be at least 1, got: {}'.format(workers))
+    if limit is not None and limit < 0:
+        raise ValueError('limit must be `None` or at least 0, got: {}'.format(limit))
+
+    owns_pool = not isinstance(conn_args, ConnectionPool)
+    pool = ConnectionPool(max_size=workers, **conn_args) if owns_pool else conn_args
+    executor = JvmThreadPoolExecutor(max_workers=workers, thread_name_prefix='hivejdbc-parallel')
+
+    def cleanup():
+        executor.shutdown(wait=True)
+        if owns_pool:
+            pool.close()
+
+    try:
+        with pool.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                specs = partitions(cursor, table, partition_filter)
+                literal = cursor._type_conversion.sql_literal
+            finally:
+                cursor.close()
+
+        if specs is None:
+            operations = [_select(table, columns, where, None, limit, literal)]
+        elif specs:
+            operations = [_select(table, columns, where, spec, limit, literal) for spec in specs]
+        else:
+            # no matching partitions, an empty result still carries the column names
+            operations = [_select(table, columns, where, None, 0, literal)]
+        log.debug('reading %s with %d queries over %d sessions', table, len(operations), workers)
+    except BaseException:
+        cleanup()
+        raise
+
+    if output == 'arrow':
+        try:
+            return _read_arrow(pool, executor, operations, limit)
+        finally:
+            cleanup()
+
+    def stream():
+        try:
+            yield from _read_stream(pool, executor, operations, limit, batch_rows, workers)
+        finally:
+            cleanup()
+
+    return stream()
@@ -0,0 +1,330 @@
+"""
+Connection pooling for `hivejdbc`
+
+Opening a Hive session is expensive, the server is probed, the jdbc url is built, and a thrift session is opened
+including any kerberos and ssl handshakes. ``ConnectionPool`` keeps sessions open and hands them out again.
+
+Pools are keyed on the parsed ``HiveArgParser`` arguments, ``get_pool()`` returns the same pool for the same
+connection arguments.
+
+Note that session state (``SET``, ``USE``) is kept by a pooled connection and will be seen by the next borrower.
+"""
+__all__ = ['ConnectionPool', 'PooledConnection', 'get_pool']
+
+import logging
+import threading
+import time
+
+from pyjdbc.exceptions import Error, OperationalError
+
+import hivejdbc
+
+_POOLS = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def _freeze(value):
+    """make argument values hashable so they can be used as part of a pool key"""
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(v) for v in value)
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+
+def pool_key(*args, **kwargs):
+    """
+    Build a hashable key from connection arguments, arguments are parsed with ``HiveArgParser`` so
+    equivalent positional/keyword calls and defaults resolve to the same key.
+
+    :return: tuple of (name, value) pairs
+    :rtype: tuple
+    """
+    arguments = hivejdbc.HiveArgParser(*args, **kwargs).parse()
+    return tuple(sorted((name, _freeze(value)) for name, value in arguments.items()))
+
+
+class PooledConnection:
+    """
+    Wraps a connection checked out from a ``ConnectionPool``
+
+    ``close()`` returns the connection to the pool instead of closing the Hive session.
+    All other attributes are passed through to the wrapped connection.
+    """
+
+    def __init__(self, pool, connection):
+        self._pool = pool
+        self._connection = connection
+        self._released = False
+
+    @property
+    def connection(self):
+        """
+        :return: the wrapped connection
+        :rtype: pyjdbc.dbapi.JdbcConnection
+        """
+        if self._released:
+            raise Error('connection has been returned to the pool')
+        return self._connection
+
+    def cursor(self):
+        return self.connection.cursor()
+
+    def close(self):
+        """return the connection to the pool"""
+        if self._released:
+            return
+        self._released = True
+        self._pool.release(self._connection)
+
+    def __getattr__(self, item):
+        return getattr(self.connection, item)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class ConnectionPool:
+
+    def __init__(self, *args,
+                 min_size=0,
+                 max_size=8,
+                 idle_timeout=600.0,
+                 validate=True,
+                 validation_timeout=5,
+                 connect_function=None,
+                 **kwargs):
+        """
+        A thread-safe pool of Hive connections
+
+        :param args: positional arguments passed to ``hivejdbc.connect``
+        :param min_size: number of connections opened up-front and kept open when idle
+        :param max_size: maximum number of connections open at any time
+        :param idle_timeout: seconds an idle connection above ``min_size`` is kept before it is closed,
+                             ``None`` keeps idle connections open indefinitely
+        :param validate: validate connections when they are borrowed, invalid connections are replaced
+        :param validation_timeout: seconds to wait for ``Connection.isValid()``
+        :param connect_function: function used to open connections, defaults to ``hivejdbc.connect``
+        :param kwargs: keyword arguments passed to ``hivejdbc.connect``
+        """
+        if max_size < 1:
+            raise ValueError('max_size must be at least 1, got: {}'.format(max_size))
+        if min_size < 0 or min_size > max_size:
+            raise ValueError('min_size must be between 0 and max_size ({}), got: {}'.format(max_size, min_size))
+
+        self._log = logging.getLogger(self.__class__.__name__)
+        self._args = args
+        self._kwargs = kwargs
+        self._connect = connect_function or hivejdbc.connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.validate = validate
+        self.validation_timeout = validation_timeout
+
+        self._idle = []  # (connection, returned-at) the most recently returned connection is last
+        self._size = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+        for _ in range(min_size):
+            self._size += 1
+            self._idle.append((self._open(), time.monotonic()))
+
+    @property
+    def size(self):
+        """number of open connections, borrowed and idle"""
+        return self._size
+
+    @property
+    def idle(self):
+        """number of idle connections"""
+        return len(self._idle)
+
+    def _open(self):
+        """open a connection in a slot reserved by incrementing ``_size``, the slot is released if opening fails"""
+        try:
+            connection = self._connect(*self._args, **self._kwargs)
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            if self._connect is hivejdbc.connect:
+                # the server accepted a connection, skip the reachability check when opening further connections
+                self._kwargs.setdefault('probe', False)
+        return connection
+
+    def _discard(self, connection):
+        with self._condition:
+            self._size -= 1
+            self._condition.notify()
+        try:
+            if not connection.is_closed():
+                connection.close()
+        except Exception as e:
+            self._log.debug('error closing pooled connection: %s', e)
+
+    def _is_valid(self, connection):
+        try:
+            if connection.is_closed():
+                return False
+        except Exception:
+            return False
+
+        try:
+            return bool(connection.jdbc_connection().isValid(self.validation_timeout))
+        except Exception:
+            # older Hive drivers do not implement isValid()
+            pass
+
+        try:
+            cursor = connection.cursor()
+            try:
+                cursor.execute('SELECT 1')
+                cursor.fetchall()
+            finally:
+                cursor.close()
+        except Exception as e:
+            self._log.debug('pooled connection failed validation: %s', e)
+            return False
+        return True
+
+    def _expire_idle(self):
+        """close connections that have been idle longer than ``idle_timeout``, must hold the pool lock"""
+        if self.idle_timeout is None:
+            return []
+        now = time.monotonic()
+        expired = []
+        keep = []
+        # the oldest idle connections are first
+        for connection, returned_at in self._idle:
+            if now - returned_at > self.idle_timeout and self._size - len(expired) > self.min_size:
+                expired.append(connection)
+            else:
+                keep.append((connection, returned_at))
+        self._idle = keep
+        return expired
+
+    def acquire(self, timeout=None):
+        """
+        Borrow a connection, blocks while ``max_size`` connections are in use
+
+        :param timeout: seconds to wait for a connection, ``None`` waits indefinitely
+        :return: pooled connection, ``close()`` returns it to the pool
+        :rtype: PooledConnection
+        :raises: OperationalError if no connection became available within ``timeout``
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            connection = None
+            with self._condition:
+                if self._closed:
+                    raise Error('connection pool is closed')
+
+                expired = self._expire_idle()
+                while not self._idle and self._size - len(expired) >= self.max_size:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise OperationalError('timed out waiting for a connection, all {} connections of the pool '
+                                               'are in use'.format(self.max_size))
+                    self._condition.wait(remaining)
+                    if self._closed:
+                        raise Error('connection pool is closed')
+
+                if self._idle:
+                    connection, _ = self._idle.pop()
+                else:
+                    # reserve a slot for the new connection
+                    self._size += 1
+
+            for stale in expired:
+                self._discard(stale)
+
+            if connection is None:
+                return PooledConnection(self, self._open())
+
+            if not self.validate or self._is_valid(connection):
+                return PooledConnection(self, connection)
+
+            self._log.debug('discarding invalid pooled connection')
+            self._discard(connection)
+
+    def release(self, connection):
+        """
+        Return a borrowed connection to the pool
+
+        :param connection: the connection wrapped by a ``PooledConnection``
+        """
+        try:
+            closed = connection.is_closed()
+        except Exception:
+            closed = True
+
+        if closed or self._closed:
+            self._discard(connection)
+            return
+
+        with self._condition:
+            self._idle.append((connection, time.monotonic()))
+            self._condition.notify()
+
+    def connection(self, timeout=None):
+        """
+        Borrow a connection for use with ``with``
+
+        :param timeout: seconds to wait for a connection
+        :return: pooled connection
+        :rtype: PooledConnection
+        """
+        return self.acquire(timeout=timeout)
+
+    def close(self):
+        """close all idle connections, borrowed connections are closed when they are returned"""
+        with self._condition:
+            self._closed = True
+            idle = [connection for connection, _ in self._idle]
+            self._idle = []
+            self._condition.notify_all()
+        for connection in idle:
+            self._discard(connection)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def get_pool(*args, min_size=0, max_size=8, idle_timeout=600.0, validate=True, **kwargs):
+    """
+    Get the shared pool for the given connection arguments, creating it if needed.
+
+    Pool options are only applied when the pool is created.
+
+    :param args: positional arguments passed to ``hivejdbc.connect``
+    :param kwargs: keyword arguments passed to ``hivejdbc.connect``
+    :return: the connection pool for these arguments
+    :rtype: ConnectionPool
+    """
+    key = pool_key(*args, **kwargs)
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is None or pool._closed:
+            pool = ConnectionPool(*args,
+                                  min_size=min_size,
+                                  max_size=max_size,
+                                  idle_timeout=idle_timeout,
+                                  validate=validate,
+                                  **kwargs)
+            _POOLS[key] = pool
+        return pool
@@ -0,0 +1,90 @@
+"""
+Connection profiles - connection arguments parsed and validated once
+
+``hivejdbc.connect`` parses its arguments on every call: files such as trust stores and keytabs are checked,
+kerberos and jvm settings are applied and the type conversion is configured. A ``ConnectionProfile`` does this
+once, opening further connections only loads the driver (once) and opens the session.
+
+    profile = ConnectionProfile('example.com', 'default', ssl=True, trust_store='./truststore.jks',
+                                trust_password='changeit', user='hive', password='secret')
+    conn = profile.connect()
+"""
+__all__ = ['ConnectionProfile']
+
+import copy
+import threading
+import time
+
+import hivejdbc
+from hivejdbc import instrument
+
+
+class ConnectionProfile:
+
+    def __init__(self, *args, connect_function=None, **kwargs):
+        """
+        :param args: positional arguments accepted by ``hivejdbc.connect``
+        :param connect_function: connect function to use, defaults to ``hivejdbc.connect``
+        :param kwargs: keyword arguments accepted by ``hivejdbc.connect``
+        """
+        # `handle_args` stores the driver path and cursor class on the connect function, use a private copy
+        self._connect_function = copy.copy(connect_function or hivejdbc.connect)
+        self._arguments = self._connect_function.parse_args(*args, **kwargs)
+        self._type_conversion = self._connect_function.make_type_conversion(self._arguments)
+        self._driver_class = None
+        self._lock = threading.Lock()
+
+    @property
+    def arguments(self):
+        """
+        :return: the parsed connection arguments
+        :rtype: pyjdbc.connect.ConnectArguments
+        """
+        return self._arguments
+
+    def driver_class(self):
+        """
+        :return: the HiveDriver class, loaded on first use
+        """
+        with self._lock:
+            if self._driver_class is None:
+                self._driver_class = self._connect_function.load_driver()
+            return self._driver_class
+
+    def connect(self):
+        """
+        Open a new connection
+
+        :return: db-api-2 connection instance
+        :rtype: hivejdbc.dbapi.HiveConnection
+        """
+        started = time.perf_counter()
+        driver_class = self.driver_class()
+        loaded = time.perf_counter()
+        endpoints = self._connect_function.endpoints(self._arguments)
+        probed = time.perf_counter()
+        connection = self._connect_function.open_endpoints(driver_class, endpoints, self._arguments,
+                                                           type_conversion=self._type_conversion)
+        opened = time.perf_counter()
+        # further sessions of the connection (``executescript``) are opened with the profile
+        connection.connect_function = self
+        connection.connect_args = ((), {})
+
+        observers = instrument.listeners(connection)
+        if observers:
+            # arguments were parsed when the profile was created
+            timings = {'parse': 0.0, 'driver': loaded - started, 'probe': probed - loaded, 'open': opened - probed,
+                       'total': opened - started}
+            instrument.emit(observers, 'on_connect', connection, timings)
+        return connection
+
+    def __call__(self, *args, **kwargs):
+        """
+        Open a new connection, arguments are ignored so a profile can be used as the ``connect_function`` of a
+        ``hivejdbc.pool.ConnectionPool``
+        """
+        return self.connect()
+
+    def __repr__(self):
+        return '{}(host={!r}, port={!r}, database={!r})'.format(self.__class__.__name__, self._arguments.host,
+                                                                self._arguments.port, self._arguments.database)
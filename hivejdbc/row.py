@@ -0,0 +1,120 @@
+"""
+Compact rows with access by column name
+
+A ``Row`` is a tuple: it takes no more memory than the tuple rows of ``HiveCursor``. The column names and their
+positions are stored once per result set, on a ``Row`` subclass built for the columns (like ``namedtuple``).
+
+    >>> Person = row_class(['id', 'name'])
+    >>> row = Person(('1', 'Bob'))
+    >>> row['name'], row[0], row.name
+    ('Bob', '1', 'Bob')
+    >>> row.asdict()
+    {'id': '1', 'name': 'Bob'}
+
+Rows compare equal to tuples with the same values and to dicts with the same items. ``keys()``, ``items()`` and
+``get()`` behave like the dict methods so ``dict(row)`` and ``**row`` work, iteration and ``in`` are over the values
+like for any tuple.
+"""
+__all__ = ['Row', 'row_class']
+
+import functools
+import keyword
+from collections.abc import Mapping
+from operator import itemgetter
+
+
+def _make_row(fields, values):
+    """unpickle a row"""
+    return row_class(fields)(values)
+
+
+class Row(tuple):
+    """tuple row of a result set, values are also accessed by column name"""
+    __slots__ = ()
+
+    # column names and ``{name: position}``, set on the subclass built by ``row_class``
+    _fields = ()
+    _index = {}
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            try:
+                key = self._index[key]
+            except KeyError:
+                raise KeyError(key) from None
+        return tuple.__getitem__(self, key)
+
+    def __eq__(self, other):
+        if isinstance(other, Mapping):
+            return self.asdict() == dict(other)
+        return tuple.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = tuple.__hash__
+
+    def __repr__(self):
+        return 'Row({})'.format(', '.join('{}={!r}'.format(name, value) for name, value in self.items()))
+
+    def __reduce__(self):
+        return _make_row, (self._fields, tuple(self))
+
+    def get(self, key, default=None):
+        """
+        :param key: column name or position
+        :param default: returned if the row has no such column
+        """
+        try:
+            return self[key]
+        except (KeyError, IndexError):
+            return default
+
+    def keys(self):
+        """
+        :return: the column names
+        :rtype: tuple
+        """
+        return self._fields
+
+    def values(self):
+        """
+        :return: the values
+        :rtype: tuple
+        """
+        return tuple(self)
+
+    def items(self):
+        """
+        :return: ``(name, value)`` pairs
+        :rtype: list
+        """
+        return list(zip(self._fields, self))
+
+    def asdict(self):
+        """
+        :return: a plain ``dict`` of the row, when columns share a name the last one is kept
+        :rtype: dict
+        """
+        return dict(zip(self._fields, self))
+
+
+@functools.lru_cache(maxsize=256)
+def _row_class(fields):
+    namespace = {'__slots__': (), '_fields': fields, '_index': {name: idx for idx, name in enumerate(fields)}}
+    for name, idx in namespace['_index'].items():
+        # like namedtuple, names that are not identifiers or shadow a method are only accessed with row['name']
+        if name.isidentifier() and not keyword.iskeyword(name) and not name.startswith('_') \
+                and not hasattr(Row, name):
+            namespace[name] = property(itemgetter(idx), doc='value of column {!r}'.format(name))
+    return type('Row', (Row,), namespace)
+
+
+def row_class(names):
+    """
+    The ``Row`` subclass of a result set
+
+    :param names: column names of the result set
+    :return: ``Row`` subclass, calling it with a sequence of values returns a row
+    """
+    return _row_class(tuple(names))
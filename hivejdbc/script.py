@@ -0,0 +1,322 @@
+"""
+Script execution with parallel scheduling of independent statements
+
+``conn.executescript()`` splits a script into statements and runs statements that do not depend on each other at
+the same time, over up to ``max_parallel`` Hive sessions: the connection itself and sessions borrowed from a
+``hivejdbc.pool.ConnectionPool`` opened with the arguments of the connection.
+
+    conn = hivejdbc.connect('example.com', 'default')
+    statements = conn.executescript(open('nightly.sql').read(), max_parallel=4)
+    for statement in statements:
+        print(statement.index, statement.seconds, statement.sql[:40])
+
+Dependencies:
+    A statement waits for the earlier statements writing a table it reads or writes, and for the earlier
+    statements reading a table it writes, tables are found with ``hivejdbc.sql.table_references``. Statements
+    whose tables are not recognized wait for all earlier statements and are waited for by all later statements.
+
+Session state:
+    ``USE`` and ``SET`` statements, and statements adding resources or temporary functions (``ADD JAR``,
+    ``CREATE TEMPORARY FUNCTION``) are not run by themselves: every statement runs on a session brought to the
+    state the script had at that statement. ``SET`` and resource statements also wait for all earlier statements,
+    so a session never runs a statement with settings made later in the script. When the script finished the
+    connection has the state the script left.
+
+    Temporary tables are only seen by the session that created them, scripts creating temporary tables run one
+    statement at a time on the connection.
+"""
+__all__ = ['ScriptStatement', 'plan', 'execute_script']
+
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+
+from pyjdbc.exceptions import ProgrammingError
+
+from hivejdbc import sql
+from hivejdbc.jvm import JvmThreadPoolExecutor
+
+log = logging.getLogger(__name__)
+
+STATEMENT = 'statement'
+SESSION = 'session'
+
+
+class ScriptStatement:
+    """
+    A statement of a script, its dependencies and, once the script ran, its timings
+    """
+    __slots__ = ('index', 'sql', 'kind', 'reads', 'writes', 'depends', 'database', 'settings', 'setup',
+                 'started', 'seconds', 'rowcount', 'session', 'error')
+
+    def __init__(self, index, text, kind, reads=frozenset(), writes=frozenset(), depends=frozenset(),
+                 database=None, settings=None, setup=()):
+        """
+        :param index: position of the statement in the script
+        :param text: sql text
+        :param kind: ``statement``, or ``session`` for statements changing the session state
+        :param reads: tables read
+        :param writes: tables written
+        :param depends: indexes of the statements that must finish first
+        :param database: database the statement runs in
+        :param settings: ``SET`` settings the statement runs with
+        :param setup: resource and temporary function statements the statement runs after
+        """
+        self.index = index
+        self.sql = text
+        self.kind = kind
+        self.reads = frozenset(reads)
+        self.writes = frozenset(writes)
+        self.depends = frozenset(depends)
+        self.database = database
+        self.settings = settings or {}
+        self.setup = tuple(setup)
+        # seconds since the script started, seconds taken, rows affected, session number (0 is the connection)
+        self.started = None
+        self.seconds = None
+        self.rowcount = None
+        self.session = None
+        self.error = None
+
+    def __repr__(self):
+        return '<{} {} {}: {!r}>'.format(self.__class__.__name__, self.index, self.kind, self.sql[:60])
+
+
+def plan(text, database=None, settings=None):
+    """
+    Split a script into statements and find the dependencies between them
+
+    :param text: sql script
+    :param database: database of the session at the start of the script
+    :param settings: ``SET`` settings of the session at the start of the script
+    :return: statements in script order
+    :rtype: list
+    """
+    settings = dict(settings or {})
+    setup = []
+    statements = []
+    # statements since the last statement every later statement waits for
+    barrier = frozenset()
+    pending = []
+
+    for index, text in enumerate(sql.split_statements(text)):
+        use = sql.parse_use(text)
+        setting = sql.parse_set(text) if use is None else None
+        if use is not None or setting is not None or sql.is_session_statement(text):
+            if use is not None:
+                database = use
+            else:
+                if setting is not None:
+                    settings[setting[0]] = setting[1]
+                else:
+                    setup.append(text)
+                barrier = frozenset(statement.index for statement in pending) | barrier
+                pending = []
+            statements.append(ScriptStatement(index, text, SESSION, database=database, settings=dict(settings),
+                                              setup=setup))
+            continue
+
+        reads, writes = sql.table_references(text, database)
+        if reads is None:
+            depends = None
+        elif not writes and (reads or sql.is_query(text)):
+            depends = {statement.index for statement in pending if statement.writes & reads}
+        elif writes:
+            depends = {statement.index for statement in pending
+                       if statement.writes & (reads | writes) or statement.reads & writes}
+        else:
+            depends = None
+
+        if depends is None:
+            # tables not recognized: wait for everything before and have everything after wait
+            barrier = frozenset(statement.index for statement in pending) | barrier
+            depends = barrier
+            statement = ScriptStatement(index, text, STATEMENT, depends=depends, database=database,
+                                        settings=dict(settings), setup=setup)
+            statements.append(statement)
+            barrier = frozenset((index,))
+            pending = []
+            continue
+
+        statement = ScriptStatement(index, text, STATEMENT, reads, writes, depends | barrier, database,
+                                    dict(settings), setup)
+        statements.append(statement)
+        pending.append(statement)
+    return statements
+
+
+class _Session:
+    """a connection used by the script and the state the script brought it to"""
+
+    def __init__(self, number, connection, pooled=None):
+        self.number = number
+        self.connection = connection
+        self.pooled = pooled
+        self.setup = 0
+
+    def prepare(self, cursor, statement):
+        """run the ``USE``, ``SET`` and resource statements bringing the session to the state of ``statement``"""
+        connection = self.connection
+        for text in statement.setup[self.setup:]:
+            cursor.execute(text)
+        self.setup = len(statement.setup)
+        if statement.database and statement.database != getattr(connection, 'database', None):
+            cursor.execute('USE {}'.format(statement.database))
+        current = getattr(connection, 'session_settings', {})
+        for name, value in statement.settings.items():
+            if current.get(name) != value:
+                cursor.execute('SET {}={}'.format(name, value))
+
+
+class _Sessions:
+    """the connection and at most ``limit - 1`` pooled sessions, handed to one statement at a time"""
+
+    def __init__(self, main, limit, pool):
+        self._main = main
+        self._limit = limit
+        self._pool = pool
+        self._owns_pool = False
+        self._idle = [main]
+        self._opened = [main]
+        self._opening = 0
+        self._lock = threading.Lock()
+
+    def _open_pool(self):
+        if self._pool is None:
+            connection = self._main.connection
+            connect_args = getattr(connection, 'connect_args', None)
+            if connect_args is None:
+                raise ProgrammingError('the connection was not opened by `hivejdbc.connect`, pass a '
+                                       '`ConnectionPool` with `pool` to run statements in parallel')
+            from hivejdbc.pool import ConnectionPool
+            args, kwargs = connect_args
+            self._pool = ConnectionPool(*args, max_size=self._limit - 1, connect_function=connection.connect_function,
+                                        **kwargs)
+            self._owns_pool = True
+        return self._pool
+
+    def acquire(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+            if len(self._opened) + self._opening >= self._limit:
+                raise RuntimeError('more statements running than sessions')
+            pool = self._open_pool()
+            self._opening += 1
+        try:
+            pooled = pool.acquire()
+        except BaseException:
+            with self._lock:
+                self._opening -= 1
+            raise
+        with self._lock:
+            self._opening -= 1
+            # only sessions holding a connection are closed with the script
+            session = _Session(len(self._opened), pooled.connection, pooled)
+            self._opened.append(session)
+        return session
+
+    def release(self, session):
+        with self._lock:
+            self._idle.append(session)
+
+    def close(self):
+        for session in self._opened:
+            if session.pooled is not None:
+                session.pooled.close()
+        if self._owns_pool:
+            self._pool.close()
+
+
+def _run(sessions, statement, started):
+    session = sessions.acquire()
+    try:
+        cursor = session.connection.cursor()
+        try:
+            session.prepare(cursor, statement)
+            begin = time.perf_counter()
+            statement.started = begin - started
+            statement.session = session.number
+            try:
+                cursor.execute(statement.sql)
+            finally:
+                statement.seconds = time.perf_counter() - begin
+            statement.rowcount = cursor.rowcount
+        finally:
+            cursor.close()
+    finally:
+        sessions.release(session)
+    log.debug('script statement %d finished in %.3fs on session %d', statement.index, statement.seconds,
+              session.number)
+    return statement
+
+
+def execute_script(connection, text, max_parallel=1, pool=None):
+    """
+    Run the statements of a script, independent statements at the same time
+
+    :param connection: connection running the script, it has the session state the script left afterwards
+    :type connection: hivejdbc.dbapi.HiveConnection
+    :param text: sql script, statements separated by semicolons
+    :param max_parallel: maximum number of statements running at the same time, each on its own session
+    :param pool: pool the additional sessions are borrowed from, defaults to a pool opened with the arguments of
+                 ``connection`` and closed when the script finished
+    :type pool: hivejdbc.pool.ConnectionPool
+    :return: statements in script order with their timings, statements not run (after an error) have no timings
+    :rtype: list
+    :raises: the error of the first failing statement, statements already running are waited for
+    """
+    if max_parallel < 1:
+        raise ValueError('max_parallel must be at least 1, got: {}'.format(max_parallel))
+
+    statements = plan(text, getattr(connection, 'database', None), getattr(connection, 'session_settings', None))
+    runnable = [statement for statement in statements if statement.kind == STATEMENT]
+    if max_parallel > 1 and any(sql.creates_temporary_table(statement.sql) for statement in runnable):
+        log.debug('script creates temporary tables, running statements one at a time')
+        max_parallel = 1
+
+    main = _Session(0, connection)
+    sessions = _Sessions(main, max_parallel, pool)
+    executor = JvmThreadPoolExecutor(max_workers=max_parallel, thread_name_prefix='hivejdbc-script')
+    started = time.perf_counter()
+    done = set()
+    waiting = list(runnable)
+    running = {}
+    error = None
+    try:
+        while waiting or running:
+            if error is None:
+                for statement in [statement for statement in waiting if statement.depends <= done]:
+                    if len(running) >= max_parallel:
+                        break
+                    waiting.remove(statement)
+                    running[executor.submit(_run, sessions, statement, started)] = statement
+            if not running:
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                statement = running.pop(future)
+                try:
+                    future.result()
+                except BaseException as e:
+                    statement.error = e
+                    if error is None:
+                        error = e
+                else:
+                    done.add(statement.index)
+    finally:
+        executor.shutdown(wait=True)
+        sessions.close()
+
+    if error is not None:
+        raise error
+
+    if statements:
+        # leave the connection in the state of the end of the script
+        cursor = connection.cursor()
+        try:
+            main.prepare(cursor, statements[-1])
+        finally:
+            cursor.close()
+    return statements
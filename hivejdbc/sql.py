@@ -0,0 +1,638 @@
+"""
+Lightweight HiveQL text handling
+
+This is not a parser, it understands just enough of HiveQL (quoting, comments and parenthesis) to safely
+substitute parameters and rewrite simple statements.
+"""
+__all__ = ['segments', 'render', 'parse_insert', 'InsertTemplate', 'normalize', 'is_query', 'is_deterministic',
+           'table_references', 'parse_use', 'parse_set', 'parse_placeholders', 'split_statements',
+           'is_session_statement', 'creates_temporary_table']
+
+import functools
+import re
+
+# statements up to this length are split into segments once, repeated executes of a statement reuse the result
+MEMO_MAX_LENGTH = 16 * 1024
+
+CODE = 'code'
+STRING = 'string'
+IDENTIFIER = 'identifier'
+COMMENT = 'comment'
+
+# :name placeholders (but not "::"), %s placeholders and escaped "%%"
+PLACEHOLDER = re.compile(r'(?<![:\w]):([A-Za-z_]\w*)|%s|%%')
+INSERT_INTO = re.compile(r'^\s*INSERT\s+INTO\s', re.IGNORECASE)
+VALUES = re.compile(r'\bVALUES\b', re.IGNORECASE)
+
+# the following patterns match the output of `_code_text`, lower case code with unquoted identifiers
+WHITESPACE = re.compile(r'\s+')
+NAME = r'([\w$]+(?:\.[\w$]+)?)'
+QUERY = re.compile(r'^\(*\s*(select|with|from)\b')
+# functions whose result differs between executions
+NONDETERMINISTIC = re.compile(r'\b(rand|random|uuid|current_timestamp|current_date|unix_timestamp\s*\(\s*\)|'
+                              r'reflect|java_method|in_file|surrogate_key)\b')
+CTE = re.compile(r'(?:\bwith|,)\s*([\w$]+)\s+as\s*\(')
+FROM = re.compile(r'\bfrom\b')
+JOIN = re.compile(r'\bjoin\s+' + NAME)
+# tokens of a FROM list: names, and single characters
+TOKEN = re.compile(r'\s*([\w$]+(?:\.[\w$]+)?|.)')
+NAME_TOKEN = re.compile(r'[\w$]+(?:\.[\w$]+)?$')
+# keywords ending a FROM list
+FROM_END = frozenset(('where', 'group', 'order', 'having', 'limit', 'join', 'left', 'right', 'full', 'inner', 'cross',
+                      'lateral', 'union', 'intersect', 'except', 'minus', 'window', 'cluster', 'distribute', 'sort',
+                      'select', 'insert', 'on', ')', ';'))
+WRITES = (
+    re.compile(r'\binsert\s+(?:into|overwrite(?!\s+(?:local\s+)?directory\b))\s+(?:table\s+)?' + NAME),
+    re.compile(r'\b(?:create|drop|alter|truncate|msck\s+repair)\s+(?:(?:external|temporary|transactional|'
+               r'materialized)\s+)*(?:table|view)\s+(?:if\s+(?:not\s+)?exists\s+)?' + NAME),
+    re.compile(r'\bload\s+data\s+(?:local\s+)?inpath\s+\S+\s+(?:overwrite\s+)?into\s+table\s+' + NAME),
+    re.compile(r'^\s*(?:update|delete\s+from|merge\s+into)\s+' + NAME),
+)
+# statements describing tables, and statements listing the tables of a database
+CATALOG = (
+    re.compile(r'^desc(?:ribe)?\s+(?:extended\s+|formatted\s+)?(?!(?:database|schema|function)\s)' + NAME),
+    re.compile(r'^show\s+(?:partitions|create\s+table|tblproperties|table\s+extended\s+like)\s+' + NAME),
+    re.compile(r'^show\s+columns\s+(?:from|in)\s+' + NAME + r'(?:\s+(?:from|in)\s+([\w$]+))?'),
+)
+SHOW_TABLES = re.compile(r'^show\s+(?:tables|views)(?:\s+(?:from|in)\s+([\w$]+))?')
+USE = re.compile(r'^\s*use\s+([\w$]+)\s*;?\s*$')
+SET = re.compile(r'^\s*set\s+([^=\s]+)\s*=(.*?);?\s*$', re.IGNORECASE | re.DOTALL)
+# statements changing the resources and functions of a session rather than tables
+SESSION = re.compile(r'^(?:(?:add|delete)\s+(?:jar|file|archive)s?\b|(?:create|drop)\s+temporary\s+(?:function|macro)\b)')
+TEMPORARY_TABLE = re.compile(r'^create\s+temporary\s+(?:external\s+)?table\b')
+
+
+def _memoized(function):
+    """cache the results of a function of the sql text, for statements up to ``MEMO_MAX_LENGTH`` characters"""
+    cached = functools.lru_cache(maxsize=512)(function)
+
+    @functools.wraps(function)
+    def wrapper(sql):
+        return cached(sql) if len(sql) <= MEMO_MAX_LENGTH else function(sql)
+
+    wrapper.cache_clear = cached.cache_clear
+    return wrapper
+
+
+@_memoized
+def segments(sql):
+    """
+    Split sql text into code, string literal, quoted identifier and comment segments.
+
+    Joining the text of all segments returns the original sql.
+
+    :param sql: sql text
+    :return: tuple of (kind, text) tuples, kind is one of ``CODE``, ``STRING``, ``IDENTIFIER``, ``COMMENT``
+    :rtype: tuple
+    """
+    result = []
+    length = len(sql)
+    start = idx = 0
+
+    def flush(end):
+        if end > start:
+            result.append((CODE, sql[start:end]))
+
+    while idx < length:
+        char = sql[idx]
+        if char in ('\'', '"', '`'):
+            flush(idx)
+            end = idx + 1
+            while end < length:
+                if sql[end] == '\\' and char != '`':
+                    end += 2
+                    continue
+                if sql[end] == char:
+                    if char == '`' and sql.startswith('``', end):
+                        end += 2
+                        continue
+                    break
+                end += 1
+            end = min(end + 1, length)
+            result.append((IDENTIFIER if char == '`' else STRING, sql[idx:end]))
+            start = idx = end
+        elif sql.startswith('--', idx):
+            flush(idx)
+            end = sql.find('\n', idx)
+            end = length if end < 0 else end
+            result.append((COMMENT, sql[idx:end]))
+            start = idx = end
+        elif sql.startswith('/*', idx):
+            flush(idx)
+            end = sql.find('*/', idx + 2)
+            end = length if end < 0 else end + 2
+            result.append((COMMENT, sql[idx:end]))
+            start = idx = end
+        else:
+            idx += 1
+
+    flush(length)
+    return tuple(result)
+
+
+def render(sql, params, literal):
+    """
+    Substitute ``:name`` (``params`` is a dict) or ``%s`` (``params`` is a sequence) placeholders with literals.
+
+    Placeholders inside string literals, quoted identifiers and comments are ignored.
+
+    :param sql: sql text containing placeholders
+    :param params: dictionary or sequence of parameters
+    :param literal: function rendering a python value as sql text
+    :return: tuple of (sql text, number of parameters used)
+    :raises: ValueError if a parameter is missing or not all parameters were used
+    """
+    named = isinstance(params, dict)
+    used = set()
+    position = [0]
+
+    def substitute(match):
+        text = match.group(0)
+        if text == '%%':
+            return '%' if not named else text
+        if text == '%s':
+            if named:
+                return text
+            idx = position[0]
+            if idx >= len(params):
+                raise ValueError('`params` contains incorrect number of arguments for "%s" templates in query.\n'
+                                 'expected more than: [{}] arguments, got: [{}]'.format(idx, len(params)))
+            position[0] += 1
+            return literal(params[idx])
+
+        name = match.group(1)
+        if not named:
+            return text
+        if name not in params:
+            raise ValueError('":{}" is missing from parameters template in statement: "{}"'
+                             '\nParameters: {}'.format(name, sql, dict(params)))
+        used.add(name)
+        return literal(params[name])
+
+    parts = []
+    for kind, text in segments(sql):
+        parts.append(PLACEHOLDER.sub(substitute, text) if kind == CODE else text)
+
+    count = len(used) if named else position[0]
+    if count < len(params):
+        unused = sorted(set(params) - used) if named else list(params[count:])
+        raise ValueError('parameters were not consumed by the statement: {}\n'
+                         'in query:\n{}'.format(', '.join(map(str, unused)), sql.strip()))
+
+    return ''.join(parts), count
+
+
+def parse_placeholders(sql, named):
+    """
+    Rewrite ``:name`` (``named``) or ``%s`` placeholders to the ``?`` placeholders of a jdbc ``PreparedStatement``.
+
+    Placeholders inside string literals, quoted identifiers and comments are ignored.
+
+    :param sql: sql text containing placeholders
+    :param named: ``True`` for ``:name`` placeholders, ``False`` for ``%s`` placeholders
+    :return: tuple of (sql text, placeholder names in order of appearance), the names are ``None`` for ``%s``
+             placeholders
+    """
+    names = []
+
+    def substitute(match):
+        text = match.group(0)
+        if text == '%%':
+            return '%' if not named else text
+        if text == '%s':
+            if named:
+                return text
+            names.append(None)
+            return '?'
+        if not named:
+            return text
+        names.append(match.group(1))
+        return '?'
+
+    parts = []
+    for kind, text in segments(sql):
+        parts.append(PLACEHOLDER.sub(substitute, text) if kind == CODE else text)
+    return ''.join(parts), tuple(names)
+
+
+class InsertTemplate:
+    """
+    An ``INSERT INTO ... VALUES (...)`` statement split into the statement head and a single row template
+    """
+
+    def __init__(self, head, row):
+        """
+        :param head: the statement up to (but not including) ``VALUES``
+        :param row: the parenthesized row template, ie: ``(:name, :age)``
+        """
+        self.head = head.rstrip()
+        self.row = row
+        # named: (placeholder names of the head, placeholder names of the row)
+        self._names = {}
+
+    def split_parameters(self, params):
+        """
+        Split a parameter set into the parameters of the head (``PARTITION (dt=:dt)``) and those of the row
+
+        :param params: dictionary or sequence of parameters
+        :return: tuple of (head parameters, row parameters)
+        :raises: ValueError if parameters are used by neither the head nor the row
+        """
+        named = isinstance(params, dict)
+        names = self._names.get(named)
+        if names is None:
+            names = self._names[named] = (parse_placeholders(self.head, named)[1],
+                                          parse_placeholders(self.row, named)[1])
+        head_names, row_names = names
+        if named:
+            unused = set(params) - set(head_names) - set(row_names)
+            if unused:
+                raise ValueError('parameters were not consumed by the statement: {}\n'
+                                 'in query:\n{}'.format(', '.join(sorted(map(str, unused))),
+                                                        '{} VALUES {}'.format(self.head, self.row)))
+            return ({name: params[name] for name in head_names if name in params},
+                    {name: params[name] for name in row_names if name in params})
+        return params[:len(head_names)], params[len(head_names):]
+
+    def statements(self, seq_of_parameters, literal, is_constant, chunk_size, max_length):
+        """
+        Render multi-row statements for a sequence of parameter sets
+
+        Hive only accepts constants inside ``VALUES``, rows containing other expressions (such as ``array()``,
+        ``map()`` or ``CAST``) are written as ``INSERT INTO ... SELECT ... UNION ALL SELECT ...`` instead.
+
+        Parameters of the head (``INSERT INTO t PARTITION (dt=:dt)``) are rendered per parameter set, consecutive
+        rows are only combined into one statement while their head renders to the same text.
+
+        :param seq_of_parameters: sequence of dictionaries or sequences
+        :param literal: function rendering a python value as a Hive literal
+        :param is_constant: function returning ``True`` if the literal of a value is accepted by ``VALUES``
+        :param chunk_size: maximum number of rows per statement
+        :param max_length: maximum statement length, a single row exceeding this is sent by itself
+        :return: generator of sql statements
+        """
+        rows = []
+        length = 0
+        use_select = False
+        head = None
+
+        def statement():
+            if use_select:
+                selects = ['SELECT ' + row[1:-1].strip() for row in rows]
+                return '{}\n{}'.format(head, '\nUNION ALL\n'.join(selects))
+            return '{}\nVALUES\n{}'.format(head, ',\n'.join(rows))
+
+        for params in seq_of_parameters:
+            head_params, row_params = self.split_parameters(params)
+            row_head, _ = render(self.head, head_params, literal)
+            row, _ = render(self.row, row_params, literal)
+            values = row_params.values() if isinstance(row_params, dict) else row_params
+            # allow for the separators and the "SELECT" / "UNION ALL" keywords
+            size = len(row) + 16
+
+            if rows and (row_head != head or len(rows) >= chunk_size or length + size > max_length):
+                yield statement()
+                rows = []
+                use_select = False
+
+            if not rows:
+                head = row_head
+                length = len(head) + 8
+            rows.append(row)
+            length += size
+            use_select = use_select or not all(is_constant(value) for value in values)
+
+        if rows:
+            yield statement()
+
+
+def parse_insert(sql):
+    """
+    Recognize ``INSERT INTO ... VALUES (...)`` statements with a single row template
+
+    ``INSERT OVERWRITE`` is not recognized because splitting the rows into several statements would overwrite
+    the previous statement each time.
+
+    :param sql: sql text
+    :return: the template, or ``None`` if the statement cannot be rewritten
+    :rtype: InsertTemplate
+    """
+    if not INSERT_INTO.match(sql):
+        return None
+
+    offset = 0
+    depth = 0
+    values_at = None
+    for kind, text in segments(sql):
+        if kind == CODE:
+            for match in VALUES.finditer(text):
+                prefix = text[:match.start()]
+                if depth + prefix.count('(') - prefix.count(')') == 0:
+                    values_at = (offset + match.start(), offset + match.end())
+                    break
+            depth += text.count('(') - text.count(')')
+        if values_at is not None:
+            break
+        offset += len(text)
+
+    if values_at is None:
+        return None
+
+    head = sql[:values_at[0]]
+    row = sql[values_at[1]:].strip()
+    while row.endswith(';'):
+        row = row[:-1].rstrip()
+
+    if not row.startswith('(') or not row.endswith(')'):
+        return None
+
+    # the template must be a single parenthesized group
+    depth = 0
+    offset = 0
+    for kind, text in segments(row):
+        if kind == CODE:
+            for idx, char in enumerate(text):
+                if char == '(':
+                    depth += 1
+                elif char == ')':
+                    depth -= 1
+                    if depth == 0 and offset + idx != len(row) - 1:
+                        return None
+        offset += len(text)
+
+    return InsertTemplate(head, row)
+
+
+@_memoized
+def normalize(sql):
+    """
+    Normalize sql text for comparison, comments are removed, whitespace is collapsed and code outside of string
+    literals and quoted identifiers is lower cased.
+
+    >>> normalize("SELECT  *\\nFROM t -- all rows\\nWHERE name = 'Bob';")
+    "select * from t where name = 'Bob'"
+
+    :param sql: sql text
+    :rtype: str
+    """
+    parts = []
+    for kind, text in segments(sql):
+        if kind == COMMENT:
+            parts.append(' ')
+        elif kind == CODE:
+            parts.append(WHITESPACE.sub(' ', text.lower()))
+        else:
+            parts.append(text)
+    text = WHITESPACE.sub(' ', ''.join(parts)) if parts else ''
+    return text.strip().rstrip(';').strip()
+
+
+@_memoized
+def _code_text(sql):
+    """lower case code with comments removed, string literals emptied and identifiers unquoted"""
+    parts = []
+    for kind, text in segments(sql):
+        if kind == CODE:
+            parts.append(text.lower())
+        elif kind == IDENTIFIER:
+            parts.append(text[1:-1].replace('``', '`').lower())
+        elif kind == STRING:
+            parts.append("''")
+        else:
+            parts.append(' ')
+    return WHITESPACE.sub(' ', ''.join(parts)).strip()
+
+
+def is_query(sql):
+    """
+    :return: ``True`` if the statement is a ``SELECT`` query
+    :rtype: bool
+    """
+    return bool(QUERY.match(_code_text(sql)))
+
+
+def is_deterministic(sql):
+    """
+    :return: ``False`` if the statement calls a function whose result differs between executions, like ``rand()``
+    :rtype: bool
+    """
+    return not NONDETERMINISTIC.search(_code_text(sql))
+
+
+def _token(text, position):
+    match = TOKEN.match(text, position)
+    if match is None:
+        return None, position
+    return match.group(1), match.end()
+
+
+def _skip_parentheses(text, position):
+    """:return: position after the parenthesis closing the one before ``position``, ``None`` if it is not closed"""
+    depth = 1
+    for index in range(position, len(text)):
+        if text[index] == '(':
+            depth += 1
+        elif text[index] == ')':
+            depth -= 1
+            if not depth:
+                return index + 1
+    return None
+
+
+def _from_list(text, position):
+    """
+    Read the comma separated list of tables following ``FROM``, subqueries are skipped, their own ``FROM`` lists
+    are read separately
+
+    :param text: output of ``_code_text``
+    :param position: position after ``from``
+    :return: list of table names, ``None`` if the list was not understood
+    """
+    names = []
+    while True:
+        token, position = _token(text, position)
+        if token == '(':
+            if _token(text, position)[0] not in ('select', 'with', '('):
+                return None
+            position = _skip_parentheses(text, position)
+            if position is None:
+                return None
+        elif token is not None and token not in FROM_END and NAME_TOKEN.match(token):
+            names.append(token)
+        else:
+            return None
+
+        token, position = _token(text, position)
+        if token == 'tablesample':
+            if _token(text, position)[0] != '(':
+                return None
+            position = _skip_parentheses(text, _token(text, position)[1])
+            if position is None:
+                return None
+            token, position = _token(text, position)
+        if token == 'as':
+            token, position = _token(text, position)
+            if token is None or token in FROM_END or not NAME_TOKEN.match(token):
+                return None
+            token, position = _token(text, position)
+        elif token is not None and token not in FROM_END and NAME_TOKEN.match(token):
+            # alias
+            token, position = _token(text, position)
+
+        if token == ',':
+            continue
+        if token is None or token in FROM_END:
+            return names
+        return None
+
+
+def table_references(sql, database=None):
+    """
+    Find the tables a statement reads and writes
+
+    This is a conservative approximation, some names found after ``FROM`` (``extract(year from col)``) are
+    reported as tables. Names defined by ``WITH`` are ignored. When a ``FROM`` clause is not understood the
+    tables read are unknown and ``None`` is returned in their place.
+
+    >>> reads, writes = table_references('INSERT INTO sales.daily SELECT * FROM `sales`.`raw` r '
+    ...                                  'JOIN dates d ON r.day = d.day', database='default')
+    >>> sorted(reads), sorted(writes)
+    (['default.dates', 'sales.raw'], ['sales.daily'])
+    >>> sorted(table_references('SELECT * FROM a x, b AS y WHERE x.id = y.id', database='default')[0])
+    ['default.a', 'default.b']
+
+    :param sql: sql text
+    :param database: database of unqualified table names
+    :return: tuple of (tables read, tables written), sets of lower case names, the tables read are ``None`` if
+             they could not be determined
+    :rtype: tuple
+    """
+    text = _code_text(sql)
+    ctes = set(CTE.findall(text)) if text.startswith('with') or ' with ' in text else set()
+
+    def qualify(names):
+        result = set()
+        for name in names:
+            if '.' not in name:
+                if name in ctes:
+                    continue
+                if database:
+                    name = '{}.{}'.format(database.lower(), name)
+            result.add(name)
+        return result
+
+    writes = qualify(name for pattern in WRITES for name in pattern.findall(text))
+    reads = JOIN.findall(text)
+    for match in FROM.finditer(text):
+        names = _from_list(text, match.end())
+        if names is None:
+            return None, writes
+        reads.extend(names)
+    return qualify(reads), writes
+
+
+def catalog_references(sql, database=None):
+    """
+    Find the tables a catalog statement (``DESCRIBE``, ``SHOW PARTITIONS``, ``SHOW TABLES``, ...) describes
+
+    >>> catalog_references('DESCRIBE FORMATTED `sales`.orders')
+    {'sales.orders'}
+    >>> catalog_references('SHOW TABLES', database='sales')
+    {'sales.*'}
+    >>> catalog_references('SELECT * FROM sales.orders') is None
+    True
+
+    :param sql: sql text
+    :param database: database of unqualified table names
+    :return: set of lower case names, ``sales.*`` stands for the list of tables of a database. ``None`` if the
+             statement is not a catalog statement
+    :rtype: set
+    """
+    text = _code_text(sql).rstrip(';').strip()
+    match = SHOW_TABLES.match(text)
+    if match:
+        name = match.group(1) or (database or '').lower()
+        return {'{}.*'.format(name) if name else '*'}
+
+    for pattern in CATALOG:
+        match = pattern.match(text)
+        if match:
+            name = match.group(1)
+            if '.' not in name:
+                qualifier = match.group(2) if match.lastindex == 2 else None
+                qualifier = qualifier or (database or '').lower()
+                if qualifier:
+                    name = '{}.{}'.format(qualifier, name)
+            return {name}
+    return None
+
+
+def split_statements(text):
+    """
+    Split a script into statements on the semicolons outside of string literals, quoted identifiers and comments
+
+    >>> split_statements("SET a=1; -- step 1;\\nSELECT ';' FROM t;;")
+    ['SET a=1', "-- step 1;\\nSELECT ';' FROM t"]
+
+    :param text: sql script
+    :return: statements without the terminating semicolon, statements holding only comments are dropped
+    :rtype: list
+    """
+    statements = []
+    parts = []
+    has_code = False
+    for kind, segment in segments(text):
+        if kind != CODE:
+            parts.append(segment)
+            has_code = has_code or kind != COMMENT
+            continue
+        pieces = segment.split(';')
+        for piece in pieces[:-1]:
+            parts.append(piece)
+            if has_code or piece.strip():
+                statements.append(''.join(parts).strip())
+            parts = []
+            has_code = False
+        parts.append(pieces[-1])
+        has_code = has_code or bool(pieces[-1].strip())
+    if has_code:
+        statements.append(''.join(parts).strip())
+    return statements
+
+
+def is_session_statement(sql):
+    """
+    :return: ``True`` for statements changing the resources or functions of the session: ``ADD JAR``,
+             ``CREATE TEMPORARY FUNCTION``, ...
+    :rtype: bool
+    """
+    return bool(SESSION.match(_code_text(sql)))
+
+
+def creates_temporary_table(sql):
+    """
+    :return: ``True`` for ``CREATE TEMPORARY TABLE`` statements, temporary tables are only seen by their session
+    :rtype: bool
+    """
+    return bool(TEMPORARY_TABLE.match(_code_text(sql)))
+
+
+def parse_use(sql):
+    """
+    :return: the database selected by a ``USE`` statement, ``None`` for other statements
+    :rtype: str
+    """
+    match = USE.match(_code_text(sql))
+    return match.group(1) if match else None
+
+
+def parse_set(sql):
+    """
+    >>> parse_set('SET hive.exec.parallel = true;')
+    ('hive.exec.parallel', 'true')
+
+    :return: tuple of (key, value) for a ``SET key=value`` statement, ``None`` for other statements
+    :rtype: tuple
+    """
+    match = SET.match(''.join(text for kind, text in segments(sql) if kind != COMMENT))
+    return (match.group(1), match.group(2).strip()) if match else None
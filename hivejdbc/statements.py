@@ -0,0 +1,195 @@
+"""
+Prepared statement cache
+
+``execute`` with parameters rewrites the ``:name`` or ``%s`` placeholders of the statement to ``?`` and binds the
+values to a jdbc ``PreparedStatement``. Each connection keeps a ``StatementCache``: the parsed statements, with the
+parameter setters resolved per placeholder, and the ``PreparedStatement`` objects not used by a cursor, so
+executing the same parameterized statement again neither parses the sql nor prepares a new statement.
+
+    conn = hivejdbc.connect('example.com', 'default', statement_cache_size=256)
+    print(conn.statement_cache.stats())
+
+Statements executed without parameters are not cached.
+"""
+__all__ = ['ParsedStatement', 'StatementCache']
+
+import logging
+import threading
+from collections import OrderedDict
+
+from hivejdbc import sql
+
+log = logging.getLogger(__name__)
+
+
+class ParsedStatement:
+    """sql text with ``?`` placeholders and the parameter names bound to them"""
+    __slots__ = ('operation', 'sql', 'names', 'named', '_setters')
+
+    def __init__(self, operation, named):
+        """
+        :param operation: sql text with ``:name`` (``named``) or ``%s`` placeholders
+        :param named: ``True`` if parameters are given as a dictionary
+        """
+        self.operation = operation
+        self.named = named
+        self.sql, self.names = sql.parse_placeholders(operation, named)
+        # per placeholder: (python type, setter) of the last value bound
+        self._setters = [None] * len(self.names)
+
+    def bind(self, params):
+        """
+        :param params: dictionary or sequence of parameters
+        :return: the parameter values in placeholder order
+        :rtype: list
+        :raises: ValueError if a parameter is missing or not all parameters were used
+        """
+        if self.named:
+            try:
+                values = [params[name] for name in self.names]
+            except KeyError as e:
+                raise ValueError('":{}" is missing from parameters template in statement: "{}"'
+                                 '\nParameters: {}'.format(e.args[0], self.operation, dict(params))) from None
+            unused = set(params) - set(self.names)
+            if unused:
+                raise ValueError('parameters were not consumed by the statement: {}\n'
+                                 'in query:\n{}'.format(', '.join(sorted(map(str, unused))), self.operation.strip()))
+            return values
+
+        if len(params) != len(self.names):
+            raise ValueError('`params` contains incorrect number of arguments for "%s" templates in query.\n'
+                             'expected: [{}] arguments, got: [{}]'.format(len(self.names), len(params)))
+        return list(params)
+
+    def set_parameters(self, statement, values, type_conversion):
+        """
+        Bind values to the parameters of a prepared statement
+
+        :param statement: java.sql.PreparedStatement of ``ParsedStatement.sql``
+        :param values: values from ``bind``
+        :param type_conversion: type conversion instance resolving the setter of each value type
+        :type type_conversion: hivejdbc.types.HiveTypeConversion
+        """
+        setters = self._setters
+        for idx, value in enumerate(values):
+            cached = setters[idx]
+            pytype = type(value)
+            if cached is None or cached[0] is not pytype:
+                cached = setters[idx] = (pytype, type_conversion.parameter_setter(pytype))
+            cached[1](statement, idx + 1, value)
+
+
+def _close(statement):
+    try:
+        statement.close()
+    except Exception as e:
+        log.debug('unable to close statement: %s', e)
+
+
+class StatementCache:
+
+    def __init__(self, max_entries=128):
+        """
+        :param max_entries: maximum number of parsed statements and of idle prepared statements kept, ``0``
+                            disables the cache
+        """
+        if max_entries < 0:
+            raise ValueError('max_entries must not be negative, got: {}'.format(max_entries))
+        self.max_entries = max_entries
+        self._parsed = OrderedDict()  # (operation, named) -> ParsedStatement, least recently used first
+        self._statements = OrderedDict()  # sql text -> idle PreparedStatement, least recently used first
+        self._closed = False
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.statement_hits = 0
+        self.statement_misses = 0
+        self.evictions = 0
+
+    def stats(self):
+        """
+        :return: cache counters, ``hits``/``misses`` count parsed statements, ``statement_hits``/
+                 ``statement_misses`` count prepared statements
+        :rtype: dict
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'statement_hits': self.statement_hits,
+                'statement_misses': self.statement_misses, 'evictions': self.evictions,
+                'entries': len(self._parsed), 'statements': len(self._statements)}
+
+    def parse(self, operation, params):
+        """
+        :param operation: sql text
+        :param params: dictionary or sequence of parameters
+        :rtype: ParsedStatement
+        """
+        key = (operation, isinstance(params, dict))
+        with self._lock:
+            parsed = self._parsed.get(key)
+            if parsed is not None:
+                self._parsed.move_to_end(key)
+                self.hits += 1
+                return parsed
+            self.misses += 1
+
+        parsed = ParsedStatement(operation, key[1])
+        if self.max_entries:
+            with self._lock:
+                self._parsed[key] = parsed
+                while len(self._parsed) > self.max_entries:
+                    self._parsed.popitem(last=False)
+        return parsed
+
+    def acquire(self, connection, text):
+        """
+        Take the idle prepared statement of ``text`` or prepare a new one, return it with ``release`` when it is
+        no longer used
+
+        :param connection: java.sql.Connection
+        :param text: sql text with ``?`` placeholders
+        :return: java.sql.PreparedStatement
+        """
+        with self._lock:
+            statement = self._statements.pop(text, None)
+            if statement is not None:
+                self.statement_hits += 1
+                return statement
+            self.statement_misses += 1
+        return connection.prepareStatement(text)
+
+    def release(self, text, statement):
+        """
+        Keep a statement from ``acquire`` for reuse, the least recently used idle statements are closed
+
+        :param text: sql text the statement was prepared with
+        :param statement: java.sql.PreparedStatement
+        """
+        closing = []
+        with self._lock:
+            if self._closed or not self.max_entries:
+                closing.append(statement)
+            else:
+                previous = self._statements.pop(text, None)
+                if previous is not None:
+                    closing.append(previous)
+                self._statements[text] = statement
+                while len(self._statements) > self.max_entries:
+                    closing.append(self._statements.popitem(last=False)[1])
+                    self.evictions += 1
+        for idle in closing:
+            _close(idle)
+
+    def clear(self):
+        """close the idle prepared statements and forget the parsed statements"""
+        with self._lock:
+            statements = list(self._statements.values())
+            self._statements.clear()
+            self._parsed.clear()
+        for statement in statements:
+            _close(statement)
+
+    def close(self):
+        """``clear`` the cache, statements released afterwards are closed"""
+        with self._lock:
+            self._closed = True
+        self.clear()
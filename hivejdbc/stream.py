@@ -0,0 +1,181 @@
+"""
+Streaming fetch with bounded memory
+
+``RowStream`` yields batches of rows from a cursor. A background thread fetches the next batch while the caller
+processes the current one, at most one batch waits in the queue, so the rows held in memory never exceed three
+batches: the batch being processed, the batch waiting and the batch being fetched.
+"""
+__all__ = ['RowStream', 'row_size']
+
+import logging
+import queue
+import sys
+import threading
+import time
+import weakref
+
+from hivejdbc.jvm import jvm_call
+
+_DONE = object()
+
+log = logging.getLogger(__name__)
+
+
+def row_size(row):
+    """
+    Approximate memory used by a row in bytes
+
+    :param row: tuple, list or dict
+    :rtype: int
+    """
+    values = row.values() if isinstance(row, dict) else row
+    return sys.getsizeof(row) + sum(sys.getsizeof(value) for value in values)
+
+
+def _read_batch(fetchone, batch_rows, max_bytes, on_batch):
+    started = time.perf_counter()
+    rows = []
+    size = 0
+    while len(rows) < batch_rows:
+        row = fetchone()
+        if row is None:
+            break
+        rows.append(row)
+        if max_bytes is not None:
+            size += row_size(row)
+            if size >= max_bytes:
+                break
+    if rows and on_batch is not None:
+        on_batch(rows, time.perf_counter() - started)
+    return rows
+
+
+def _put(batches, stop, item):
+    while not stop.is_set():
+        try:
+            batches.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _produce(fetchone, batch_rows, max_bytes, on_batch, batches, stop):
+    """fetch batches into ``batches`` until the rows are exhausted or ``stop`` is set"""
+    try:
+        while not stop.is_set():
+            batch = _read_batch(fetchone, batch_rows, max_bytes, on_batch)
+            if not batch:
+                break
+            if not _put(batches, stop, batch):
+                return
+        _put(batches, stop, _DONE)
+    except BaseException as e:
+        _put(batches, stop, e)
+
+
+class RowStream:
+
+    def __init__(self, fetchone, batch_rows=1000, max_bytes=None, prefetch=True, on_batch=None):
+        """
+        :param fetchone: function returning the next row or ``None``, usually ``cursor.fetchone``
+        :param batch_rows: maximum rows per batch
+        :param max_bytes: maximum approximate size of a batch in bytes, ``None`` limits batches by rows only
+        :param prefetch: fetch the next batch on a background thread
+        :param on_batch: called with the rows and the seconds taken to fetch them for every batch, on the thread
+                         fetching the batch
+        """
+        if batch_rows < 1:
+            raise ValueError('batch_rows must be at least 1, got: {}'.format(batch_rows))
+        if max_bytes is not None and max_bytes < 1:
+            raise ValueError('max_bytes must be `None` or at least 1, got: {}'.format(max_bytes))
+
+        self._fetchone = fetchone
+        self.batch_rows = batch_rows
+        self.max_bytes = max_bytes
+        self.prefetch = prefetch
+        self._on_batch = on_batch
+
+        self.rows = 0
+        self.batches = 0
+        self._started = None
+        self._finished = None
+        self._exhausted = False
+
+        self._queue = queue.Queue(maxsize=1)
+        self._stop = threading.Event()
+        self._thread = None
+        weakref.finalize(self, self._stop.set)
+
+    @property
+    def elapsed(self):
+        """seconds since the first batch was requested"""
+        if self._started is None:
+            return 0.0
+        return (self._finished or time.monotonic()) - self._started
+
+    @property
+    def rows_per_second(self):
+        elapsed = self.elapsed
+        return self.rows / elapsed if elapsed else 0.0
+
+    def _read_batch(self):
+        return _read_batch(self._fetchone, self.batch_rows, self.max_bytes, self._on_batch)
+
+    def _next_batch(self):
+        if not self.prefetch:
+            return self._read_batch() or _DONE
+
+        if self._thread is None:
+            # the thread holds no reference to the stream, an abandoned stream is collected and stops it
+            self._thread = threading.Thread(target=jvm_call, name='hivejdbc-prefetch', daemon=True,
+                                            args=(_produce, self._fetchone, self.batch_rows, self.max_bytes,
+                                                  self._on_batch, self._queue, self._stop))
+            self._thread.start()
+        return self._queue.get()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._exhausted:
+            raise StopIteration
+        if self._started is None:
+            self._started = time.monotonic()
+
+        batch = self._next_batch()
+        if batch is _DONE:
+            self._finish()
+            raise StopIteration
+        if isinstance(batch, BaseException):
+            self._finish()
+            raise batch
+
+        self.rows += len(batch)
+        self.batches += 1
+        return batch
+
+    def _finish(self):
+        self._exhausted = True
+        self._finished = time.monotonic()
+        log.debug('streamed %d rows in %d batches, %.3fs, %.1f rows/sec',
+                  self.rows, self.batches, self.elapsed, self.rows_per_second)
+
+    def close(self):
+        """
+        stop streaming, the background thread finishes the row it is fetching and exits
+
+        Closing or executing the cursor closes its stream, a stream that is no longer referenced stops its thread
+        when it is collected.
+        """
+        self._stop.set()
+        if not self._exhausted:
+            self._finish()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,121 @@
+"""
+Session tuning profiles
+
+A tuning profile is a named set of Hive configuration settings applied when a session is opened. The settings are
+sent in the ``hive_conf_list`` part of the jdbc url, so applying them takes no ``SET`` statements and no extra round
+trips.
+
+    conn = hivejdbc.connect('example.com', 'default', profile='interactive')
+
+Settings given with ``hive_conf_list`` override the settings of the profile. Register profiles for the settings of
+a cluster, for example its Tez container sizes:
+
+    register_profile('etl', {'hive.tez.container.size': 8192, 'hive.tez.java.opts': '-Xmx6554m'}, base='batch')
+"""
+__all__ = ['PROFILES', 'register_profile', 'get_profile', 'profile_names', 'conf_dict']
+
+import threading
+
+# built-in profiles
+PROFILES = {
+    # small lookups and previews: simple queries run as fetch tasks in HiveServer2 without launching a job,
+    # aggregates are answered from statistics where possible
+    'interactive': {
+        'hive.fetch.task.conversion': 'more',
+        'hive.fetch.task.conversion.threshold': '1073741824',
+        'hive.fetch.task.aggr': 'true',
+        'hive.compute.query.using.stats': 'true',
+        'hive.vectorized.execution.enabled': 'true',
+        'hive.exec.orc.split.strategy': 'BI',
+    },
+    # large scans and joins: every query runs as a job, independent stages run in parallel
+    'batch': {
+        'hive.fetch.task.conversion': 'none',
+        'hive.vectorized.execution.enabled': 'true',
+        'hive.vectorized.execution.reduce.enabled': 'true',
+        'hive.exec.parallel': 'true',
+        'hive.exec.parallel.thread.number': '8',
+        'hive.exec.orc.split.strategy': 'ETL',
+        'hive.auto.convert.join': 'true',
+        'hive.cbo.enable': 'true',
+        'hive.stats.fetch.column.stats': 'true',
+    },
+}
+
+_profiles = {name: dict(settings) for name, settings in PROFILES.items()}
+_lock = threading.Lock()
+
+
+def conf_value(value):
+    """
+    :param value: setting value, ``bool`` values are written as ``true``/``false`` like Hive expects
+    :return: the value as a string
+    :rtype: str
+    """
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if not isinstance(value, (str, int, float)):
+        raise ValueError('setting values must be str, int, float or bool, got: {}'.format(type(value)))
+    return str(value)
+
+
+def conf_dict(settings):
+    """
+    Validate settings
+
+    :param settings: ``dict`` of setting names and values
+    :return: the settings with string values
+    :rtype: dict
+    """
+    if not isinstance(settings, dict):
+        raise ValueError('expected `dict`, got: {}'.format(type(settings)))
+    converted = {}
+    for name, value in settings.items():
+        if not isinstance(name, str) or not name.strip():
+            raise ValueError('setting names must be non-empty strings, got: {!r}'.format(name))
+        converted[name.strip()] = conf_value(value)
+    return converted
+
+
+def register_profile(name, settings, base=None):
+    """
+    Register a tuning profile, replacing a profile of the same name
+
+    :param name: profile name used with ``connect(profile=name)``
+    :param settings: ``dict`` of Hive configuration settings
+    :param base: name of a profile whose settings are extended
+    """
+    settings = conf_dict(settings)
+    with _lock:
+        if base is not None:
+            if base not in _profiles:
+                raise ValueError('unknown tuning profile: {}, known profiles: {}'.format(base, ', '.join(
+                    sorted(_profiles))))
+            extended = dict(_profiles[base])
+            extended.update(settings)
+            settings = extended
+        _profiles[name] = settings
+
+
+def get_profile(name):
+    """
+    :param name: profile name
+    :return: a copy of the settings of the profile
+    :rtype: dict
+    :raises ValueError: if no such profile is registered
+    """
+    with _lock:
+        settings = _profiles.get(name)
+        if settings is None:
+            raise ValueError('unknown tuning profile: {}, known profiles: {}'.format(name, ', '.join(
+                sorted(_profiles))))
+        return dict(settings)
+
+
+def profile_names():
+    """
+    :return: names of the registered profiles
+    :rtype: list
+    """
+    with _lock:
+        return sorted(_profiles)
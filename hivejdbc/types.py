@@ -1,11 +1,226 @@
-__all__ = ['HiveTypeConversion']
+__all__ = ['HiveTypeConversion', 'LazyJson', 'json_loader']
 
 import json
+import importlib
+import math
+import datetime
+from decimal import Decimal
 from pyjdbc.types import JdbcTypeConversion, jdbctype
 
+# java.sql.Types constants, resolving these in python avoids a JDBCType.valueOf() call across the jvm
+# bridge for every cell that is converted.
+JDBC_TYPE_NAMES = {
+    -16: 'LONGNVARCHAR',
+    -15: 'NCHAR',
+    -9: 'NVARCHAR',
+    -8: 'ROWID',
+    -7: 'BIT',
+    -6: 'TINYINT',
+    -5: 'BIGINT',
+    -4: 'LONGVARBINARY',
+    -3: 'VARBINARY',
+    -2: 'BINARY',
+    -1: 'LONGVARCHAR',
+    0: 'NULL',
+    1: 'CHAR',
+    2: 'NUMERIC',
+    3: 'DECIMAL',
+    4: 'INTEGER',
+    5: 'SMALLINT',
+    6: 'FLOAT',
+    7: 'REAL',
+    8: 'DOUBLE',
+    12: 'VARCHAR',
+    16: 'BOOLEAN',
+    70: 'DATALINK',
+    91: 'DATE',
+    92: 'TIME',
+    93: 'TIMESTAMP',
+    1111: 'OTHER',
+    2000: 'JAVA_OBJECT',
+    2001: 'DISTINCT',
+    2002: 'STRUCT',
+    2003: 'ARRAY',
+    2004: 'BLOB',
+    2005: 'CLOB',
+    2006: 'REF',
+    2009: 'SQLXML',
+    2011: 'NCLOB',
+    2012: 'REF_CURSOR',
+    2013: 'TIME_WITH_TIMEZONE',
+    2014: 'TIMESTAMP_WITH_TIMEZONE',
+}
+
+# Column types that can be read with a primitive ResultSet getter, used by the columnar fetch path.
+# name: (getter, python type, numpy dtype, pyarrow type factory name)
+PRIMITIVE_TYPES = {
+    'BOOLEAN': ('getBoolean', bool, 'bool', 'bool_'),
+    'BIT': ('getBoolean', bool, 'bool', 'bool_'),
+    'TINYINT': ('getByte', int, 'int8', 'int8'),
+    'SMALLINT': ('getShort', int, 'int16', 'int16'),
+    'INTEGER': ('getInt', int, 'int32', 'int32'),
+    'BIGINT': ('getLong', int, 'int64', 'int64'),
+    'FLOAT': ('getFloat', float, 'float32', 'float32'),
+    'REAL': ('getFloat', float, 'float32', 'float32'),
+    'DOUBLE': ('getDouble', float, 'float64', 'float64'),
+    'CHAR': ('getString', str, None, 'string'),
+    'VARCHAR': ('getString', str, None, 'string'),
+    'LONGVARCHAR': ('getString', str, None, 'string'),
+}
+
+# python types whose literals are constants, Hive accepts only constants within ``INSERT ... VALUES``
+CONSTANT_TYPES = (str, int, float, Decimal, bool, type(None))
+
+STRING_ESCAPES = {
+    '\\': '\\\\',
+    '\'': '\\\'',
+    '\n': '\\n',
+    '\r': '\\r',
+    '\t': '\\t',
+    '\0': '\\0',
+}
+
+# (precision, scale) of the ``DECIMAL`` columns storing python ``Decimal`` values
+DECIMAL_PRECISION = (38, 18)
+
+JAVA_INT_MIN = -2 ** 31
+JAVA_INT_MAX = 2 ** 31 - 1
+
+# complex column types, Hive returns these as json strings
+COMPLEX_TYPES = ('ARRAY', 'MAP', 'STRUCT')
+
+# json libraries in order of preference for `json_backend='auto'`
+JSON_BACKENDS = ('orjson', 'simdjson', 'json')
+
+
+def json_loader(backend='auto'):
+    """
+    Resolve the ``loads`` function of a json library
+
+    :param backend: one of ``JSON_BACKENDS`` or ``auto`` to use the fastest installed library
+    :return: function decoding a json string
+    """
+    if backend != 'auto' and backend not in JSON_BACKENDS:
+        raise ValueError('json backend must be "auto" or one of: ({}), got: {}'.format(', '.join(JSON_BACKENDS),
+                                                                                     backend))
+    names = JSON_BACKENDS if backend == 'auto' else (backend,)
+    for name in names:
+        try:
+            module = importlib.import_module(name)
+        except ImportError:
+            if backend != 'auto':
+                raise ModuleNotFoundError('json backend "{}" is not installed'.format(name)) from None
+            continue
+        return module.loads
+
+
+class LazyJson:
+    """
+    Proxy for a Hive complex value, the json text is only decoded when the value is accessed.
+
+    Supports item access, iteration, ``len()`` and comparison, ``value`` returns the decoded value.
+    """
+    __slots__ = ('_text', '_loads', '_value', '_decoded')
+
+    def __init__(self, text, loads=json.loads):
+        self._text = text
+        self._loads = loads
+        self._value = None
+        self._decoded = False
+
+    @property
+    def text(self):
+        """the undecoded json text"""
+        return self._text
+
+    @property
+    def value(self):
+        """the decoded value"""
+        if not self._decoded:
+            try:
+                self._value = self._loads(self._text)
+            except ValueError as e:
+                raise ValueError('unable to decode Hive json string: {}\nColumn Value:\n{}'.format(e, self._text))
+            self._decoded = True
+        return self._value
+
+    def __getitem__(self, item):
+        return self.value[item]
+
+    def __iter__(self):
+        return iter(self.value)
+
+    def __len__(self):
+        return len(self.value)
+
+    def __contains__(self, item):
+        return item in self.value
+
+    def __bool__(self):
+        return bool(self.value)
+
+    def __eq__(self, other):
+        if isinstance(other, LazyJson):
+            other = other.value
+        return self.value == other
+
+    __hash__ = None
+
+    def __getattr__(self, item):
+        # dict/list methods such as keys(), items(), index(). Private and special names are not forwarded, they
+        # are looked up by `pickle` and `copy` before the slots are set
+        if item.startswith('_'):
+            raise AttributeError(item)
+        return getattr(self.value, item)
+
+    def __reduce__(self):
+        return LazyJson, (self._text,)
+
+    def __repr__(self):
+        return 'LazyJson({})'.format(self._text)
+
+
+def _set_null(statement, index, value):
+    statement.setNull(index, 0)  # java.sql.Types.NULL
+
+
+def _set_int(statement, index, value):
+    if JAVA_INT_MIN <= value <= JAVA_INT_MAX:
+        statement.setInt(index, value)
+    else:
+        statement.setLong(index, value)
+
+
+def _parameter_setter(pytype):
+    if pytype is type(None):
+        return _set_null
+    # bool is a subclass of int and must be tested first
+    for base, method in ((bool, 'setBoolean'), (int, None), (float, 'setDouble'), (str, 'setString')):
+        if issubclass(pytype, base):
+            if method is None:
+                return _set_int
+            return lambda statement, index, value, method=method: getattr(statement, method)(index, value)
+    return lambda statement, index, value: statement.setObject(index, value)
+
 
 class HiveTypeConversion(JdbcTypeConversion):
 
+    def __init__(self, json_backend='auto', complex_types='eager'):
+        """
+        :param json_backend: json library used to decode complex types, see ``json_loader``
+        :param complex_types: ``eager`` decodes ARRAY, MAP and STRUCT values when fetched, ``lazy`` returns
+                              ``LazyJson`` proxies that are decoded when accessed
+        """
+        super().__init__()
+        if complex_types not in ('eager', 'lazy'):
+            raise ValueError('complex_types must be "eager" or "lazy", got: {}'.format(complex_types))
+        self.json_loads = json_loader(json_backend)
+        self.lazy_complex = complex_types == 'lazy'
+        # column type signature: reader factory, see `reader_factory`
+        self._reader_factories = {}
+        # python type: PreparedStatement parameter setter, see `parameter_setter`
+        self._parameter_setters = {}
+
     @jdbctype(getter='getString', setter='setString', pytype=list)
     def ARRAY(self, value):
         return self.json_str(value)
@@ -29,7 +244,416 @@ class HiveTypeConversion(JdbcTypeConversion):
         if not value.strip():
             return None
 
+        if self.lazy_complex:
+            return LazyJson(value, self.json_loads)
+
+        try:
+            return self.json_loads(value)
+        except ValueError as e:
+            raise ValueError('unable to decode Hive json string: {}\nColumn Value:\n{}'.format(e, value))
+
+    def json_batch(self, values, lazy=None):
+        """
+        Decode a batch of complex values from a single column at once
+
+        The json strings are joined into one json array and decoded with a single call.
+
+        :param values: list of json strings or ``None``
+        :param lazy: return ``LazyJson`` proxies, defaults to the ``complex_types`` setting
+        :return: list of decoded values
+        """
+        lazy = self.lazy_complex if lazy is None else lazy
+        result = [None] * len(values)
+        positions = []
+        texts = []
+        for idx, value in enumerate(values):
+            if value is None:
+                continue
+            value = str(value)
+            if not value.strip():
+                continue
+            positions.append(idx)
+            texts.append(value)
+
+        if lazy:
+            decoded = [LazyJson(text, self.json_loads) for text in texts]
+        else:
+            try:
+                decoded = self.json_loads('[' + ','.join(texts) + ']')
+            except ValueError:
+                decoded = None
+            if decoded is None or len(decoded) != len(texts):
+                # decode individually to report the value at fault
+                decoded = [self.json_str(text) for text in texts]
+
+        for idx, value in zip(positions, decoded):
+            result[idx] = value
+        return result
+
+    def complex_type(self, jdbc_code, column_type_name=None):
+        """
+        Determine if a column holds a Hive complex type
+
+        Hive reports ``map`` columns as ``JAVA_OBJECT``, the column type name from the result set metadata
+        is used to recognize them.
+
+        :param jdbc_code: java.sql.Types code
+        :param column_type_name: ``ResultSetMetaData.getColumnTypeName()`` of the column
+        :return: ``ARRAY``, ``MAP``, ``STRUCT`` or ``None``
+        """
+        type_name = self.jdbc_name(jdbc_code)
+        if type_name in COMPLEX_TYPES:
+            return type_name
+        if type_name == 'JAVA_OBJECT' and str(column_type_name or '').lower().startswith('map'):
+            return 'MAP'
+        return None
+
+    def batch_decoder(self, jdbc_code, column_type_name=None, lazy=None):
+        """
+        Resolve a function decoding a whole batch of column values, used with readers created by
+        ``column_reader(..., raw_complex=True)``
+
+        :param jdbc_code: java.sql.Types code
+        :param column_type_name: ``ResultSetMetaData.getColumnTypeName()`` of the column
+        :param lazy: see ``json_batch``
+        :return: function accepting and returning a list, or ``None`` if the column needs no batch decoding
+        """
+        if not self.complex_type(jdbc_code, column_type_name):
+            return None
+        return lambda values: self.json_batch(values, lazy=lazy)
+
+    def jdbc_name(self, jdbc_code):
+        """
+        Given a jdbc type code return the type name
+
+        Standard ``java.sql.Types`` codes are resolved without calling into the jvm.
+
+        :param jdbc_code: java.sql.Types code
+        :return: type name in uppercase
+        """
         try:
-            return json.loads(value)
-        except json.JSONDecodeError as e:
-            raise ValueError('unable to decode Hive json string: {}\nColumn Value:\n{}'.format(e, value))
\ No newline at end of file
+            return JDBC_TYPE_NAMES[int(jdbc_code)]
+        except (KeyError, TypeError, ValueError):
+            return super().jdbc_name(jdbc_code)
+
+    def numpy_dtype(self, jdbc_code):
+        """
+        The numpy dtype name used by the columnar fetch path for a column type
+
+        :param jdbc_code: java.sql.Types code
+        :return: numpy dtype name, or ``None`` if the column should be stored as ``object``
+        """
+        primitive = PRIMITIVE_TYPES.get(self.jdbc_name(jdbc_code))
+        return primitive[2] if primitive else None
+
+    def arrow_type(self, jdbc_code):
+        """
+        The pyarrow ``DataType`` used by the columnar fetch path for a column type
+
+        :param jdbc_code: java.sql.Types code
+        :return: pyarrow data type or ``None`` if the type should be inferred from the values
+        """
+        import pyarrow
+
+        type_name = self.jdbc_name(jdbc_code)
+        primitive = PRIMITIVE_TYPES.get(type_name)
+        if primitive:
+            return getattr(pyarrow, primitive[3])()
+        if type_name == 'TIMESTAMP':
+            return pyarrow.timestamp('us')
+        return None
+
+    def column_reader(self, resultset, column_idx, jdbc_code, column_type_name=None, raw_complex=False):
+        """
+        Resolve a function that reads and converts a single column of the current row.
+
+        The converter lookup happens once per column type rather than once per cell, primitive columns are
+        read with their native getter, and ``wasNull()`` is checked after the value has been read.
+
+        :param resultset: Java ResultSet object
+        :param column_idx: jdbc column index (starting at 1)
+        :param jdbc_code: java.sql.Types code of the column
+        :param column_type_name: ``ResultSetMetaData.getColumnTypeName()`` of the column
+        :param raw_complex: return complex values as json strings, to be decoded by ``batch_decoder``
+        :return: function without arguments returning the python value for the current row
+        """
+        return self.reader_factory(jdbc_code, column_type_name, raw_complex)(resultset, column_idx)
+
+    def reader_factory(self, jdbc_code, column_type_name=None, raw_complex=False):
+        """
+        Resolve how columns of a type are read, the result is cached by column type signature
+
+        :param jdbc_code: java.sql.Types code of the column
+        :param column_type_name: ``ResultSetMetaData.getColumnTypeName()`` of the column
+        :param raw_complex: return complex values as json strings, to be decoded by ``batch_decoder``
+        :return: function accepting (resultset, column index) and returning a column reader
+        """
+        key = (int(jdbc_code), str(column_type_name or '').lower(), raw_complex)
+        factory = self._reader_factories.get(key)
+        if factory is None:
+            factory = self._reader_factory(jdbc_code, column_type_name, raw_complex)
+            self._reader_factories[key] = factory
+        return factory
+
+    def row_reader(self, resultset, column_idx, jdbc_code):
+        """
+        Resolve a function that reads a single column of the current row, converting the value like ``py_value``
+        does. Used by the row fetch methods, the converter lookup happens once per column type.
+
+        :param resultset: Java ResultSet object
+        :param column_idx: jdbc column index (starting at 1)
+        :param jdbc_code: java.sql.Types code of the column
+        :return: function without arguments returning the python value for the current row
+        """
+        key = (int(jdbc_code), None, 'row')
+        factory = self._reader_factories.get(key)
+        if factory is None:
+            factory = self._converter_factory(self.jdbc_name(jdbc_code))
+            self._reader_factories[key] = factory
+        return factory(resultset, column_idx)
+
+    def _reader_factory(self, jdbc_code, column_type_name, raw_complex):
+        type_name = self.jdbc_name(jdbc_code)
+        primitive = PRIMITIVE_TYPES.get(type_name)
+
+        if self.complex_type(jdbc_code, column_type_name):
+            decode = str if raw_complex else self.json_str
+
+            def make(resultset, column_idx):
+                get_string = resultset.getString
+                was_null = resultset.wasNull
+
+                def read():
+                    value = get_string(column_idx)
+                    if value is None or was_null():
+                        return None
+                    return decode(value)
+
+                return read
+
+            return make
+
+        if primitive:
+            getter = primitive[0]
+            pytype = primitive[1]
+
+            def make(resultset, column_idx):
+                get_value = getattr(resultset, getter)
+                was_null = resultset.wasNull
+
+                def read():
+                    value = get_value(column_idx)
+                    if was_null():
+                        return None
+                    return pytype(value)
+
+                return read
+
+            return make
+
+        return self._converter_factory(type_name)
+
+    def _converter_factory(self, type_name):
+        """reader factory converting values with the ``JdbcType`` registered for ``type_name``"""
+        converter = self.jdbc_type(type_name, self.JDBC_DEFAULT)
+
+        if converter.resultset:
+            # the conversion function reads the value from the result-set itself
+            def make(resultset, column_idx):
+                def read():
+                    if converter.decorator:
+                        return converter.fn(self, resultset, column_idx)
+                    return converter.fn(resultset, column_idx)
+
+                return read
+
+            return make
+
+        convert = self.value_converter(converter)
+
+        def make(resultset, column_idx):
+            get_value = getattr(resultset, converter.getter)
+            was_null = resultset.wasNull
+
+            def read():
+                value = get_value(column_idx)
+                if value is None or was_null():
+                    return None
+                return convert(value)
+
+            return read
+
+        return make
+
+    def value_converter(self, converter):
+        """
+        Resolve the function applied to values retrieved by a ``JdbcType`` getter
+
+        :param converter: JdbcType describing the column
+        :type converter: pyjdbc.types.JdbcType
+        :return: function accepting the jdbc value and returning the python value
+        """
+        if converter.fn is not None:
+            if converter.decorator:
+                return lambda value: converter.fn(self, value)
+            return converter.fn
+
+        if converter.pytype is not None and converter.pytype is not object and callable(converter.pytype):
+            return converter.pytype
+
+        return lambda value: value
+
+    def parameter_setter(self, pytype):
+        """
+        Resolve the function binding values of a python type to ``PreparedStatement`` parameters
+
+        :param pytype: python type of the parameter value
+        :return: function accepting (statement, parameter index, value)
+        """
+        setter = self._parameter_setters.get(pytype)
+        if setter is None:
+            setter = self._parameter_setters[pytype] = _parameter_setter(pytype)
+        return setter
+
+    def sql_literal(self, value):
+        """
+        Render a python value as a HiveQL literal
+
+        ``list``/``tuple`` are rendered as ``array()``, ``dict`` as ``map()`` and named tuples as ``named_struct()``
+
+        :param value: python value
+        :return: sql text
+        :rtype: str
+        """
+        if value is None:
+            return 'NULL'
+        if isinstance(value, bool):
+            return 'TRUE' if value else 'FALSE'
+        if isinstance(value, int):
+            return str(int(value))
+        if isinstance(value, float):
+            if math.isnan(value) or math.isinf(value):
+                return "CAST('{}' AS DOUBLE)".format('NaN' if math.isnan(value) else
+                                                     ('Infinity' if value > 0 else '-Infinity'))
+            return repr(value)
+        if isinstance(value, Decimal):
+            if not value.is_finite():
+                # Hive DECIMAL has no NaN or infinity
+                raise ValueError('unable to convert {!r} to a Hive DECIMAL literal'.format(value))
+            return '{:f}BD'.format(value)
+        if isinstance(value, str):
+            return "'{}'".format(''.join(STRING_ESCAPES.get(char, char) for char in value))
+        if isinstance(value, datetime.datetime):
+            return "CAST('{}' AS TIMESTAMP)".format(value.strftime('%Y-%m-%d %H:%M:%S.%f'))
+        if isinstance(value, datetime.date):
+            return "CAST('{}' AS DATE)".format(value.strftime('%Y-%m-%d'))
+        if isinstance(value, (bytes, bytearray)):
+            return "unhex('{}')".format(bytes(value).hex())
+        if isinstance(value, tuple) and hasattr(value, '_fields'):
+            fields = ', '.join('{}, {}'.format(self.sql_literal(name), self.sql_literal(item))
+                               for name, item in zip(value._fields, value))
+            return 'named_struct({})'.format(fields)
+        if isinstance(value, (list, tuple)):
+            return 'array({})'.format(', '.join(self.sql_literal(item) for item in value))
+        if isinstance(value, dict):
+            pairs = ', '.join('{}, {}'.format(self.sql_literal(key), self.sql_literal(item))
+                              for key, item in value.items())
+            return 'map({})'.format(pairs)
+        raise ValueError('unable to convert {} to a Hive literal: {!r}'.format(type(value), value))
+
+    def hive_type(self, value):
+        """
+        The Hive column type storing a python value
+
+        ``list``/``tuple`` map to ``ARRAY``, ``dict`` to ``MAP`` and named tuples to ``STRUCT``, the element types are
+        taken from the first element that is not ``None``
+
+        :param value: python value
+        :return: Hive type, ie: ``BIGINT`` or ``ARRAY<STRING>``, ``None`` if ``value`` is ``None``
+        :rtype: str
+        """
+        if value is None:
+            return None
+        if isinstance(value, bool):
+            return 'BOOLEAN'
+        if isinstance(value, int):
+            return 'BIGINT'
+        if isinstance(value, float):
+            return 'DOUBLE'
+        if isinstance(value, Decimal):
+            return 'DECIMAL({},{})'.format(*DECIMAL_PRECISION)
+        if isinstance(value, str):
+            return 'STRING'
+        if isinstance(value, datetime.datetime):
+            return 'TIMESTAMP'
+        if isinstance(value, datetime.date):
+            return 'DATE'
+        if isinstance(value, (bytes, bytearray)):
+            return 'BINARY'
+        if isinstance(value, tuple) and hasattr(value, '_fields'):
+            return 'STRUCT<{}>'.format(','.join('{}:{}'.format(name, self.hive_type(item) or 'STRING')
+                                                for name, item in zip(value._fields, value)))
+        if isinstance(value, (list, tuple)):
+            return 'ARRAY<{}>'.format(self.column_type(value))
+        if isinstance(value, dict):
+            return 'MAP<{},{}>'.format(self.column_type(value.keys()), self.column_type(value.values()))
+        raise ValueError('unable to map {} to a Hive type: {!r}'.format(type(value), value))
+
+    def column_type(self, values):
+        """
+        The Hive column type storing a sequence of python values
+
+        Integers mixed with floats are stored as ``DOUBLE``, columns without any values as ``STRING``
+
+        :param values: python values
+        :return: Hive type
+        :rtype: str
+        :raises: ValueError if the values map to different types
+        """
+        types = set()
+        seen = set()
+        items = []
+        keys = []
+        entries = []
+        for value in values:
+            if isinstance(value, dict):
+                keys.extend(value.keys())
+                entries.extend(value.values())
+                types.add(dict)
+            elif isinstance(value, (list, tuple)) and not hasattr(value, '_fields'):
+                items.extend(value)
+                types.add(list)
+            elif type(value) not in seen:
+                # the type of one value per python type is enough for scalar values
+                seen.add(type(value))
+                hive_type = self.hive_type(value)
+                if hive_type is not None:
+                    types.add(hive_type)
+
+        # elements of every collection in the column decide its element type
+        if list in types:
+            types.discard(list)
+            types.add('ARRAY<{}>'.format(self.column_type(items)))
+        if dict in types:
+            types.discard(dict)
+            types.add('MAP<{},{}>'.format(self.column_type(keys), self.column_type(entries)))
+
+        if not types:
+            return 'STRING'
+        if types == {'BIGINT', 'DOUBLE'}:
+            return 'DOUBLE'
+        if len(types) > 1:
+            raise ValueError('values map to different Hive types: {}'.format(', '.join(sorted(types))))
+        return types.pop()
+
+    def is_constant(self, value):
+        """
+        Indicates if the literal for a value is a constant, Hive rejects other expressions in ``INSERT ... VALUES``
+        with the error: "Expression of type TOK_FUNCTION not supported in insert/values"
+
+        :param value: python value
+        :rtype: bool
+        """
+        if isinstance(value, float) and (math.isnan(value) or math.isinf(value)):
+            return False
+        return isinstance(value, CONSTANT_TYPES)
@@ -24,4 +24,12 @@ setup(
     install_requires=[
         'pyjdbc==0.2.2'
     ],
+    extras_require={
+        'numpy': ['numpy'],
+        'arrow': ['pyarrow'],
+        'pandas': ['pandas'],
+        'json': ['orjson'],
+        'prometheus': ['prometheus_client'],
+        'opentelemetry': ['opentelemetry-api'],
+    },
 )
@@ -0,0 +1,247 @@
+"""
+In-process stand-ins for the ``java.sql`` objects used by `hivejdbc`
+
+These implement just enough of ``Connection``, ``PreparedStatement``, ``ResultSet`` and ``ResultSetMetaData``
+to drive the cursor implementations without a jvm or a Hive server.
+"""
+import json
+import threading
+
+# java.sql.Types codes
+BOOLEAN = 16
+INTEGER = 4
+BIGINT = -5
+DOUBLE = 8
+VARCHAR = 12
+ARRAY = 2003
+STRUCT = 2002
+JAVA_OBJECT = 2000
+
+GETTERS = ('getString', 'getBoolean', 'getByte', 'getShort', 'getInt', 'getLong', 'getFloat', 'getDouble',
+           'getObject', 'getBigDecimal', 'getDate', 'getTime', 'getTimestamp')
+
+DEFAULTS = {'getBoolean': False, 'getByte': 0, 'getShort': 0, 'getInt': 0, 'getLong': 0,
+            'getFloat': 0.0, 'getDouble': 0.0}
+
+TYPE_NAMES = {BOOLEAN: 'boolean', INTEGER: 'int', BIGINT: 'bigint', DOUBLE: 'double', VARCHAR: 'string',
+              ARRAY: 'array', STRUCT: 'struct', JAVA_OBJECT: 'map'}
+
+
+class FakeMetaData:
+
+    def __init__(self, columns):
+        self._columns = columns
+
+    def getColumnCount(self):
+        return len(self._columns)
+
+    def getColumnName(self, column):
+        return self._columns[column - 1][0]
+
+    def getColumnLabel(self, column):
+        return self._columns[column - 1][0]
+
+    def getColumnType(self, column):
+        return self._columns[column - 1][1]
+
+    def getColumnTypeName(self, column):
+        return TYPE_NAMES.get(self._columns[column - 1][1], 'string')
+
+    def getColumnDisplaySize(self, column):
+        return 0
+
+    def getPrecision(self, column):
+        return 0
+
+    def getScale(self, column):
+        return 0
+
+    def isNullable(self, column):
+        return 1
+
+
+class FakeResultSet:
+    """
+    Result set over python rows, complex values (list/dict) are returned as json strings like Hive does.
+    """
+
+    def __init__(self, columns, rows):
+        self._columns = columns
+        self._rows = rows
+        self._index = -1
+        self._was_null = False
+        self.closed = False
+        self.fetch_size = 0
+        self.next_calls = 0
+        for getter in GETTERS:
+            setattr(self, getter, self._getter(getter))
+
+    def _getter(self, name):
+        def get(column):
+            value = self._rows[self._index][column - 1]
+            self._was_null = value is None
+            if value is None:
+                return DEFAULTS.get(name)
+            if isinstance(value, (list, dict)):
+                return json.dumps(value)
+            if name == 'getString':
+                return str(value)
+            return value
+        return get
+
+    def next(self):
+        self.next_calls += 1
+        self._index += 1
+        return self._index < len(self._rows)
+
+    def wasNull(self):
+        return self._was_null
+
+    def last(self):
+        return False
+
+    def beforeFirst(self):
+        pass
+
+    def getRow(self):
+        return self._index + 1
+
+    def getMetaData(self):
+        return FakeMetaData(self._columns)
+
+    def getWarnings(self):
+        return None
+
+    def setFetchSize(self, size):
+        self.fetch_size = size
+
+    def getFetchSize(self):
+        return self.fetch_size
+
+    def close(self):
+        self.closed = True
+
+
+class FakeStatement:
+
+    def __init__(self, connection, sql):
+        self._connection = connection
+        self.sql = sql
+        self.parameters = {}
+        self.closed = False
+        self.cancelled = threading.Event()
+        self.fetch_size = 0
+        self._resultset = None
+        self._update_count = -1
+
+    def _setter(self, column, value):
+        self.parameters[column] = value
+
+    setString = setInt = setLong = setDouble = setBoolean = setBytes = setObject = _setter
+
+    def setNull(self, column, sql_type):
+        self.parameters[column] = None
+
+    def clearParameters(self):
+        self.parameters = {}
+
+    def setFetchSize(self, size):
+        self.fetch_size = size
+
+    def execute(self, sql=None):
+        sql = sql or self.sql
+        self._connection.executed.append(sql)
+        result = self._connection.handler(sql, dict(self.parameters))
+        if isinstance(result, tuple):
+            columns, rows = result
+            self._resultset = FakeResultSet(columns, rows)
+            self._resultset.setFetchSize(self.fetch_size)
+            return True
+        self._update_count = result if result is not None else 0
+        return False
+
+    def getResultSet(self):
+        return self._resultset
+
+    def executeAsync(self, sql):
+        return self.execute(sql)
+
+    def getUpdateCount(self):
+        # asynchronous statements wait here until the connection's `finished` event is set
+        while not self._connection.finished.wait(0.01):
+            if self.cancelled.is_set():
+                raise RuntimeError('Query was cancelled')
+        return self._update_count
+
+    def getQueryLog(self, incremental, fetch_size):
+        log = self._connection.query_log
+        lines, log[:] = log[:fetch_size], log[fetch_size:]
+        return lines
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def close(self):
+        self.closed = True
+
+
+class FakeDatabaseMetaData:
+    """``getColumns`` calls are recorded as ``getColumns database.table`` and answered by the connection handler"""
+
+    def __init__(self, connection):
+        self._connection = connection
+
+    def getColumns(self, catalog, schema, table, column):
+        sql = 'getColumns {}.{}'.format(schema, table)
+        self._connection.executed.append(sql)
+        columns, rows = self._connection.handler(sql, {})
+        return FakeResultSet(columns, rows)
+
+
+class FakeConnection:
+    """
+    ``handler(sql, parameters)`` returns a ``(columns, rows)`` tuple for queries or an update count for other
+    statements. columns are ``(name, java.sql.Types code)`` tuples.
+    """
+
+    def __init__(self, handler=None, valid=True):
+        self.handler = handler or (lambda sql, params: 0)
+        self.executed = []
+        self.statements = []
+        self.valid = valid
+        self.closed = False
+        # query log lines returned by `getQueryLog`, and the event completing asynchronous statements
+        self.query_log = []
+        self.finished = threading.Event()
+        self.finished.set()
+
+    def prepareStatement(self, sql):
+        statement = FakeStatement(self, sql)
+        self.statements.append(statement)
+        return statement
+
+    def createStatement(self):
+        return self.prepareStatement(None)
+
+    def getMetaData(self):
+        return FakeDatabaseMetaData(self)
+
+    def isValid(self, timeout):
+        return self.valid and not self.closed
+
+    def isClosed(self):
+        return self.closed
+
+    def close(self):
+        self.closed = True
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+def query_result(columns, rows):
+    """handler returning the same result for every statement"""
+    return lambda sql, params: (columns, rows)
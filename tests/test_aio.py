@@ -0,0 +1,106 @@
+"""
+Test the asyncio interface `hivejdbc.aio`
+"""
+import asyncio
+import threading
+import unittest
+
+from pyjdbc.dbapi import JdbcConnection
+
+from hivejdbc import HiveCursor
+from hivejdbc.aio import AsyncConnection
+from hivejdbc.jvm import JvmThreadPoolExecutor
+from hivejdbc.types import HiveTypeConversion
+from tests.fakes import FakeConnection, query_result, INTEGER
+
+COLUMNS = [('id', INTEGER)]
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def async_connection(handler):
+    fake = FakeConnection(handler)
+    conn = JdbcConnection(connection=fake, cursor_class=HiveCursor, type_conversion=HiveTypeConversion())
+    return fake, AsyncConnection(conn)
+
+
+class TestAsyncCursor(unittest.TestCase):
+
+    def test_iterate(self):
+        async def main():
+            fake, conn = async_connection(query_result(COLUMNS, [(i,) for i in range(5)]))
+            async with conn.cursor() as cursor:
+                cursor.arraysize = 2
+                await cursor.execute('select id from t')
+                first = await cursor.fetchone()
+                rest = [row async for row in cursor]
+            await conn.close()
+            return fake, first, rest
+
+        fake, first, rest = run(main())
+        self.assertEqual(first, ('0',))
+        self.assertEqual(rest, [('1',), ('2',), ('3',), ('4',)])
+        self.assertTrue(fake.closed)
+
+    def test_cancel(self):
+        def handler(sql, params):
+            # block until the statement is cancelled
+            self.assertTrue(fake.statements[-1].cancelled.wait(5))
+            return 0
+
+        fake, conn = async_connection(handler)
+
+        async def main():
+            task = asyncio.ensure_future(conn.cursor().execute('select sleep(100)'))
+            await asyncio.sleep(0.1)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            # the connection is usable again once the cancelled statement finished
+            fake.handler = query_result(COLUMNS, [(1,)])
+            cursor = conn.cursor()
+            await cursor.execute('select 1')
+            return await cursor.fetchall()
+
+        self.assertEqual(run(main()), [('1',)])
+        self.assertTrue(fake.statements[0].cancelled.is_set())
+
+    def test_cancel_saturated_executor(self):
+        blocked = threading.Event()
+        waited = []
+
+        def handler(sql, params):
+            if sql == 'select 1':
+                return COLUMNS, [(1,)]
+            blocked.set()
+            waited.append(fake.statements[-1].cancelled.wait(5))
+            return 0
+
+        fake = FakeConnection(handler)
+        executor = JvmThreadPoolExecutor(max_workers=1)
+        self.addCleanup(executor.shutdown)
+        conn = AsyncConnection(JdbcConnection(connection=fake, cursor_class=HiveCursor,
+                                              type_conversion=HiveTypeConversion()), executor=executor)
+
+        async def main():
+            cursor = conn.cursor()
+            # the statement of this query stays open on the cursor, the cancel must not pick it up
+            await cursor.execute('select 1')
+            task = asyncio.ensure_future(cursor.execute('select sleep(100)'))
+            while not blocked.is_set():
+                await asyncio.sleep(0.01)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        run(main())
+        # the cancel did not wait for the executor running the statement
+        self.assertEqual(waited, [True])
+        self.assertFalse(fake.statements[0].cancelled.is_set())
+        self.assertTrue(fake.statements[1].cancelled.is_set())
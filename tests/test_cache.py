@@ -0,0 +1,174 @@
+"""
+Test the query result cache `hivejdbc.cache`
+"""
+import os
+import tempfile
+import unittest
+
+import pytest
+
+from hivejdbc import HiveConnection, HiveCursor, DictCursor
+from hivejdbc.cache import ResultCache
+from hivejdbc.types import HiveTypeConversion
+from tests.fakes import FakeConnection, INTEGER, VARCHAR
+
+COLUMNS = [('id', INTEGER), ('name', VARCHAR)]
+ROWS = [(1, 'a'), (2, 'b'), (3, None)]
+
+
+def cached_connection(cache, cursor_class=HiveCursor):
+    def handler(sql, params):
+        return (COLUMNS, ROWS) if sql.lower().lstrip().startswith('select') else 0
+    fake = FakeConnection(handler)
+    conn = HiveConnection(fake, cursor_class, type_conversion=HiveTypeConversion(), result_cache=cache,
+                          database='default')
+    return fake, conn
+
+
+class TestCacheKey(unittest.TestCase):
+
+    def test_normalized(self):
+        first = ResultCache.key('SELECT *\nFROM t  -- comment\n', database='default')
+        self.assertEqual(first, ResultCache.key('select * from t;', database='default'))
+        self.assertNotEqual(first, ResultCache.key('select * from t', database='other'))
+        self.assertNotEqual(first, ResultCache.key('select * from t', database='default', settings={'a': '1'}))
+        self.assertNotEqual(ResultCache.key("select * from t where x = 'A'"),
+                            ResultCache.key("select * from t where x = 'a'"))
+
+    def test_not_cacheable(self):
+        self.assertIsNone(ResultCache.key('insert into t values (1)'))
+        self.assertIsNone(ResultCache.key('select rand() from t'))
+        # tables of the FROM clause unknown
+        self.assertIsNone(ResultCache.key('select * from a where x is distinct from b and y'))
+
+
+class TestResultCache(unittest.TestCase):
+
+    def test_hit(self):
+        cache = ResultCache()
+        fake, conn = cached_connection(cache)
+        cursor = conn.cursor()
+        cursor.execute('select * from t')
+        rowcount = cursor.rowcount
+        first = cursor.fetchall()
+        cursor.execute('SELECT * FROM t')
+        # the row count does not depend on the cache
+        self.assertEqual(cursor.rowcount, rowcount)
+        self.assertEqual(cursor.fetchmany(2), first[:2])
+        self.assertEqual(cursor.fetchall(), first[2:])
+        self.assertEqual(cursor.description[0][0], 'id')
+        self.assertEqual(len(fake.executed), 1)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_partial_read_not_cached(self):
+        cache = ResultCache()
+        fake, conn = cached_connection(cache)
+        cursor = conn.cursor()
+        cursor.execute('select * from t')
+        cursor.fetchone()
+        cursor.execute('select * from t')
+        self.assertEqual(len(fake.executed), 2)
+
+    def test_invalidate_on_write(self):
+        cache = ResultCache()
+        fake, conn = cached_connection(cache)
+        cursor = conn.cursor()
+        cursor.execute('select * from t')
+        cursor.fetchall()
+        cursor.execute('insert into default.t values (4, "d")')
+        cursor.execute('select * from t')
+        cursor.fetchall()
+        self.assertEqual(len(fake.executed), 3)
+        self.assertEqual(cache.invalidations, 1)
+
+    def test_invalidate_comma_join(self):
+        cache = ResultCache()
+        fake, conn = cached_connection(cache)
+        cursor = conn.cursor()
+        cursor.execute('select * from a x, b y where x.id = y.id')
+        cursor.fetchall()
+        cursor.execute('insert into b values (4, "d")')
+        cursor.execute('select * from a x, b y where x.id = y.id')
+        cursor.fetchall()
+        self.assertEqual(len(fake.executed), 3)
+        self.assertEqual((cache.hits, cache.invalidations), (0, 1))
+
+    def test_session_state(self):
+        cache = ResultCache()
+        fake, conn = cached_connection(cache)
+        cursor = conn.cursor()
+        cursor.execute('select * from t')
+        cursor.fetchall()
+        cursor.execute('use other')
+        self.assertEqual(conn.database, 'other')
+        cursor.execute('select * from t')
+        cursor.fetchall()
+        self.assertEqual(len(fake.executed), 3)
+
+    def test_cursor_ttl(self):
+        cache = ResultCache()
+        fake, conn = cached_connection(cache)
+        cursor = conn.cursor()
+        cursor.cache_ttl = 0
+        for _ in range(2):
+            cursor.execute('select * from t')
+            cursor.fetchall()
+        self.assertEqual(len(fake.executed), 2)
+
+    def test_eviction(self):
+        cache = ResultCache(max_entries=1)
+        fake, conn = cached_connection(cache)
+        cursor = conn.cursor()
+        for sql in ('select * from a', 'select * from b', 'select * from a'):
+            cursor.execute(sql)
+            cursor.fetchall()
+        self.assertEqual(len(fake.executed), 3)
+        self.assertEqual(cache.evictions, 2)
+
+    def test_disk_tier(self):
+        with tempfile.TemporaryDirectory() as directory:
+            fake, conn = cached_connection(ResultCache(directory=directory))
+            cursor = conn.cursor()
+            cursor.execute('select * from t')
+            rows = cursor.fetchall()
+
+            # a new cache (another process) reads the result from disk
+            cache = ResultCache(directory=directory)
+            fake, conn = cached_connection(cache)
+            cursor = conn.cursor()
+            cursor.execute('select * from t')
+            self.assertEqual(cursor.fetchall(), rows)
+            self.assertEqual(len(fake.executed), 0)
+            self.assertEqual(cache.disk_hits, 1)
+
+    @unittest.skipUnless(hasattr(os, 'getuid'), 'posix only')
+    def test_disk_directory_private(self):
+        with tempfile.TemporaryDirectory() as parent:
+            directory = os.path.join(parent, 'cache')
+            ResultCache(directory=directory)
+            self.assertEqual(os.stat(directory).st_mode & 0o077, 0)
+
+            os.chmod(directory, 0o777)
+            with self.assertRaises(ValueError):
+                ResultCache(directory=directory)
+
+    def test_dict_cursor(self):
+        fake, conn = cached_connection(ResultCache(), cursor_class=DictCursor)
+        cursor = conn.cursor()
+        for _ in range(2):
+            cursor.execute('select * from t')
+            self.assertEqual(cursor.fetchone(), {'id': '1', 'name': 'a'})
+            cursor.fetchall()
+        self.assertEqual(len(fake.executed), 1)
+
+    def test_columnar_from_cache(self):
+        numpy = pytest.importorskip('numpy')
+        fake, conn = cached_connection(ResultCache())
+        cursor = conn.cursor()
+        cursor.execute('select * from t')
+        cursor.fetchall()
+        cursor.execute('select * from t')
+        arrays = cursor.fetch_numpy()
+        self.assertEqual(arrays['id'].dtype, numpy.int32)
+        self.assertEqual(arrays['id'].tolist(), [1, 2, 3])
+        self.assertEqual(len(fake.executed), 1)
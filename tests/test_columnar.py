@@ -0,0 +1,126 @@
+"""
+Test the columnar fetch path of `hivejdbc.HiveCursor`
+"""
+import copy
+import json
+import pickle
+import unittest
+import pytest
+
+from pyjdbc.dbapi import JdbcConnection
+
+from hivejdbc import HiveCursor
+from hivejdbc.types import HiveTypeConversion, LazyJson, json_loader
+from tests.fakes import FakeConnection, query_result, BIGINT, DOUBLE, VARCHAR, BOOLEAN, ARRAY, JAVA_OBJECT
+
+COLUMNS = [('id', BIGINT), ('score', DOUBLE), ('name', VARCHAR), ('ok', BOOLEAN), ('tags', ARRAY)]
+ROWS = [
+    (1, 1.5, 'a', True, ['x']),
+    (2, None, 'b', False, []),
+    (None, 3.5, None, True, None),
+]
+
+
+def make_cursor(rows=ROWS, batch_size=2):
+    conn = JdbcConnection(connection=FakeConnection(query_result(COLUMNS, rows)),
+                          cursor_class=HiveCursor,
+                          type_conversion=HiveTypeConversion())
+    cursor = conn.cursor()
+    cursor.columnar_batch_size = batch_size
+    cursor.execute('select * from t')
+    return cursor
+
+
+class TestTypeConversion(unittest.TestCase):
+
+    def test_jdbc_name_without_jvm(self):
+        conversion = HiveTypeConversion()
+        self.assertEqual(conversion.jdbc_name(BIGINT), 'BIGINT')
+        self.assertEqual(conversion.jdbc_name(ARRAY), 'ARRAY')
+        self.assertEqual(conversion.numpy_dtype(BIGINT), 'int64')
+        self.assertIsNone(conversion.numpy_dtype(VARCHAR))
+
+
+class TestFetchNumpy(unittest.TestCase):
+
+    def setUp(self):
+        self.numpy = pytest.importorskip('numpy')
+
+    def test_fetch_numpy(self):
+        cursor = make_cursor()
+        arrays = cursor.fetch_numpy()
+        self.assertEqual(list(arrays), ['id', 'score', 'name', 'ok', 'tags'])
+        self.assertEqual(arrays['id'].dtype, self.numpy.int64)
+        self.assertEqual(list(arrays['id'].mask), [False, False, True])
+        self.assertEqual(arrays['id'][1], 2)
+        self.assertEqual(arrays['score'][2], 3.5)
+        self.assertEqual(list(arrays['name']), ['a', 'b', None])
+        self.assertEqual(list(arrays['tags']), [['x'], [], None])
+
+    def test_fetch_numpy_size(self):
+        cursor = make_cursor()
+        first = cursor.fetch_numpy(1)
+        rest = cursor.fetch_numpy()
+        self.assertEqual(len(first['id']), 1)
+        self.assertEqual(len(rest['id']), 2)
+        self.assertEqual(len(cursor.fetch_numpy()['id']), 0)
+
+
+class TestFetchArrow(unittest.TestCase):
+
+    def setUp(self):
+        self.pyarrow = pytest.importorskip('pyarrow')
+
+    def test_fetch_arrow(self):
+        table = make_cursor().fetch_arrow()
+        self.assertEqual(table.num_rows, 3)
+        self.assertEqual(table.schema.field('id').type, self.pyarrow.int64())
+        self.assertEqual(table.column('id').to_pylist(), [1, 2, None])
+        self.assertEqual(table.column('tags').to_pylist(), [['x'], [], None])
+
+    def test_fetch_arrow_empty(self):
+        table = make_cursor(rows=[]).fetch_arrow()
+        self.assertEqual(table.num_rows, 0)
+        self.assertEqual(table.column_names, ['id', 'score', 'name', 'ok', 'tags'])
+
+
+class TestComplexTypes(unittest.TestCase):
+
+    def test_json_batch(self):
+        conversion = HiveTypeConversion(json_backend='json')
+        self.assertEqual(conversion.json_batch(['[1]', None, '', '{"a": 1}']), [[1], None, None, {'a': 1}])
+        with pytest.raises(ValueError):
+            conversion.json_batch(['[1]', '[2'])
+
+    def test_lazy(self):
+        conversion = HiveTypeConversion(complex_types='lazy')
+        value = conversion.json_str('{"a": [1, 2]}')
+        self.assertIsInstance(value, LazyJson)
+        self.assertEqual(value.text, '{"a": [1, 2]}')
+        self.assertEqual(value['a'], [1, 2])
+        self.assertEqual(value, {'a': [1, 2]})
+        self.assertEqual(list(value.keys()), ['a'])
+
+    def test_lazy_pickle(self):
+        value = HiveTypeConversion(complex_types='lazy').json_str('[1, {"a": 2}]')
+        restored = pickle.loads(pickle.dumps(value))
+        self.assertIsInstance(restored, LazyJson)
+        self.assertEqual(restored, [1, {'a': 2}])
+        self.assertEqual(copy.copy(value).text, value.text)
+
+    def test_backend(self):
+        self.assertIs(json_loader('json'), json.loads)
+        with pytest.raises(ValueError):
+            json_loader('yaml')
+
+    def test_map_reported_as_java_object(self):
+        columns = [('m', JAVA_OBJECT), ('tags', ARRAY)]
+        conn = JdbcConnection(connection=FakeConnection(query_result(columns, [({'a': 1}, [1]), (None, [])])),
+                              cursor_class=HiveCursor,
+                              type_conversion=HiveTypeConversion(complex_types='lazy'))
+        cursor = conn.cursor()
+        cursor.execute('select * from t')
+        arrays = cursor.fetch_numpy()
+        self.assertIsInstance(arrays['m'][0], LazyJson)
+        self.assertEqual(arrays['m'][0], {'a': 1})
+        self.assertIsNone(arrays['m'][1])
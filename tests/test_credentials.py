@@ -0,0 +1,100 @@
+"""
+Test the kerberos credential cache `hivejdbc.credentials`
+"""
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from pyjdbc.java import Jvm
+
+from hivejdbc import credentials
+from hivejdbc.credentials import KerberosCredential
+from tests.test_startup import CountingConnect
+
+
+class FakeLoginCredential(KerberosCredential):
+    """credential whose kerberos login returns tickets valid for `lifetime` seconds"""
+
+    lifetime = 3600
+
+    def _login(self):
+        now = time.time()
+        return object(), now, now + self.lifetime
+
+
+class TestKerberosCredential(unittest.TestCase):
+
+    def test_login_once(self):
+        credential = FakeLoginCredential('etl@EXAMPLE.COM', 'etl.keytab')
+        try:
+            subject = credential.subject()
+            self.assertIs(credential.subject(), subject)
+            self.assertEqual(credential.logins, 1)
+            self.assertTrue(credential._thread.is_alive())
+        finally:
+            credential.close()
+
+    def test_expired(self):
+        credential = FakeLoginCredential('etl@EXAMPLE.COM', 'etl.keytab')
+        credential.lifetime = -1
+        try:
+            credential.subject()
+            credential.subject()
+            self.assertEqual(credential.logins, 2)
+        finally:
+            credential.close()
+
+    def test_renew_delay(self):
+        credential = KerberosCredential('etl@EXAMPLE.COM', 'etl.keytab')
+        now = time.time()
+        self.assertAlmostEqual(credential._renew_delay(now, now + 1000), 800, delta=5)
+        self.assertEqual(credential._renew_delay(now - 1000, now), credentials.MIN_RENEW_SECONDS)
+        self.assertEqual(credential._renew_delay(None, None), credentials.DEFAULT_RENEW_SECONDS)
+
+    def test_jaas_config_written_once(self):
+        credential = KerberosCredential('etl@EXAMPLE.COM', 'etl.keytab')
+        other = KerberosCredential('etl@EXAMPLE.COM', 'etl.keytab')
+        path = credential.jaas_config()
+        try:
+            with open(path) as fp:
+                self.assertIn('principal="etl@EXAMPLE.COM"', fp.read())
+            self.assertEqual(os.stat(path).st_mode & 0o077, 0)
+            with mock.patch('tempfile.mkstemp') as mkstemp:
+                self.assertEqual(credential.jaas_config(), path)
+            mkstemp.assert_not_called()
+            # each credential writes a file of its own, files at predictable paths are never trusted
+            self.assertNotEqual(other.jaas_config(), path)
+        finally:
+            credential.close()
+            other.close()
+        self.assertFalse(os.path.exists(path))
+
+    def test_shared(self):
+        self.assertIs(credentials.get_credential('etl@EXAMPLE.COM', 'etl.keytab'),
+                      credentials.get_credential('etl@EXAMPLE.COM', os.path.abspath('etl.keytab')))
+
+    def test_configure_jaas_skipped(self):
+        with tempfile.NamedTemporaryFile() as jaas:
+            with mock.patch('pyjdbc.kerberos.configure_jaas', return_value=jaas.name) as configure_jaas:
+                credentials.configure_jaas(use_ticket_cache=True, no_prompt=True)
+                credentials.configure_jaas(no_prompt=True, use_ticket_cache=True)
+                self.assertEqual(configure_jaas.call_count, 1)
+                credentials.configure_jaas(use_ticket_cache=False, no_prompt=True)
+                self.assertEqual(configure_jaas.call_count, 2)
+        Jvm.ARGS.pop('java.security.auth.login.config', None)
+
+    def test_connection_url(self):
+        connect_function = CountingConnect()
+        with tempfile.NamedTemporaryFile() as keytab:
+            args = connect_function.parse_args('example.com', 'default', principal='hive/_HOST@EXAMPLE.COM',
+                                               user_principal='etl@EXAMPLE.COM', user_keytab=keytab.name)
+            self.assertIn(';kerberosAuthType=fromSubject', connect_function.connection_url(args))
+
+            args = connect_function.parse_args('example.com', 'default', principal='hive/_HOST@EXAMPLE.COM',
+                                               user_principal='etl@EXAMPLE.COM', user_keytab=keytab.name,
+                                               kerberos_cache=False)
+            self.assertNotIn('kerberosAuthType', connect_function.connection_url(args))
+        for name in ('javax.security.auth.useSubjectCredsOnly', 'java.security.auth.login.config'):
+            Jvm.ARGS.pop(name, None)
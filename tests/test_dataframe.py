@@ -0,0 +1,78 @@
+"""
+Test the pandas integration `hivejdbc.read_dataframe`
+"""
+import datetime
+import unittest
+import pytest
+
+from pyjdbc.dbapi import JdbcConnection
+
+from hivejdbc import HiveCursor
+from hivejdbc.dataframe import read_dataframe, _datetimes
+from hivejdbc.types import HiveTypeConversion
+from tests.fakes import FakeConnection, query_result, INTEGER, BIGINT, DOUBLE, VARCHAR, BOOLEAN
+
+COLUMNS = [('id', BIGINT), ('age', INTEGER), ('score', DOUBLE), ('name', VARCHAR), ('ok', BOOLEAN)]
+ROWS = [
+    (1, 30, 1.5, 'a', True),
+    (2, None, None, 'b', False),
+    (3, 41, 3.5, None, None),
+]
+
+
+def make_connection(rows=ROWS):
+    return JdbcConnection(connection=FakeConnection(query_result(COLUMNS, rows)),
+                          cursor_class=HiveCursor,
+                          type_conversion=HiveTypeConversion())
+
+
+class TestReadDataFrame(unittest.TestCase):
+
+    def setUp(self):
+        self.pandas = pytest.importorskip('pandas')
+
+    def test_numpy_nullable(self):
+        df = read_dataframe(make_connection(), 'select * from t')
+        self.assertEqual(list(df.columns), ['id', 'age', 'score', 'name', 'ok'])
+        self.assertEqual([str(dtype) for dtype in df.dtypes], ['Int64', 'Int32', 'Float64', 'string', 'boolean'])
+        self.assertEqual(df['id'].tolist(), [1, 2, 3])
+        self.assertTrue(df['age'].isna()[1])
+        self.assertTrue(df['name'].isna()[2])
+
+    def test_numpy(self):
+        df = read_dataframe(make_connection(), 'select * from t', dtype_backend='numpy')
+        self.assertEqual([str(dtype) for dtype in df.dtypes][:3], ['int64', 'float64', 'float64'])
+        self.assertEqual(df['name'].tolist()[:2], ['a', 'b'])
+        self.assertTrue(df['name'].isna()[2])
+        self.assertEqual(df['age'].tolist()[0], 30.0)
+
+    def test_pyarrow(self):
+        pytest.importorskip('pyarrow')
+        df = read_dataframe(make_connection(), 'select * from t', dtype_backend='pyarrow')
+        self.assertEqual([str(dtype) for dtype in df.dtypes],
+                         ['int64[pyarrow]', 'int32[pyarrow]', 'double[pyarrow]', 'string[pyarrow]', 'bool[pyarrow]'])
+        self.assertEqual(df['name'].tolist()[0], 'a')
+
+    def test_chunksize(self):
+        chunks = list(read_dataframe(make_connection(), 'select * from t', chunksize=2))
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 1])
+        self.assertEqual(str(chunks[1]['age'].dtype), 'Int32')
+
+    def test_empty(self):
+        df = read_dataframe(make_connection([]), 'select * from t')
+        self.assertEqual(len(df), 0)
+        self.assertEqual(str(df['id'].dtype), 'Int64')
+        self.assertEqual(list(read_dataframe(make_connection([]), 'select * from t', chunksize=10)), [])
+
+    def test_datetimes(self):
+        timestamps = _datetimes(self.pandas, [datetime.datetime(2020, 1, 2, 3, 4, 5), None], 'TIMESTAMP')
+        self.assertEqual(timestamps.dtype.kind, 'M')
+        dates = _datetimes(self.pandas, ['2020-01-02', None], 'DATE')
+        self.assertEqual(dates[0], self.pandas.Timestamp(2020, 1, 2))
+        self.assertTrue(self.pandas.isna(dates[1]))
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            read_dataframe(make_connection(), 'select * from t', dtype_backend='objects')
+        with self.assertRaises(ValueError):
+            read_dataframe(make_connection(), 'select * from t', chunksize=0)
@@ -0,0 +1,117 @@
+"""
+Test streaming exports `hivejdbc.export`
+"""
+import csv
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import pytest
+
+from pyjdbc.dbapi import JdbcConnection
+
+from hivejdbc import HiveCursor
+from hivejdbc.types import HiveTypeConversion
+from tests.fakes import FakeConnection, query_result, BIGINT, VARCHAR, BOOLEAN, ARRAY, STRUCT, JAVA_OBJECT
+
+COLUMNS = [('id', BIGINT), ('name', VARCHAR), ('ok', BOOLEAN), ('tags', ARRAY), ('attrs', JAVA_OBJECT),
+           ('point', STRUCT)]
+ROWS = [
+    (1, 'a', True, ['x'], {'k': 1}, {'x': 1, 'y': 'z'}),
+    (2, None, None, None, None, None),
+    (3, 'b,"c"', False, [], {}, {'x': 2, 'y': None}),
+]
+
+
+def make_cursor(rows=ROWS):
+    conn = JdbcConnection(connection=FakeConnection(query_result(COLUMNS, rows)),
+                          cursor_class=HiveCursor,
+                          type_conversion=HiveTypeConversion())
+    cursor = conn.cursor()
+    cursor.execute('select * from t')
+    return cursor
+
+
+class TestExport(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def test_csv(self):
+        path = self.path('t.csv')
+        self.assertEqual(make_cursor().export(path, format='csv'), 3)
+        with open(path, newline='') as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows[0], ['id', 'name', 'ok', 'tags', 'attrs', 'point'])
+        self.assertEqual(rows[1][:4], ['1', 'a', 'true', '["x"]'])
+        self.assertEqual(json.loads(rows[1][5]), {'x': 1, 'y': 'z'})
+        self.assertEqual(rows[2], ['2', '', '', '', '', ''])
+        self.assertEqual(rows[3][1:3], ['b,"c"', 'false'])
+        self.assertEqual(os.listdir(self.directory), ['t.csv'])
+
+    def test_jsonl_gzip(self):
+        path = self.path('t.jsonl.gz')
+        self.assertEqual(make_cursor().export(path, format='jsonl', compression='gzip', row_group_rows=1), 3)
+        with gzip.open(path, 'rt') as f:
+            rows = [json.loads(line) for line in f]
+        self.assertEqual(rows[0], {'id': 1, 'name': 'a', 'ok': True, 'tags': ['x'], 'attrs': {'k': 1},
+                                   'point': {'x': 1, 'y': 'z'}})
+        self.assertEqual(rows[1], {'id': 2, 'name': None, 'ok': None, 'tags': None, 'attrs': None, 'point': None})
+        self.assertEqual(rows[2]['name'], 'b,"c"')
+
+    def test_empty(self):
+        path = self.path('t.jsonl')
+        self.assertEqual(make_cursor(rows=[]).export(path, format='jsonl'), 0)
+        self.assertEqual(os.path.getsize(path), 0)
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            make_cursor().export(self.path('t.xml'), format='xml')
+        with pytest.raises(ValueError):
+            make_cursor().export(self.path('t.csv'), format='csv', compression='zip')
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_failure_removes_file(self):
+        cursor = make_cursor()
+
+        def fail(*args, **kwargs):
+            raise RuntimeError('connection lost')
+        cursor._resultset.next = fail
+        with pytest.raises(RuntimeError):
+            cursor.export(self.path('t.csv'), format='csv')
+        self.assertEqual(os.listdir(self.directory), [])
+
+
+class TestExportParquet(unittest.TestCase):
+
+    def setUp(self):
+        pytest.importorskip('pyarrow')
+        self.pq = pytest.importorskip('pyarrow.parquet')
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_nested(self):
+        path = os.path.join(self.directory, 't.parquet')
+        rows = make_cursor().export(path, row_group_rows=2, compression='gzip', schema={'attrs': 'map<string,int>'})
+        self.assertEqual(rows, 3)
+        parquet = self.pq.ParquetFile(path)
+        self.assertEqual(parquet.metadata.num_row_groups, 2)
+        table = parquet.read()
+        self.assertEqual(str(table.schema.field('tags').type), 'list<element: string>')
+        self.assertEqual(str(table.schema.field('point').type), 'struct<x: int64, y: string>')
+        self.assertTrue(str(table.schema.field('attrs').type).startswith('map<string, int32'))
+        self.assertEqual(table.column('id').to_pylist(), [1, 2, 3])
+        self.assertEqual(table.column('tags').to_pylist(), [['x'], None, []])
+        self.assertEqual(table.column('attrs').to_pylist(), [[('k', 1)], None, []])
+        self.assertEqual(table.column('point').to_pylist(), [{'x': 1, 'y': 'z'}, None, {'x': 2, 'y': None}])
+
+    def test_empty(self):
+        path = os.path.join(self.directory, 't.parquet')
+        self.assertEqual(make_cursor(rows=[]).export(path), 0)
+        self.assertEqual(self.pq.read_table(path).column_names, [name for name, _ in COLUMNS])
@@ -0,0 +1,155 @@
+"""
+Test host selection and failover `hivejdbc.failover`
+"""
+import threading
+import time
+import unittest
+from unittest import mock
+
+from pyjdbc.exceptions import Error
+
+from hivejdbc import driver, failover
+from hivejdbc.failover import HostSelector
+from tests.test_startup import CountingConnect
+
+HOSTS = [('hs2-a', 10000), ('hs2-b', 10000), ('hs2-c', 10000)]
+
+
+def fake_probe(delays, down=()):
+    """probe sleeping ``delays[host]`` seconds, failing for hosts in ``down``"""
+    def probe(host, port, timeout):
+        if host in down:
+            raise Error('No Hive server is listening at "{}:{}"'.format(host, port))
+        time.sleep(delays.get(host, 0))
+    return probe
+
+
+class TestHostSelector(unittest.TestCase):
+
+    def test_latency(self):
+        selector = HostSelector(HOSTS, fake_probe({'hs2-a': 0.2, 'hs2-b': 0.0, 'hs2-c': 0.1}))
+        self.assertEqual(selector.select(timeout=1), [HOSTS[1], HOSTS[2], HOSTS[0]])
+
+    def test_round_robin(self):
+        selector = HostSelector(HOSTS, fake_probe({}), strategy='round_robin')
+        first = [selector.select()[0] for _ in range(3)]
+        self.assertEqual(first, HOSTS)
+
+    def test_blacklist(self):
+        down = {'hs2-a'}
+        selector = HostSelector(HOSTS, fake_probe({}, down=down), blacklist_seconds=60)
+        self.assertNotIn(HOSTS[0], selector.select())
+        self.assertTrue(selector.is_blacklisted(HOSTS[0]))
+
+        # blacklisted hosts are not probed again until the blacklist expires
+        down.clear()
+        self.assertNotIn(HOSTS[0], selector.select())
+        selector.blacklist(HOSTS[0], seconds=0)
+        self.assertIn(HOSTS[0], selector.select())
+
+    def test_hung_host(self):
+        release = threading.Event()
+
+        def probe(host, port, timeout):
+            if host == 'hs2-a':
+                release.wait()
+        selector = HostSelector(HOSTS, probe)
+        started = time.monotonic()
+        self.assertEqual(sorted(selector.select(timeout=0.1)), HOSTS[1:])
+        self.assertLess(time.monotonic() - started, 1)
+        release.set()
+
+    def test_unreachable(self):
+        selector = HostSelector(HOSTS, fake_probe({}, down={'hs2-a', 'hs2-b', 'hs2-c'}))
+        with self.assertRaises(Error):
+            selector.select()
+
+
+class FailingConnect(CountingConnect):
+    """connect function failing to open sessions on `down` hosts"""
+
+    down = ()
+
+    def open_connection(self, driver_class, conn_str, args, type_conversion=None):
+        if any('//{}:'.format(host) in conn_str for host in self.down):
+            raise Error('failed to open session: {}'.format(conn_str))
+        return super().open_connection(driver_class, conn_str, args, type_conversion)
+
+
+class TestFailover(unittest.TestCase):
+
+    def setUp(self):
+        failover._SELECTORS.clear()
+
+    def test_failover(self):
+        connect = FailingConnect()
+        connect.down = ('hs2-a',)
+        with mock.patch('hivejdbc.driver.check_server'):
+            connect('hs2-a,hs2-b:10001', 'default', host_selection='round_robin')
+            connect('hs2-a,hs2-b:10001', 'default', host_selection='round_robin')
+
+        self.assertEqual(connect.urls, ['jdbc:hive2://hs2-b:10001/default;transportMode=binary'] * 2)
+        selector = failover.get_selector(failover.parse_hosts('hs2-a,hs2-b:10001', 10000), None, 'round_robin')
+        self.assertTrue(selector.is_blacklisted(('hs2-a', 10000)))
+
+    def test_authentication_error(self):
+        class RefusingConnect(CountingConnect):
+            def open_connection(self, driver_class, conn_str, args, type_conversion=None):
+                self.urls.append(conn_str)
+                raise Error('Could not open client transport: Peer indicated failure: Error validating the login')
+
+        connect = RefusingConnect()
+        with mock.patch('hivejdbc.driver.check_server'):
+            with self.assertRaises(Error):
+                connect('hs2-a,hs2-b', 'default', host_selection='round_robin')
+        self.assertEqual(len(connect.urls), 1)
+        selector = failover.get_selector(failover.parse_hosts('hs2-a,hs2-b', 10000), None, 'round_robin')
+        self.assertFalse(any(selector.is_blacklisted(endpoint) for endpoint in selector.endpoints))
+
+    def test_service_discovery(self):
+        connect = CountingConnect()
+        with mock.patch('hivejdbc.driver.check_server') as check_server:
+            connect('zk-a:2181,zk-b:2181', 'default', service_discovery_mode='zooKeeper', zookeeper_namespace='hs2')
+        check_server.assert_not_called()
+        self.assertEqual(len(connect.urls), 1)
+
+
+class FakeDriverManager:
+    """``java.sql.DriverManager`` login timeout"""
+
+    timeout = 0
+
+    @classmethod
+    def getLoginTimeout(cls):
+        return cls.timeout
+
+    @classmethod
+    def setLoginTimeout(cls, seconds):
+        cls.timeout = seconds
+
+
+class TestLoginTimeout(unittest.TestCase):
+
+    def test_concurrent_connects(self):
+        opened = threading.Barrier(2)
+        first_done = threading.Event()
+        seen = []
+
+        def connect(first):
+            with driver._login_timeout(FakeDriverManager, 30):
+                opened.wait()
+                if first:
+                    first_done.set()
+                else:
+                    first_done.wait()
+                    # the other connect finished, the timeout of this one is still applied
+                    seen.append(FakeDriverManager.timeout)
+
+        threads = [threading.Thread(target=connect, args=(first,)) for first in (True, False)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(seen, [30])
+        # the timeout found by the first connect is restored by the last
+        self.assertEqual(FakeDriverManager.timeout, 0)
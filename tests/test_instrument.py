@@ -0,0 +1,95 @@
+"""
+Test the instrumentation hooks `hivejdbc.instrument`
+"""
+import unittest
+from unittest import mock
+
+import pytest
+
+from hivejdbc import HiveConnection, HiveCursor, ConnectionProfile, instrument
+from hivejdbc.types import HiveTypeConversion
+from tests.fakes import FakeConnection, INTEGER, VARCHAR, query_result
+from tests.test_startup import CountingConnect
+
+COLUMNS = [('id', INTEGER), ('name', VARCHAR)]
+ROWS = [(1, 'a'), (2, 'b'), (3, None)]
+
+
+def observed_connection(*listeners, handler=None):
+    fake = FakeConnection(handler or query_result(COLUMNS, ROWS))
+    return HiveConnection(fake, HiveCursor, type_conversion=HiveTypeConversion(), listeners=listeners)
+
+
+class TestInstrument(unittest.TestCase):
+
+    def test_query_phases(self):
+        stats = instrument.StatsListener()
+        cursor = observed_connection(stats).cursor()
+        cursor.execute('select * from t')
+        self.assertEqual(len(cursor.fetchmany(2)), 2)
+        self.assertEqual(len(cursor.fetchall()), 1)
+
+        result = stats.stats()
+        self.assertEqual((result['executes'], result['errors']), (1, 0))
+        self.assertEqual((result['fetches'], result['rows']), (2, 3))
+        self.assertGreater(result['bytes'], 0)
+        self.assertGreater(result['first_row_seconds'], 0)
+        self.assertEqual(result['conversion']['INTEGER'][0], 3)
+        self.assertEqual(result['conversion']['VARCHAR'][0], 3)
+
+    def test_execute_error(self):
+        def handler(sql, params):
+            raise RuntimeError('failed')
+        stats = instrument.StatsListener()
+        cursor = observed_connection(stats, handler=handler).cursor()
+        with self.assertRaises(Exception):
+            cursor.execute('select * from t')
+        self.assertEqual((stats.executes, stats.errors), (1, 1))
+
+    def test_stream(self):
+        stats = instrument.StatsListener()
+        cursor = observed_connection(stats).cursor()
+        cursor.execute('select * from t')
+        with cursor.stream(batch_rows=2) as stream:
+            self.assertEqual([len(batch) for batch in stream], [2, 1])
+        self.assertEqual((stats.fetches, stats.rows), (2, 3))
+
+    def test_global_listener(self):
+        stats = instrument.StatsListener()
+        instrument.add_listener(stats)
+        try:
+            cursor = observed_connection().cursor()
+            cursor.execute('select * from t')
+            cursor.fetchall()
+        finally:
+            instrument.remove_listener(stats)
+        cursor.execute('select * from t')
+        self.assertEqual(stats.executes, 1)
+        self.assertEqual(instrument.listeners(), ())
+
+    def test_failing_listener(self):
+        class Broken(instrument.Listener):
+            def on_execute(self, cursor, operation, seconds, error=None):
+                raise ValueError('broken')
+        cursor = observed_connection(Broken()).cursor()
+        cursor.execute('select * from t')
+        self.assertEqual(len(cursor.fetchall()), 3)
+
+    def test_connect_timings(self):
+        stats = instrument.StatsListener()
+        profile = ConnectionProfile('example.com', 'default', listeners=[stats], connect_function=CountingConnect())
+        with mock.patch('hivejdbc.driver.check_server'):
+            profile.connect()
+            profile._connect_function('example.com', 'default', listeners=[stats])
+        self.assertEqual(stats.connects, 2)
+        self.assertEqual(set(stats.connect_seconds), {'parse', 'driver', 'probe', 'open', 'total'})
+
+    def test_prometheus(self):
+        prometheus = pytest.importorskip('prometheus_client')
+        registry = prometheus.CollectorRegistry()
+        cursor = observed_connection(instrument.PrometheusListener(registry=registry)).cursor()
+        cursor.execute('select * from t')
+        cursor.fetchall()
+        self.assertEqual(registry.get_sample_value('hivejdbc_execute_seconds_count'), 1)
+        self.assertEqual(registry.get_sample_value('hivejdbc_rows_total'), 3)
+        self.assertEqual(registry.get_sample_value('hivejdbc_conversion_values_total', {'type': 'INTEGER'}), 3)
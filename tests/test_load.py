@@ -0,0 +1,143 @@
+"""
+Test bulk loading through staged files `hivejdbc.bulk_load`
+"""
+import collections
+import datetime
+import io
+import os
+import tempfile
+import unittest
+from decimal import Decimal
+from unittest import mock
+
+import pytest
+
+from pyjdbc.dbapi import JdbcConnection
+from pyjdbc.exceptions import NotSupportedError
+
+from hivejdbc import HiveCursor, load
+from hivejdbc.load import bulk_load
+from hivejdbc.types import HiveTypeConversion
+from tests.fakes import FakeConnection
+
+Point = collections.namedtuple('Point', 'x y')
+
+COLUMNS = ['id', 'name', 'first', 'balance']
+ROWS = [
+    (1, 'Bob, Jr.', datetime.date(2020, 1, 2), 200.5),
+    (2, 'Alice\nSmith', None, None),
+    (3, None, datetime.date(2021, 3, 4), 7),
+]
+
+
+def make_connection():
+    return JdbcConnection(connection=FakeConnection(), cursor_class=HiveCursor,
+                          type_conversion=HiveTypeConversion())
+
+
+class TestHiveTypes(unittest.TestCase):
+
+    def test_column_type(self):
+        conversion = HiveTypeConversion()
+        self.assertEqual(conversion.column_type([1, None, 2.5]), 'DOUBLE')
+        self.assertEqual(conversion.column_type([None]), 'STRING')
+        self.assertEqual(conversion.column_type([[], [1], None]), 'ARRAY<BIGINT>')
+        self.assertEqual(conversion.column_type([{'a': 1.5}, {'b': None}]), 'MAP<STRING,DOUBLE>')
+        self.assertEqual(conversion.column_type([Point(1, 'a')]), 'STRUCT<x:BIGINT,y:STRING>')
+        self.assertEqual(conversion.column_type([Decimal('1.5')]), 'DECIMAL(38,18)')
+        with self.assertRaises(ValueError):
+            conversion.column_type([1, 'a'])
+
+    def test_arrow_type(self):
+        pyarrow = pytest.importorskip('pyarrow')
+        self.assertEqual(load.arrow_type('MAP<STRING,ARRAY<INT>>'),
+                         pyarrow.map_(pyarrow.string(), pyarrow.list_(pyarrow.int32())))
+        self.assertEqual(load.arrow_type('struct<x:bigint,y:decimal(10,2)>'),
+                         pyarrow.struct([('x', pyarrow.int64()), ('y', pyarrow.decimal128(10, 2))]))
+
+
+class TestBulkLoad(unittest.TestCase):
+
+    def setUp(self):
+        self.staging_dir = tempfile.mkdtemp()
+        self.staged = {}
+        remove = load._Stage.remove
+
+        def capture(stage):
+            # keep the content of the staged files before the directory is removed
+            for name in sorted(os.listdir(stage.path)):
+                with open(os.path.join(stage.path, name), 'rb') as fp:
+                    self.staged[name] = fp.read()
+            remove(stage)
+
+        patcher = mock.patch.object(load._Stage, 'remove', capture)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        os.rmdir(self.staging_dir)
+
+    def test_load_csv(self):
+        conn = make_connection()
+        count = bulk_load(conn, 'test.persons', ROWS, format='csv', columns=COLUMNS, staging_dir=self.staging_dir,
+                          create=True, mode='overwrite')
+        self.assertEqual(count, 3)
+
+        create, load_data = conn._connection.executed
+        self.assertTrue(create.startswith('CREATE TABLE IF NOT EXISTS test.persons (`id` BIGINT, `name` STRING, '
+                                          '`first` DATE, `balance` DOUBLE) ROW FORMAT DELIMITED'))
+        self.assertRegex(load_data, r"^LOAD DATA INPATH 'file://.*/hivejdbc-load-\w+' OVERWRITE INTO TABLE "
+                                    r"test.persons$")
+        self.assertEqual(self.staged['part-00000.csv'].decode('utf8'),
+                         '1,Bob\\, Jr.,2020-01-02,200.5\n'
+                         '2,Alice\\nSmith,\\N,\\N\n'
+                         '3,\\N,2021-03-04,7\n')
+
+    def test_insert_parquet(self):
+        pq = pytest.importorskip('pyarrow.parquet')
+        conn = make_connection()
+        bulk_load(conn, 'persons', ROWS, format='parquet', columns=COLUMNS, staging_dir=self.staging_dir,
+                  method='insert', staging_location='hdfs:///tmp/staging', rows_per_file=2, workers=2)
+
+        create, insert, drop = conn._connection.executed
+        staging_table = create.split()[3]
+        self.assertTrue(staging_table.startswith('persons_staging_'))
+        self.assertRegex(create, r"STORED AS PARQUET LOCATION 'hdfs:///tmp/staging/hivejdbc-load-\w+'$")
+        self.assertEqual(insert, 'INSERT INTO TABLE persons SELECT `id`, `name`, `first`, `balance` FROM {}'.format(
+            staging_table))
+        self.assertEqual(drop, 'DROP TABLE IF EXISTS {}'.format(staging_table))
+
+        self.assertEqual(sorted(self.staged), ['part-00000.parquet', 'part-00001.parquet'])
+        table = pq.read_table(io.BytesIO(self.staged['part-00001.parquet']))
+        self.assertEqual(table.to_pydict(), {'id': [3], 'name': [None], 'first': [datetime.date(2021, 3, 4)],
+                                             'balance': [7.0]})
+
+    def test_orc_complex_and_schema(self):
+        orc = pytest.importorskip('pyarrow.orc')
+        conn = make_connection()
+        rows = [{'id': 1, 'tags': ['a'], 'point': Point(1, 'b')}, {'id': 2, 'tags': None, 'point': None}]
+        bulk_load(conn, 'points', rows, staging_dir=self.staging_dir, schema={'id': 'INT'})
+
+        table = orc.ORCFile(io.BytesIO(self.staged['part-00000.orc'])).read()
+        self.assertEqual(str(table.schema.field('id').type), 'int32')
+        self.assertEqual(table.column('tags').to_pylist(), [['a'], None])
+        self.assertEqual(table.column('point').to_pylist(), [{'x': 1, 'y': 'b'}, None])
+
+    def test_dataframe(self):
+        pandas = pytest.importorskip('pandas')
+        conn = make_connection()
+        frame = pandas.DataFrame({'id': pandas.array([1, None], dtype='Int64'), 'score': [1.5, float('nan')]})
+        bulk_load(conn, 'scores', frame, format='csv', staging_dir=self.staging_dir, create=True)
+        self.assertIn('(`id` BIGINT, `score` DOUBLE)', conn._connection.executed[0])
+        self.assertEqual(self.staged['part-00000.csv'], b'1,1.5\n\\N,\\N\n')
+
+    def test_invalid(self):
+        conn = make_connection()
+        with self.assertRaises(ValueError):
+            bulk_load(conn, 'persons', ROWS, staging_dir=self.staging_dir)
+        with self.assertRaises(ValueError):
+            bulk_load(conn, 'persons; drop table x', ROWS, columns=COLUMNS, staging_dir=self.staging_dir)
+        with self.assertRaises(NotSupportedError):
+            bulk_load(conn, 'tags', [(['a'],)], format='csv', columns=['tags'], staging_dir=self.staging_dir)
+        self.assertEqual(bulk_load(conn, 'persons', [], columns=COLUMNS, staging_dir=self.staging_dir), 0)
+        self.assertEqual(conn._connection.executed, [])
@@ -0,0 +1,123 @@
+"""
+Test the metadata caches `hivejdbc.metadata`
+"""
+import unittest
+from unittest import mock
+
+from hivejdbc import HiveConnection, HiveCursor, DictCursor
+from hivejdbc.metadata import CatalogCache, ColumnInfo, MetadataCache
+from hivejdbc.types import HiveTypeConversion
+from tests.fakes import FakeConnection, BIGINT, DOUBLE, VARCHAR
+
+COLUMNS = [('t.id', BIGINT), ('t.score', DOUBLE), ('t.name', VARCHAR)]
+ROWS = [(1, None, 'a'), (2, 2.5, None)]
+
+DESCRIBE = [('col_name', VARCHAR), ('data_type', VARCHAR), ('comment', VARCHAR)]
+
+
+def handler(sql, params):
+    if sql.lower().startswith(('select', 'describe', 'show', 'getcolumns')):
+        return (DESCRIBE, [('id', 'bigint', '')]) if not sql.lower().startswith('select') else (COLUMNS, ROWS)
+    return 0
+
+
+def make_connection(cursor_class=HiveCursor, **kwargs):
+    return HiveConnection(FakeConnection(handler), cursor_class, type_conversion=HiveTypeConversion(),
+                          database='default', **kwargs)
+
+
+def run(conn, sql):
+    cursor = conn.cursor()
+    cursor.execute(sql)
+    return cursor.description, cursor.fetchall()
+
+
+class TestMetadataCache(unittest.TestCase):
+
+    def test_disabled_by_default(self):
+        conn = make_connection()
+        self.assertIsNone(conn.metadata_cache)
+        with mock.patch.object(ColumnInfo, 'read', wraps=ColumnInfo.read) as read:
+            run(conn, 'select * from t')
+            run(conn, 'select * from t')
+        self.assertEqual(read.call_count, 2)
+
+    def test_descriptors_cached(self):
+        conn = make_connection(metadata_cache=MetadataCache())
+        with mock.patch.object(ColumnInfo, 'read', wraps=ColumnInfo.read) as read:
+            description, rows = run(conn, 'select * from t')
+            self.assertEqual(run(conn, 'SELECT *  FROM t'), (description, rows))
+        self.assertEqual(read.call_count, 1)
+        self.assertEqual(conn.metadata_cache.stats()['hits'], 1)
+        self.assertEqual([column[0] for column in description], ['t.id', 't.score', 't.name'])
+        # values following a null are read correctly
+        self.assertEqual(rows, [('1', None, 'a'), ('2', 2.5, None)])
+
+    def test_changed_types(self):
+        columns = list(COLUMNS)
+        conn = HiveConnection(FakeConnection(lambda sql, params: (columns, ROWS)), HiveCursor,
+                              type_conversion=HiveTypeConversion(), metadata_cache=MetadataCache())
+        run(conn, 'select * from t')
+        # another client changed the type of a column, the column count is the same
+        columns[1] = ('t.score', VARCHAR)
+        description, rows = run(conn, 'select * from t')
+        self.assertIn('JDBC:VARCHAR', description[1][1])
+        self.assertEqual(rows, [('1', None, 'a'), ('2', '2.5', None)])
+
+    def test_invalidated_by_writes(self):
+        conn = make_connection(metadata_cache=MetadataCache())
+        with mock.patch.object(ColumnInfo, 'read', wraps=ColumnInfo.read) as read:
+            run(conn, 'select * from t')
+            conn.cursor().execute('ALTER TABLE t ADD COLUMNS (extra string)')
+            run(conn, 'select * from t')
+            # another database is another query
+            conn.cursor().execute('use other')
+            run(conn, 'select * from t')
+        self.assertEqual(read.call_count, 3)
+
+    def test_dict_cursor(self):
+        conn = make_connection(DictCursor)
+        cursor = conn.cursor()
+        cursor.execute('select * from t')
+        self.assertEqual(cursor.fetchone(), {'id': '1', 'score': None, 'name': 'a'})
+
+    def test_readers_resolved_per_type(self):
+        conn = make_connection(metadata_cache=MetadataCache())
+        run(conn, 'select * from t')
+        factories = dict(conn._type_conversion._reader_factories)
+        run(conn, 'select * from t')
+        self.assertEqual(conn._type_conversion._reader_factories, factories)
+        self.assertEqual(len(factories), 3)
+
+
+class TestCatalogCache(unittest.TestCase):
+
+    def test_describe_cached(self):
+        conn = make_connection(catalog_cache=CatalogCache())
+        self.assertEqual(run(conn, 'DESCRIBE t')[1], [('id', 'bigint', '')])
+        run(conn, 'describe  t')
+        run(conn, 'SHOW TABLES')
+        run(conn, 'show tables')
+        self.assertEqual(conn._connection.executed, ['DESCRIBE t', 'SHOW TABLES'])
+
+        # writes invalidate the description of the table and the table list of its database
+        conn.cursor().execute('INSERT INTO t VALUES (1)')
+        run(conn, 'DESCRIBE t')
+        run(conn, 'SHOW TABLES')
+        self.assertEqual(conn._connection.executed[-2:], ['DESCRIBE t', 'SHOW TABLES'])
+
+    def test_queries_not_cached(self):
+        conn = make_connection(catalog_cache=CatalogCache())
+        run(conn, 'select * from t')
+        run(conn, 'select * from t')
+        self.assertEqual(len(conn._connection.executed), 2)
+
+    def test_columns(self):
+        conn = make_connection(catalog_cache=CatalogCache())
+        cursor = conn.cursor()
+        self.assertEqual(cursor.columns('t').fetchall(), [('id', 'bigint', '')])
+        self.assertEqual(cursor.columns('default.t').fetchall(), [('id', 'bigint', '')])
+        self.assertEqual(conn._connection.executed, ['getColumns default.t'])
+        conn.cursor().execute('DROP TABLE t')
+        cursor.columns('t').fetchall()
+        self.assertEqual(conn._connection.executed[-1], 'getColumns default.t')
@@ -0,0 +1,94 @@
+"""
+Test server reachability checks `hivejdbc.network`
+"""
+import os
+import socket
+import time
+import unittest
+from unittest import mock
+
+from pyjdbc.exceptions import Error
+
+from hivejdbc import network
+
+
+def listening_socket():
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(('127.0.0.1', 0))
+    server.listen(1)
+    return server
+
+
+class TestNetwork(unittest.TestCase):
+
+    def setUp(self):
+        network.clear_dns_cache()
+
+    def test_resolve_cached(self):
+        result = [(socket.AF_INET6, socket.SOCK_STREAM, 6, '', ('::1', 10000, 0, 0)),
+                  (socket.AF_INET6, socket.SOCK_STREAM, 6, '', ('::2', 10000, 0, 0)),
+                  (socket.AF_INET, socket.SOCK_STREAM, 6, '', ('10.0.0.1', 10000))]
+        with mock.patch('socket.getaddrinfo', return_value=result) as getaddrinfo:
+            addresses = network.resolve('hs2.example.com', 10000)
+            self.assertEqual(network.resolve('hs2.example.com', 10000), addresses)
+            self.assertEqual(getaddrinfo.call_count, 1)
+
+            # address families alternate
+            self.assertEqual([family for family, _ in addresses], [socket.AF_INET6, socket.AF_INET, socket.AF_INET6])
+
+            # addresses cached with a ttl of 0 are resolved again
+            network.resolve('other.example.com', 10000, ttl=0)
+            network.resolve('other.example.com', 10000, ttl=0)
+            self.assertEqual(getaddrinfo.call_count, 3)
+
+    def test_check_server(self):
+        server = listening_socket()
+        try:
+            network.check_server('127.0.0.1', server.getsockname()[1], timeout=5)
+        finally:
+            server.close()
+
+    def test_high_file_descriptors(self):
+        # a jvm with many jars open uses file descriptors above the limit of select()
+        try:
+            import resource
+        except ImportError:
+            self.skipTest('posix only')
+        if resource.getrlimit(resource.RLIMIT_NOFILE)[0] < 1100:
+            self.skipTest('file descriptor limit too low')
+        server = listening_socket()
+        held = []
+        try:
+            while not held or held[-1] < 1030:
+                held.append(os.dup(server.fileno()))
+            network.check_server('127.0.0.1', server.getsockname()[1], timeout=5)
+        finally:
+            for descriptor in held:
+                os.close(descriptor)
+            server.close()
+
+    def test_not_listening(self):
+        server = listening_socket()
+        port = server.getsockname()[1]
+        server.close()
+        with self.assertRaises(Error):
+            network.check_server('127.0.0.1', port, timeout=5)
+
+    def test_unresolvable(self):
+        with mock.patch('socket.getaddrinfo', side_effect=socket.gaierror('Name or service not known')):
+            with self.assertRaises(Error):
+                network.check_server('missing.example.com', 10000)
+
+    def test_next_address_attempted(self):
+        server = listening_socket()
+        closed = listening_socket()
+        closed_address = closed.getsockname()
+        closed.close()
+        try:
+            addresses = [(socket.AF_INET, closed_address), (socket.AF_INET, server.getsockname())]
+            started = time.monotonic()
+            self.assertEqual(network._connect_any(addresses, timeout=5, delay=1), server.getsockname())
+            # the refused attempt starts the next one without waiting for the delay
+            self.assertLess(time.monotonic() - started, 1)
+        finally:
+            server.close()
@@ -0,0 +1,77 @@
+"""
+Test asynchronous queries `hivejdbc.operation`
+"""
+import unittest
+
+from pyjdbc.exceptions import OperationalError
+
+from hivejdbc import HiveConnection, HiveCursor, DictCursor
+from hivejdbc.operation import QueryHandle, RUNNING, FINISHED, CANCELLED
+from hivejdbc.types import HiveTypeConversion
+from tests.fakes import FakeConnection, INTEGER, VARCHAR
+
+COLUMNS = [('id', INTEGER), ('name', VARCHAR)]
+ROWS = [(1, 'a'), (2, 'b')]
+
+
+def running_connection(cursor_class=HiveCursor):
+    def handler(sql, params):
+        return (COLUMNS, ROWS) if sql.lower().lstrip().startswith('select') else 0
+    fake = FakeConnection(handler)
+    fake.finished.clear()
+    return fake, HiveConnection(fake, cursor_class, type_conversion=HiveTypeConversion(), database='default')
+
+
+class TestExecuteAsync(unittest.TestCase):
+
+    def test_result(self):
+        fake, conn = running_connection()
+        cursor = conn.cursor()
+        query = cursor.execute_async('select * from t where name = %s', ['a'])
+        self.assertIsInstance(query, QueryHandle)
+        self.assertEqual(fake.executed, ["select * from t where name = 'a'"])
+        self.assertFalse(query.poll())
+        self.assertEqual(query.state, RUNNING)
+        with self.assertRaises(OperationalError):
+            query.result(timeout=0.05)
+
+        fake.finished.set()
+        self.assertIs(query.result(timeout=5), cursor)
+        self.assertEqual(query.state, FINISHED)
+        self.assertEqual(query.progress(), 1.0)
+        self.assertEqual(cursor.fetchall(), [('1', 'a'), ('2', 'b')])
+
+    def test_logs_and_progress(self):
+        fake, conn = running_connection()
+        query = conn.cursor().execute_async('select * from t')
+        self.assertIsNone(query.progress())
+        fake.query_log.extend(['INFO  : Compiling command', 'INFO  : Map 1: 1(+1)/4\tReducer 2: 0/1'])
+        self.assertEqual(query.progress(), 0.2)
+        self.assertEqual(query.logs(), ['INFO  : Compiling command', 'INFO  : Map 1: 1(+1)/4\tReducer 2: 0/1'])
+        self.assertEqual(query.logs(), [])
+        fake.finished.set()
+
+    def test_cancel(self):
+        fake, conn = running_connection()
+        query = conn.cursor().execute_async('select * from t')
+        self.assertTrue(query.cancel())
+        self.assertEqual(query.state, CANCELLED)
+        with self.assertRaises(OperationalError):
+            query.result(timeout=5)
+        self.assertTrue(fake.statements[0].cancelled.is_set())
+        self.assertFalse(query.cancel())
+
+    def test_many_queries(self):
+        fake, conn = running_connection(cursor_class=DictCursor)
+        cursor = conn.cursor()
+        queries = [cursor.execute_async('select * from t{}'.format(idx)) for idx in range(3)]
+        fake.finished.set()
+        for query in queries:
+            self.assertEqual(query.result(timeout=5).fetchone(), {'id': '1', 'name': 'a'})
+        self.assertEqual(len(fake.executed), 3)
+
+    def test_session_tracking(self):
+        fake, conn = running_connection()
+        fake.finished.set()
+        conn.cursor().execute_async('use other').result(timeout=5)
+        self.assertEqual(conn.database, 'other')
@@ -0,0 +1,71 @@
+"""
+Test `hivejdbc.parallel`
+"""
+import re
+import unittest
+
+import pytest
+
+from hivejdbc import HiveCursor, HiveConnection
+from hivejdbc.parallel import partitions, read_table
+from hivejdbc.pool import ConnectionPool
+from hivejdbc.types import HiveTypeConversion
+from tests.fakes import FakeConnection, INTEGER, VARCHAR
+
+COLUMNS = [('id', INTEGER), ('region', VARCHAR)]
+REGIONS = ['eu', 'us', 'apac']
+ROWS = [(i, REGIONS[i % 3]) for i in range(30)]
+
+
+def handler(sql, params):
+    if sql.startswith('SHOW PARTITIONS'):
+        return [('partition', VARCHAR)], [('region={}'.format(region),) for region in REGIONS]
+    match = re.search(r"`region` = '(\w+)'", sql)
+    rows = [row for row in ROWS if match is None or row[1] == match.group(1)]
+    limit = re.search(r'LIMIT (\d+)', sql)
+    return COLUMNS, rows[:int(limit.group(1))] if limit else rows
+
+
+def connection_pool(workers=3):
+    def opener(*args, **kwargs):
+        return HiveConnection(FakeConnection(handler), HiveCursor, type_conversion=HiveTypeConversion())
+    return ConnectionPool('example.com', 'default', max_size=workers, connect_function=opener)
+
+
+class TestReadTable(unittest.TestCase):
+
+    def test_arrow(self):
+        pytest.importorskip('pyarrow')
+        table = read_table(connection_pool(), 'sales')
+        self.assertEqual(table.num_rows, 30)
+        # partitions are returned in SHOW PARTITIONS order
+        self.assertEqual(table.column('region').to_pylist()[:10], ['eu'] * 10)
+
+    def test_arrow_filter_and_limit(self):
+        pytest.importorskip('pyarrow')
+        table = read_table(connection_pool(), 'sales', partition_filter=lambda spec: spec['region'] != 'eu',
+                           limit=12)
+        self.assertEqual(table.num_rows, 12)
+        self.assertEqual(table.column('region').to_pylist(), ['us'] * 10 + ['apac'] * 2)
+
+    def test_stream(self):
+        batches = list(read_table(connection_pool(), 'sales', output='stream', batch_rows=4))
+        self.assertTrue(all(len(batch) <= 4 for batch in batches))
+        self.assertEqual(sorted(int(row[0]) for batch in batches for row in batch), list(range(30)))
+
+    def test_stream_limit(self):
+        batches = list(read_table(connection_pool(), 'sales', output='stream', batch_rows=4, limit=5))
+        self.assertEqual(sum(len(batch) for batch in batches), 5)
+
+    def test_invalid_output(self):
+        with self.assertRaises(ValueError):
+            read_table(connection_pool(), 'sales', output='csv')
+
+
+class TestPartitions(unittest.TestCase):
+
+    def test_filter_quoted(self):
+        fake = FakeConnection(handler)
+        cursor = HiveConnection(fake, HiveCursor, type_conversion=HiveTypeConversion()).cursor()
+        self.assertEqual(len(partitions(cursor, 'sales', {'re`gion': 'eu'})), 3)
+        self.assertEqual(fake.executed, ["SHOW PARTITIONS sales PARTITION (`re``gion` = 'eu')"])
@@ -0,0 +1,130 @@
+"""
+Test `hivejdbc.pool`
+"""
+import unittest
+from unittest import mock
+
+import pytest
+
+from pyjdbc.dbapi import JdbcConnection
+from pyjdbc.exceptions import OperationalError
+
+from hivejdbc import HiveCursor, failover
+from hivejdbc.pool import ConnectionPool, get_pool, pool_key
+from hivejdbc.types import HiveTypeConversion
+from tests.fakes import FakeConnection
+from tests.test_startup import CountingConnect
+
+DOMAIN = 'example.com'
+DB = 'example'
+
+
+class Opener:
+    """connect function producing connections backed by fakes"""
+
+    def __init__(self):
+        self.opened = []
+        self.kwargs = []
+
+    def __call__(self, *args, **kwargs):
+        self.kwargs.append(dict(kwargs))
+        conn = JdbcConnection(connection=FakeConnection(),
+                              cursor_class=HiveCursor,
+                              type_conversion=HiveTypeConversion())
+        self.opened.append(conn)
+        return conn
+
+
+class TestConnectionPool(unittest.TestCase):
+
+    def test_reuse(self):
+        opener = Opener()
+        pool = ConnectionPool(DOMAIN, DB, connect_function=opener)
+        with pool.connection() as conn:
+            first = conn.connection
+        with pool.connection() as conn:
+            self.assertIs(conn.connection, first)
+        self.assertEqual(len(opener.opened), 1)
+        self.assertEqual(pool.idle, 1)
+
+    def test_min_size(self):
+        opener = Opener()
+        pool = ConnectionPool(DOMAIN, DB, min_size=2, connect_function=opener)
+        self.assertEqual(len(opener.opened), 2)
+        self.assertEqual(pool.size, 2)
+
+    def test_max_size(self):
+        pool = ConnectionPool(DOMAIN, DB, max_size=1, connect_function=Opener())
+        conn = pool.acquire()
+        with pytest.raises(OperationalError):
+            pool.acquire(timeout=0.01)
+        conn.close()
+        pool.acquire(timeout=0.01).close()
+
+    def test_skip_probe(self):
+        opener = Opener()
+        with mock.patch('hivejdbc.connect', opener):
+            pool = ConnectionPool(DOMAIN, DB, max_size=2)
+            first = pool.acquire()
+            second = pool.acquire()
+        # once the server accepted a connection, further connections skip the reachability check
+        self.assertEqual(opener.kwargs, [{}, {'probe': False}])
+        self.assertEqual(pool.size, 2)
+        first.close()
+        second.close()
+
+    def test_host_list_spread(self):
+        failover._SELECTORS.clear()
+        connect = CountingConnect()
+        with mock.patch('hivejdbc.connect', connect), mock.patch('hivejdbc.driver.check_server') as check_server:
+            pool = ConnectionPool('hs2-a,hs2-b', DB, max_size=4, host_selection='round_robin')
+            borrowed = [pool.acquire() for _ in range(4)]
+        # connections opened without the reachability check still rotate between the hosts
+        self.assertEqual(check_server.call_count, 2)
+        hosts = [url.split('//')[1].split(':')[0] for url in connect.urls]
+        self.assertEqual(hosts, ['hs2-a', 'hs2-b', 'hs2-a', 'hs2-b'])
+        for conn in borrowed:
+            conn.close()
+
+    def test_failed_connect(self):
+        def refuse(*args, **kwargs):
+            raise OperationalError('connection refused')
+        pool = ConnectionPool(DOMAIN, DB, max_size=1, connect_function=refuse)
+        with pytest.raises(OperationalError):
+            pool.acquire()
+        self.assertEqual(pool.size, 0)
+
+    def test_validate_on_borrow(self):
+        opener = Opener()
+        pool = ConnectionPool(DOMAIN, DB, connect_function=opener)
+        pool.acquire().close()
+        opener.opened[0].jdbc_connection().valid = False
+        with pool.connection() as conn:
+            self.assertIs(conn.connection, opener.opened[1])
+        self.assertTrue(opener.opened[0].is_closed())
+        self.assertEqual(pool.size, 1)
+
+    def test_idle_timeout(self):
+        opener = Opener()
+        pool = ConnectionPool(DOMAIN, DB, idle_timeout=0, connect_function=opener)
+        pool.acquire().close()
+        pool.acquire().close()
+        self.assertEqual(len(opener.opened), 2)
+        self.assertTrue(opener.opened[0].is_closed())
+
+    def test_close(self):
+        opener = Opener()
+        pool = ConnectionPool(DOMAIN, DB, connect_function=opener)
+        pool.acquire().close()
+        pool.close()
+        self.assertTrue(opener.opened[0].is_closed())
+
+
+class TestPoolKey(unittest.TestCase):
+
+    def test_equivalent_arguments(self):
+        self.assertEqual(pool_key(DOMAIN, DB), pool_key(host=DOMAIN, database=DB, port=10000))
+        self.assertNotEqual(pool_key(DOMAIN, DB), pool_key(DOMAIN, DB, port=10001))
+
+    def test_get_pool(self):
+        self.assertIs(get_pool(DOMAIN, DB), get_pool(host=DOMAIN, database=DB))
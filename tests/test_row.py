@@ -0,0 +1,61 @@
+"""
+Test the compact rows of `hivejdbc.DictCursor`
+"""
+import pickle
+import sys
+import unittest
+
+from hivejdbc import HiveConnection, DictCursor
+from hivejdbc.row import Row, row_class
+from hivejdbc.types import HiveTypeConversion
+from tests.fakes import FakeConnection, INTEGER, VARCHAR
+
+COLUMNS = [('t.id', INTEGER), ('t.name', VARCHAR), ('t.keys', VARCHAR)]
+ROWS = [(1, 'a', 'x'), (2, None, 'y')]
+
+
+class TestRow(unittest.TestCase):
+
+    def test_access(self):
+        row = row_class(['id', 'name', 'keys'])(('1', 'a', 'x'))
+        self.assertEqual((row['name'], row[1], row.name, row[-1]), ('a', 'a', 'a', 'x'))
+        self.assertEqual(row['keys'], 'x')
+        self.assertEqual(row.keys(), ('id', 'name', 'keys'))
+        self.assertEqual(row.get('missing', 0), 0)
+        with self.assertRaises(KeyError):
+            row['missing']
+        with self.assertRaises(AttributeError):
+            row.missing
+
+    def test_conversion(self):
+        row = row_class(['id', 'name'])(('1', None))
+        self.assertEqual(row.asdict(), {'id': '1', 'name': None})
+        self.assertEqual(dict(row), {'id': '1', 'name': None})
+        self.assertEqual(row, {'id': '1', 'name': None})
+        self.assertEqual(row, ('1', None))
+        self.assertEqual(repr(row), "Row(id='1', name=None)")
+        self.assertEqual(pickle.loads(pickle.dumps(row)).name, None)
+
+    def test_compact(self):
+        Pair = row_class(['id', 'name'])
+        self.assertIs(Pair, row_class(('id', 'name')))
+        row = Pair(('1', 'a'))
+        self.assertIsInstance(row, Row)
+        self.assertEqual(sys.getsizeof(row), sys.getsizeof(('1', 'a')))
+
+
+class TestDictCursor(unittest.TestCase):
+
+    def test_fetch(self):
+        conn = HiveConnection(FakeConnection(lambda sql, params: (COLUMNS, ROWS)), DictCursor,
+                              type_conversion=HiveTypeConversion())
+        cursor = conn.cursor()
+        cursor.execute('select * from t')
+        first, second = cursor.fetchall()
+        self.assertEqual(first, {'id': '1', 'name': 'a', 'keys': 'x'})
+        self.assertIs(type(first), type(second))
+        self.assertEqual((second.id, second['name'], second[2]), ('2', None, 'y'))
+
+        # results with the same columns share the row class
+        cursor.execute('select * from t')
+        self.assertIs(type(cursor.fetchone()), type(first))
@@ -0,0 +1,183 @@
+"""
+Test script execution `hivejdbc.script`
+"""
+import threading
+import time
+import unittest
+
+import pytest
+
+from hivejdbc import HiveCursor, HiveConnection, sql
+from hivejdbc.pool import ConnectionPool
+from hivejdbc.script import plan, SESSION, _Session, _Sessions
+from hivejdbc.types import HiveTypeConversion
+from tests.fakes import FakeConnection, INTEGER
+
+SCRIPT = """
+-- nightly load; runs after the staging tables were loaded
+SET hive.exec.dynamic.partition.mode=nonstrict;
+USE sales;
+INSERT OVERWRITE TABLE daily SELECT * FROM staging.orders;
+INSERT OVERWRITE TABLE returns SELECT * FROM staging.returns WHERE reason <> ';';
+INSERT OVERWRITE TABLE summary SELECT * FROM daily JOIN returns r ON daily.id = r.id;
+SELECT count(*) FROM staging.orders;
+"""
+
+
+class Recorder:
+    """handler recording the statements of each connection and the number of statements running at once"""
+
+    def __init__(self, delay=0.05, fail=None):
+        self.delay = delay
+        self.fail = fail
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+        self.executed = []
+
+    def connection(self, *args, **kwargs):
+        fake = FakeConnection()
+        fake.handler = lambda text, params: self.handle(fake, text)
+        return HiveConnection(fake, HiveCursor, type_conversion=HiveTypeConversion(), database='default')
+
+    def handle(self, fake, text):
+        if self.fail and self.fail in text:
+            raise RuntimeError('statement failed: ' + text)
+        with self.lock:
+            self.executed.append((fake, text))
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        try:
+            if text.startswith(('INSERT', 'SELECT')):
+                time.sleep(self.delay)
+            if text.startswith('SELECT'):
+                return [('c', INTEGER)], [(1,)]
+            return 0
+        finally:
+            with self.lock:
+                self.running -= 1
+
+    def statements(self, fake):
+        return [text for connection, text in self.executed if connection is fake]
+
+
+class TestSplit(unittest.TestCase):
+
+    def test_split(self):
+        statements = sql.split_statements(SCRIPT)
+        self.assertEqual(len(statements), 6)
+        self.assertTrue(statements[0].startswith('-- nightly load; runs'))
+        self.assertEqual(statements[3], "INSERT OVERWRITE TABLE returns SELECT * FROM staging.returns "
+                                        "WHERE reason <> ';'")
+        self.assertEqual(sql.split_statements('/* only a comment; */ ;\n-- and another\n'), [])
+
+
+class TestPlan(unittest.TestCase):
+
+    def test_dependencies(self):
+        statements = plan(SCRIPT, database='default')
+        self.assertEqual([statement.kind for statement in statements], [SESSION, SESSION] + ['statement'] * 4)
+        daily, returns, summary, count = statements[2:]
+        self.assertEqual(daily.writes, {'sales.daily'})
+        self.assertEqual(daily.database, 'sales')
+        self.assertEqual(daily.settings, {'hive.exec.dynamic.partition.mode': 'nonstrict'})
+        self.assertEqual(daily.depends, set())
+        self.assertEqual(returns.depends, set())
+        self.assertEqual(summary.depends, {daily.index, returns.index})
+        self.assertEqual(count.depends, set())
+
+    def test_write_after_read(self):
+        statements = plan('SELECT * FROM a; INSERT OVERWRITE TABLE a SELECT * FROM b; '
+                          'INSERT INTO c SELECT * FROM b')
+        self.assertEqual(statements[1].depends, {0})
+        self.assertEqual(statements[2].depends, set())
+
+    def test_read_after_write_comma_join(self):
+        statements = plan('INSERT INTO b SELECT 1; SELECT * FROM a x, b y WHERE x.id = y.id')
+        self.assertEqual(statements[1].depends, {0})
+
+    def test_barriers(self):
+        statements = plan('INSERT INTO a SELECT 1; ANALYZE TABLE a COMPUTE STATISTICS; INSERT INTO b SELECT 1; '
+                          'SET hive.exec.parallel=true; INSERT INTO c SELECT 1')
+        self.assertEqual(statements[1].depends, {0})
+        self.assertEqual(statements[2].depends, {1})
+        self.assertEqual(statements[4].depends, {1, 2})
+        self.assertEqual(statements[4].settings, {'hive.exec.parallel': 'true'})
+
+
+class TestExecuteScript(unittest.TestCase):
+
+    def test_parallel(self):
+        recorder = Recorder()
+        conn = recorder.connection()
+        pool = ConnectionPool(max_size=2, connect_function=recorder.connection)
+        statements = conn.executescript(SCRIPT, max_parallel=3, pool=pool)
+
+        # the two inserts and the count run at the same time, the summary waits for the inserts
+        self.assertEqual(recorder.max_running, 3)
+        daily, returns, summary = statements[2:5]
+        self.assertGreaterEqual(summary.started, max(daily.started + daily.seconds,
+                                                    returns.started + returns.seconds))
+        self.assertNotEqual(daily.session, returns.session)
+        self.assertEqual(summary.rowcount, 0)
+        # every session ran its statements in the state of the script
+        sessions = {fake for fake, _ in recorder.executed}
+        self.assertEqual(len(sessions), 3)
+        for fake in sessions:
+            executed = recorder.statements(fake)
+            self.assertEqual(executed[:2], ['USE sales', 'SET hive.exec.dynamic.partition.mode=nonstrict'])
+        # the connection is left in the state of the end of the script
+        self.assertEqual(conn.database, 'sales')
+        self.assertEqual(conn.session_settings['hive.exec.dynamic.partition.mode'], 'nonstrict')
+
+    def test_serial(self):
+        recorder = Recorder(delay=0)
+        conn = recorder.connection()
+        statements = conn.executescript(SCRIPT)
+        self.assertEqual(recorder.max_running, 1)
+        self.assertEqual({statement.session for statement in statements if statement.kind != SESSION}, {0})
+        self.assertEqual(recorder.statements(conn.jdbc_connection())[2:],
+                         [statement.sql for statement in statements[2:]])
+
+    def test_temporary_tables(self):
+        recorder = Recorder(delay=0)
+        conn = recorder.connection()
+        conn.executescript('CREATE TEMPORARY TABLE t AS SELECT * FROM a; INSERT INTO b SELECT * FROM c; '
+                           'INSERT INTO d SELECT * FROM t', max_parallel=4)
+        self.assertEqual(recorder.max_running, 1)
+        self.assertEqual(len({fake for fake, _ in recorder.executed}), 1)
+
+    def test_failure(self):
+        recorder = Recorder(delay=0, fail='staging.returns')
+        conn = recorder.connection()
+        with pytest.raises(Exception):
+            conn.executescript(SCRIPT)
+        executed = [text for _, text in recorder.executed]
+        self.assertNotIn('INSERT OVERWRITE TABLE summary', ' '.join(executed))
+
+    def test_default_pool(self):
+        recorder = Recorder()
+        conn = recorder.connection()
+        conn.connect_function = recorder.connection
+        conn.connect_args = ((), {})
+        conn.executescript(SCRIPT, max_parallel=2)
+        sessions = {fake for fake, _ in recorder.executed}
+        self.assertEqual(len(sessions), 2)
+        # the pool opened for the script is closed with it
+        self.assertEqual([fake.closed for fake in sessions if fake is not conn.jdbc_connection()], [True])
+
+    def test_failing_session(self):
+        class Pool:
+            def acquire(self):
+                raise RuntimeError('connection refused')
+        sessions = _Sessions(_Session(0, Recorder().connection()), 2, Pool())
+        main = sessions.acquire()
+        with pytest.raises(RuntimeError, match='refused'):
+            sessions.acquire()
+        self.assertEqual(sessions._opened, [main])
+        sessions.close()
+
+    def test_requires_pool(self):
+        conn = Recorder().connection()
+        with pytest.raises(Exception, match='ConnectionPool'):
+            conn.executescript(SCRIPT, max_parallel=2)
@@ -0,0 +1,134 @@
+"""
+Test sql text handling in `hivejdbc.sql` and literal rendering
+"""
+import unittest
+import datetime
+from collections import namedtuple
+from decimal import Decimal
+
+import pytest
+from pyjdbc.dbapi import JdbcConnection
+
+from hivejdbc import HiveCursor, sql
+from hivejdbc.types import HiveTypeConversion
+from tests.fakes import FakeConnection
+
+CONVERSION = HiveTypeConversion()
+INSERT = 'INSERT INTO TABLE test.persons (name, age) VALUES (:name, :age)'
+
+
+class TestRender(unittest.TestCase):
+
+    def test_named(self):
+        text, count = sql.render("select * from t where a = :a and b = ':b' -- :c\n", {'a': "it's"},
+                                 CONVERSION.sql_literal)
+        self.assertEqual(text, "select * from t where a = 'it\\'s' and b = ':b' -- :c\n")
+        self.assertEqual(count, 1)
+
+    def test_positional(self):
+        text, _ = sql.render('values (%s, %s, \'100%\')', [1, None], CONVERSION.sql_literal)
+        self.assertEqual(text, 'values (1, NULL, \'100%\')')
+
+    def test_errors(self):
+        with pytest.raises(ValueError):
+            sql.render('select :a', {}, CONVERSION.sql_literal)
+        with pytest.raises(ValueError):
+            sql.render('select :a', {'a': 1, 'b': 2}, CONVERSION.sql_literal)
+        with pytest.raises(ValueError):
+            sql.render('select %s', [1, 2], CONVERSION.sql_literal)
+
+
+class TestLiterals(unittest.TestCase):
+
+    def test_literals(self):
+        Point = namedtuple('Point', ['x', 'y'])
+        literal = CONVERSION.sql_literal
+        self.assertEqual(literal(True), 'TRUE')
+        self.assertEqual(literal(Decimal('1.50')), '1.50BD')
+        for value in ('NaN', 'Infinity', '-Infinity'):
+            with self.assertRaises(ValueError):
+                literal(Decimal(value))
+        self.assertEqual(literal('a\nb'), "'a\\nb'")
+        self.assertEqual(literal(datetime.date(2020, 1, 2)), "CAST('2020-01-02' AS DATE)")
+        self.assertEqual(literal([1, 2]), 'array(1, 2)')
+        self.assertEqual(literal({'a': [1]}), "map('a', array(1))")
+        self.assertEqual(literal(Point(1, 'b')), "named_struct('x', 1, 'y', 'b')")
+        self.assertTrue(CONVERSION.is_constant('a'))
+        self.assertFalse(CONVERSION.is_constant([1]))
+
+
+class TestInsertRewrite(unittest.TestCase):
+
+    def test_parse_insert(self):
+        template = sql.parse_insert(INSERT + ';')
+        self.assertEqual(template.head, 'INSERT INTO TABLE test.persons (name, age)')
+        self.assertEqual(template.row, '(:name, :age)')
+        self.assertIsNone(sql.parse_insert('INSERT OVERWRITE TABLE t VALUES (:a)'))
+        self.assertIsNone(sql.parse_insert('INSERT INTO t SELECT * FROM s'))
+        self.assertIsNone(sql.parse_insert('INSERT INTO t VALUES (:a), (:b)'))
+
+    def test_chunks(self):
+        rows = [{'name': 'n{}'.format(i), 'age': i} for i in range(5)]
+        statements = list(sql.parse_insert(INSERT).statements(rows, CONVERSION.sql_literal, CONVERSION.is_constant,
+                                                               chunk_size=2, max_length=10000))
+        self.assertEqual(len(statements), 3)
+        self.assertEqual(statements[0], "INSERT INTO TABLE test.persons (name, age)\nVALUES\n('n0', 0),\n('n1', 1)")
+
+    def test_max_length(self):
+        rows = [{'name': 'x' * 50, 'age': i} for i in range(4)]
+        statements = list(sql.parse_insert(INSERT).statements(rows, CONVERSION.sql_literal, CONVERSION.is_constant,
+                                                               chunk_size=100, max_length=200))
+        self.assertEqual(len(statements), 2)
+
+    def test_complex_values_use_select(self):
+        template = sql.parse_insert('INSERT INTO t VALUES (:a, :b)')
+        statements = list(template.statements([{'a': 1, 'b': [1]}, {'a': 2, 'b': []}], CONVERSION.sql_literal,
+                                              CONVERSION.is_constant, chunk_size=10, max_length=10000))
+        self.assertEqual(statements, ['INSERT INTO t\nSELECT 1, array(1)\nUNION ALL\nSELECT 2, array()'])
+
+    def test_head_parameters(self):
+        template = sql.parse_insert('INSERT INTO TABLE t PARTITION (dt=:dt) VALUES (:a)')
+        rows = [{'dt': '2020', 'a': 1}, {'dt': '2020', 'a': 2}, {'dt': '2021', 'a': 3}]
+        statements = list(template.statements(rows, CONVERSION.sql_literal, CONVERSION.is_constant,
+                                              chunk_size=10, max_length=10000))
+        self.assertEqual(statements, ["INSERT INTO TABLE t PARTITION (dt='2020')\nVALUES\n(1),\n(2)",
+                                      "INSERT INTO TABLE t PARTITION (dt='2021')\nVALUES\n(3)"])
+
+        template = sql.parse_insert('INSERT INTO TABLE t PARTITION (dt=%s) VALUES (%s, %s)')
+        statements = list(template.statements([('2020', 1, 'x')], CONVERSION.sql_literal, CONVERSION.is_constant,
+                                              chunk_size=10, max_length=10000))
+        self.assertEqual(statements, ["INSERT INTO TABLE t PARTITION (dt='2020')\nVALUES\n(1, 'x')"])
+        with self.assertRaises(ValueError):
+            list(template.statements([('2020', 1, 'x', 'y')], CONVERSION.sql_literal, CONVERSION.is_constant,
+                                     chunk_size=10, max_length=10000))
+
+    def test_executemany(self):
+        fake = FakeConnection()
+        conn = JdbcConnection(connection=fake, cursor_class=HiveCursor, type_conversion=CONVERSION)
+        cursor = conn.cursor()
+        cursor.insert_chunk_size = 2
+        cursor.executemany(INSERT, [{'name': 'a', 'age': 1}, {'name': 'b', 'age': 2}, {'name': 'c', 'age': 3}])
+        self.assertEqual(len(fake.executed), 2)
+        self.assertIn("('c', 3)", fake.executed[1])
+
+        fake.executed.clear()
+        cursor.executemany('INSERT INTO TABLE t PARTITION (dt=:dt) VALUES (:a)', [{'dt': '2020', 'a': 1}])
+        self.assertEqual(fake.executed, ["INSERT INTO TABLE t PARTITION (dt='2020')\nVALUES\n(1)"])
+
+
+class TestTableReferences(unittest.TestCase):
+
+    def test_comma_join(self):
+        for text in ('select * from a, b', 'select * from a x, b as y where x.id = y.id',
+                     'select * from (select * from a) s, b'):
+            self.assertEqual(sql.table_references(text, 'd'), ({'d.a', 'd.b'}, set()))
+
+    def test_unknown_from(self):
+        reads, writes = sql.table_references('insert into c select * from a where x is distinct from b and y', 'd')
+        self.assertIsNone(reads)
+        self.assertEqual(writes, {'d.c'})
+
+    def test_insert_directory(self):
+        for text in ("insert overwrite directory '/x' select * from a",
+                     "insert overwrite local directory '/x' select * from a"):
+            self.assertEqual(sql.table_references(text, 'd'), ({'d.a'}, set()))
@@ -0,0 +1,64 @@
+"""
+Test lazy imports and `hivejdbc.ConnectionProfile`
+"""
+import subprocess
+import sys
+import unittest
+from unittest import mock
+
+import hivejdbc
+from hivejdbc import HiveConnection, HiveCursor
+from hivejdbc.driver import HiveConnect, DRIVER_CLASS
+from hivejdbc.types import HiveTypeConversion
+from tests.fakes import FakeConnection
+
+
+class CountingConnect(HiveConnect):
+    """connect function opening fake connections, counting argument parsing"""
+
+    def __init__(self):
+        super().__init__(driver_path=None, driver_class=DRIVER_CLASS, cursor_class=HiveCursor,
+                         parser=hivejdbc.HiveArgParser, type_conversion=HiveTypeConversion,
+                         runtime_invocation_ok=False)
+        self.parsed = 0
+        self.urls = []
+
+    def parse_args(self, *args, **kwargs):
+        self.parsed += 1
+        return super().parse_args(*args, **kwargs)
+
+    def load_driver(self):
+        return object
+
+    def open_connection(self, driver_class, conn_str, args, type_conversion=None):
+        self.urls.append(conn_str)
+        return HiveConnection(FakeConnection(), self.cursor_class,
+                              type_conversion=type_conversion or self.make_type_conversion(args),
+                              listeners=args.get('listeners'))
+
+
+class TestStartup(unittest.TestCase):
+
+    def test_import_is_lazy(self):
+        code = 'import sys, hivejdbc; print("jpype" in sys.modules)'
+        output = subprocess.check_output([sys.executable, '-c', code])
+        self.assertEqual(output.strip(), b'False')
+
+    def test_profile(self):
+        connect_function = CountingConnect()
+        profile = hivejdbc.ConnectionProfile('example.com', 'default', fetch_size=100,
+                                             connect_function=connect_function)
+        with mock.patch('hivejdbc.driver.check_server') as check_server:
+            first = profile.connect()
+            second = profile()
+
+        self.assertEqual(check_server.call_count, 2)
+        self.assertEqual(profile._connect_function.parsed, 1)
+        self.assertEqual(profile._connect_function.urls,
+                         ['jdbc:hive2://example.com:10000/default;transportMode=binary;fetchSize=100'] * 2)
+        self.assertIsNot(first, second)
+        # the type conversion is shared between connections of a profile
+        self.assertIs(first._type_conversion, second._type_conversion)
+        # sessions opened for `executescript` use the profile
+        self.assertIs(first.connect_function, profile)
+        self.assertEqual(first.connect_args, ((), {}))
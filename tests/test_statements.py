@@ -0,0 +1,78 @@
+"""
+Test the prepared statement cache `hivejdbc.statements`
+"""
+import unittest
+
+from hivejdbc import HiveConnection, HiveCursor
+from hivejdbc.statements import ParsedStatement
+from hivejdbc.types import HiveTypeConversion
+from tests.fakes import FakeConnection, INTEGER, VARCHAR
+
+COLUMNS = [('id', INTEGER), ('name', VARCHAR)]
+
+
+def make_connection(**kwargs):
+    fake = FakeConnection(lambda sql, params: (COLUMNS, [(params.get(1), 'a')]))
+    conn = HiveConnection(fake, HiveCursor, type_conversion=HiveTypeConversion(), **kwargs)
+    return fake, conn
+
+
+class TestParsedStatement(unittest.TestCase):
+
+    def test_named(self):
+        parsed = ParsedStatement("select * from t where id = :id and name = ':id' -- :name\nor x = :id", True)
+        self.assertEqual(parsed.sql, "select * from t where id = ? and name = ':id' -- :name\nor x = ?")
+        self.assertEqual(parsed.bind({'id': 1}), [1, 1])
+        with self.assertRaises(ValueError):
+            parsed.bind({})
+        with self.assertRaises(ValueError):
+            parsed.bind({'id': 1, 'other': 2})
+
+    def test_positional(self):
+        parsed = ParsedStatement("select '%s', 100%% from t where id = %s", False)
+        self.assertEqual(parsed.sql, "select '%s', 100% from t where id = ?")
+        with self.assertRaises(ValueError):
+            parsed.bind([1, 2])
+
+
+class TestStatementCache(unittest.TestCase):
+
+    def test_reuse(self):
+        fake, conn = make_connection()
+        cursor = conn.cursor()
+        for value in (1, 2, 3):
+            cursor.execute('select * from t where id = :id', {'id': value})
+            self.assertEqual(cursor.fetchall(), [(str(value), 'a')])
+        self.assertEqual(len(fake.statements), 1)
+        self.assertEqual(fake.statements[0].sql, 'select * from t where id = ?')
+        stats = conn.statement_cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (2, 1))
+        self.assertEqual((stats['statement_hits'], stats['statement_misses']), (2, 1))
+
+        # a statement in use by a cursor is not shared
+        other = conn.cursor()
+        other.execute('select * from t where id = :id', {'id': 4})
+        cursor.execute('select * from t where id = :id', {'id': None})
+        self.assertEqual(len(fake.statements), 2)
+        self.assertEqual(other.fetchall(), [('4', 'a')])
+        self.assertEqual(cursor.fetchall(), [(None, 'a')])
+
+    def test_eviction_and_close(self):
+        fake, conn = make_connection(statement_cache_size=1)
+        cursor = conn.cursor()
+        cursor.execute('select * from a where id = %s', [1])
+        cursor.execute('select * from b where id = %s', [True])
+        cursor.execute('select * from c')
+        # the statement of `a` was evicted, `b` is idle and `c` is in use
+        self.assertEqual([statement.closed for statement in fake.statements], [True, False, False])
+        self.assertEqual(conn.statement_cache.stats()['evictions'], 1)
+        conn.close()
+        self.assertTrue(fake.statements[1].closed)
+
+    def test_disabled(self):
+        fake, conn = make_connection(statement_cache_size=0)
+        cursor = conn.cursor()
+        for _ in range(2):
+            cursor.execute('select * from t where id = :id', {'id': 1})
+        self.assertEqual(len(fake.statements), 2)
+        self.assertTrue(fake.statements[0].closed)
@@ -0,0 +1,102 @@
+"""
+Test fetch size handling and `HiveCursor.stream`
+"""
+import gc
+import threading
+import time
+import unittest
+
+from hivejdbc import HiveCursor, HiveConnection
+from hivejdbc.stream import RowStream, row_size
+from hivejdbc.types import HiveTypeConversion
+from tests.fakes import FakeConnection, query_result, INTEGER, VARCHAR
+
+COLUMNS = [('id', INTEGER), ('name', VARCHAR)]
+ROWS = [(i, 'name-{}'.format(i)) for i in range(25)]
+
+
+def cursor(fetch_size=None):
+    fake = FakeConnection(query_result(COLUMNS, ROWS))
+    conn = HiveConnection(fake, HiveCursor, type_conversion=HiveTypeConversion(), fetch_size=fetch_size)
+    return conn.cursor()
+
+
+class TestFetchSize(unittest.TestCase):
+
+    def test_fetch_size_applied(self):
+        cur = cursor(fetch_size=500)
+        cur.execute('select * from t')
+        self.assertEqual(cur._resultset.getFetchSize(), 500)
+
+        self.assertEqual(len(cur.fetchmany(10)), 10)
+        # fetchmany keeps the configured fetch size
+        self.assertEqual(cur._resultset.getFetchSize(), 500)
+
+    def test_cursor_override(self):
+        cur = cursor(fetch_size=500)
+        cur.fetch_size = 50
+        cur.execute('select * from t')
+        self.assertEqual(cur._resultset.getFetchSize(), 50)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            HiveConnection(FakeConnection(), HiveCursor, type_conversion=HiveTypeConversion(), fetch_size=0)
+
+
+class TestStream(unittest.TestCase):
+
+    def test_batches(self):
+        for prefetch in (True, False):
+            cur = cursor()
+            cur.execute('select * from t')
+            with cur.stream(batch_rows=10, prefetch=prefetch) as stream:
+                batches = list(stream)
+            self.assertEqual([len(batch) for batch in batches], [10, 10, 5])
+            self.assertEqual(batches[0][0], ('0', 'name-0'))
+            self.assertEqual(stream.rows, 25)
+            self.assertEqual(stream.batches, 3)
+            self.assertGreater(stream.rows_per_second, 0)
+
+    def test_max_bytes(self):
+        cur = cursor()
+        cur.execute('select * from t')
+        limit = row_size(('0', 'name-0')) * 3
+        batches = list(cur.stream(batch_rows=100, max_bytes=limit))
+        self.assertTrue(all(len(batch) <= 3 for batch in batches))
+        self.assertEqual(sum(len(batch) for batch in batches), 25)
+
+    def test_close_early(self):
+        rows = iter(range(1000000))
+        stream = RowStream(lambda: next(rows), batch_rows=10)
+        self.assertEqual(next(stream), list(range(10)))
+        stream.close()
+        self.assertFalse(stream._thread.is_alive())
+        self.assertEqual(list(stream), [])
+
+    def test_abandoned(self):
+        def prefetch_threads():
+            return [thread for thread in threading.enumerate() if thread.name == 'hivejdbc-prefetch']
+
+        cur = cursor()
+        cur.execute('select * from t')
+        for _ in cur.stream(batch_rows=1):
+            break
+        gc.collect()
+        deadline = time.monotonic() + 5
+        while prefetch_threads() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertEqual(prefetch_threads(), [])
+
+        # closing the cursor closes its stream
+        cur.execute('select * from t')
+        stream = cur.stream(batch_rows=1)
+        next(stream)
+        cur.close()
+        self.assertFalse(stream._thread.is_alive())
+
+    def test_error(self):
+        def fetchone():
+            raise RuntimeError('fetch failed')
+
+        with self.assertRaises(RuntimeError):
+            list(RowStream(fetchone))
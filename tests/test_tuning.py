@@ -0,0 +1,65 @@
+"""
+Test session settings in the jdbc url and tuning profiles `hivejdbc.tuning`
+"""
+import unittest
+
+from hivejdbc import tuning
+from hivejdbc.dbapi import HiveConnection, HiveCursor
+from hivejdbc.driver import encode_settings
+from hivejdbc.types import HiveTypeConversion
+from tests.fakes import FakeConnection
+from tests.test_startup import CountingConnect
+
+
+class TestSessionSettings(unittest.TestCase):
+
+    def setUp(self):
+        self.connect_function = CountingConnect()
+
+    def url(self, **kwargs):
+        args = self.connect_function.parse_args('example.com', 'default', **kwargs)
+        return self.connect_function.connection_url(args)
+
+    def test_encoding(self):
+        self.assertEqual(encode_settings({'a.b': 'x y', 'queue': 'etl;adhoc#1', 'path': '/tmp/a=b?'}),
+                         'a.b=x%20y;queue=etl%3Badhoc%231;path=%2Ftmp%2Fa%3Db%3F')
+
+    def test_url(self):
+        url = self.url(hive_conf_list={'hive.exec.parallel': True, 'hive.tez.container.size': 4096},
+                       hive_var_list={'day': '2020-01-01'})
+        self.assertEqual(url, 'jdbc:hive2://example.com:10000/default;transportMode=binary'
+                              '?hive.exec.parallel=true;hive.tez.container.size=4096#day=2020-01-01')
+        with self.assertRaises(ValueError):
+            self.url(hive_conf_list={'hive.exec.parallel': None})
+
+    def test_profile(self):
+        url = self.url(profile='interactive', hive_conf_list={'hive.fetch.task.conversion': 'minimal'})
+        conf = url.split('?', 1)[1]
+        self.assertIn('hive.fetch.task.conversion=minimal;', conf)
+        self.assertIn('hive.compute.query.using.stats=true', conf)
+        with self.assertRaises(ValueError):
+            self.url(profile='missing')
+
+    def test_register_profile(self):
+        tuning.register_profile('test-etl', {'hive.tez.container.size': 8192}, base='batch')
+        self.addCleanup(tuning._profiles.pop, 'test-etl')
+        settings = tuning.get_profile('test-etl')
+        self.assertEqual(settings['hive.tez.container.size'], '8192')
+        self.assertEqual(settings['hive.exec.parallel'], 'true')
+        self.assertIn('test-etl', tuning.profile_names())
+        # profiles are copied, changing the settings of a connection does not change the profile
+        settings['hive.exec.parallel'] = 'false'
+        self.assertEqual(tuning.get_profile('test-etl')['hive.exec.parallel'], 'true')
+
+    def test_session_settings(self):
+        args = self.connect_function.parse_args('example.com', 'default', profile='batch',
+                                                hive_var_list={'day': '2020-01-01'})
+        settings = self.connect_function.session_settings(args)
+        self.assertEqual(settings['hive.exec.parallel'], 'true')
+        self.assertEqual(settings['hivevar:day'], '2020-01-01')
+
+        conn = HiveConnection(FakeConnection(), HiveCursor, type_conversion=HiveTypeConversion(),
+                              session_settings=settings)
+        # the connection keeps its own copy
+        settings.clear()
+        self.assertEqual(conn.session_settings['hivevar:day'], '2020-01-01')